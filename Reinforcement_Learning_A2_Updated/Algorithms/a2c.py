@@ -3,9 +3,13 @@ import torch.optim as optim
 import torch.nn.functional as F
 import numpy as np
 from Models.networks import PolicyNetwork, ValueNetwork
+from Utils.optim import make_joint_adam
+from Utils.timing import PhaseTimer
+from Utils.normalization import NormalizeObservation, ReturnNormalizer
+from Algorithms.vector import bootstrapped_returns, train_vectorized
 
 class A2C:
-    def __init__(self, env, learning_rate=0.0005, gamma=0.99):
+    def __init__(self, env, learning_rate=0.0005, gamma=0.99, fused_update=False, timer=None, normalize=False):
         self.env = env
         self.state_dim = env.observation_space.shape[0]
         self.action_dim = env.action_space.n
@@ -19,18 +23,113 @@ class A2C:
         self.value_net = ValueNetwork(self.state_dim).to(self.device)
         self.value_optimizer = optim.Adam(self.value_net.parameters(), lr=learning_rate)
         
+        # Optional single optimizer over both networks: one backward and one step per update
+        self.optimizer = None
+        if fused_update:
+            self.optimizer = make_joint_adam([
+                {"params": self.policy_net.parameters(), "lr": learning_rate},
+                {"params": self.value_net.parameters(), "lr": learning_rate},
+            ])
+            self.policy_optimizer = self.value_optimizer = None
+        
         self.gamma = gamma
+
+        # Hot-path phase timing (a disabled timer costs one method call per phase)
+        self.timer = timer if timer is not None else PhaseTimer(enabled=False)
+        # Callables run after every environment step with the global step count
+        self.step_hooks = []
+        # Optional Utils.budget.BudgetController that ends learning once the task is solved
+        self.budget = None
+        # Optional Utils.recorder.TrajectoryRecorder that streams every transition to disk
+        self.recorder = None
+        # Optional callable run between backward() and the optimizer step; data-parallel
+        # training sets Utils.distributed.GradientAllReduce here
+        self.grad_sync = None
+
+        # Optional running normalization (Utils.normalization): observations through an
+        # env wrapper, returns with statistics kept across episodes
+        self.obs_normalizer = self.return_normalizer = None
+        if normalize:
+            self.env = self.obs_normalizer = NormalizeObservation(env)
+            self.return_normalizer = ReturnNormalizer(center=False)
         
     def select_action(self, state):
-        state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-        probs = self.policy_net(state)
-        action_dist = torch.distributions.Categorical(probs)
-        action = action_dist.sample()
-        log_prob = action_dist.log_prob(action)
-        state_value = self.value_net(state)
-        return action.item(), log_prob, state_value
+        with self.timer.phase("to_tensor"):
+            state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+        with self.timer.phase("forward"):
+            probs = self.policy_net(state)
+            action_dist = torch.distributions.Categorical(probs)
+            action = action_dist.sample()
+            log_prob = action_dist.log_prob(action)
+            state_value = self.value_net(state)
+            return action.item(), log_prob, state_value
+
+    def select_actions(self, states):
+        # Batched select_action for a vector env; log-probs and values keep their graph
+        with self.timer.phase("to_tensor"):
+            states = torch.as_tensor(states, dtype=torch.float32, device=self.device)
+        with self.timer.phase("forward"):
+            action_dist = torch.distributions.Categorical(self.policy_net(states))
+            actions = action_dist.sample()
+            return actions.cpu().numpy(), (action_dist.log_prob(actions), self.value_net(states))
+    
+    def update(self, log_probs, values, rewards):
+        returns = []
+        R = 0
+        for r in reversed(rewards):
+            R = r + self.gamma * R
+            returns.insert(0, R)
+
+        with self.timer.phase("to_tensor"):
+            returns = torch.tensor(returns).float().to(self.device)
+            values = torch.cat(values)
+            log_probs = torch.cat(log_probs)
+        return self.optimize(log_probs, values, returns)
+
+    def update_rollout(self, rollout, last_states):
+        # Vector-env rollout of T steps x N envs, flattened after computing bootstrapped returns
+        with self.timer.phase("to_tensor"):
+            returns = bootstrapped_returns(self, np.array(rollout["rewards"]), np.array(rollout["masks"]), last_states)
+            returns = torch.as_tensor(returns.reshape(-1), device=self.device)
+            log_probs = torch.cat([log_prob for log_prob, _ in rollout["extras"]])
+            values = torch.cat([value for _, value in rollout["extras"]])
+        return self.optimize(log_probs, values, returns)
+
+    def sync_gradients(self):
+        if self.grad_sync is not None:
+            with self.timer.phase("allreduce"):
+                self.grad_sync()
+
+    def optimize(self, log_probs, values, returns):
+        if self.return_normalizer is not None:
+            returns = self.return_normalizer(returns)
+
+        with self.timer.phase("forward"):
+            advantages = returns - values.squeeze(-1).detach()
+            policy_loss = -(log_probs * advantages.detach()).mean()
+            value_loss = F.mse_loss(values.squeeze(-1), returns)
+
+        if self.optimizer is not None:
+            with self.timer.phase("backward"):
+                self.optimizer.zero_grad()
+                (policy_loss + value_loss).backward()
+            self.sync_gradients()
+            with self.timer.phase("optimizer"):
+                self.optimizer.step()
+        else:
+            with self.timer.phase("backward"):
+                self.policy_optimizer.zero_grad()
+                self.value_optimizer.zero_grad()
+                policy_loss.backward()
+                value_loss.backward()
+            self.sync_gradients()
+            with self.timer.phase("optimizer"):
+                self.policy_optimizer.step()
+                self.value_optimizer.step()
+        return policy_loss.item(), value_loss.item()
     
     def train(self, max_steps=200000):
+        self.timer.reset()  # Time the training loop only, not agent construction
         reward_records = []  # Store total reward per episode
         step_rewards = []  # Store (step, avg_reward) pairs
         total_steps = 0
@@ -46,8 +145,11 @@ class A2C:
                     break
                 
                 action, log_prob, value = self.select_action(state)
-                next_state, reward, terminated, truncated, _ = self.env.step(action)
+                with self.timer.phase("env_step"):
+                    next_state, reward, terminated, truncated, _ = self.env.step(action)
                 done = terminated or truncated
+                if self.recorder is not None:
+                    self.recorder.record(state, action, reward, terminated, truncated, next_state, log_prob.item(), value.item())
 
                 log_probs.append(log_prob)
                 values.append(value)
@@ -56,6 +158,9 @@ class A2C:
                 episode_reward += reward
                 state = next_state
                 
+                for hook in self.step_hooks:
+                    hook(total_steps)
+                
                 # Record average reward every 1,000 steps
                 if total_steps % 1000 == 0:
                     avg_reward = np.mean(reward_records[-50:]) if reward_records else 0
@@ -64,26 +169,8 @@ class A2C:
             if total_steps >= max_steps:
                 break
 
-            returns = []
-            R = 0
-            for r in reversed(rewards):
-                R = r + self.gamma * R
-                returns.insert(0, R)
-
-            returns = torch.tensor(returns).float().to(self.device)
-            values = torch.cat(values)
-            log_probs = torch.cat(log_probs)
-
-            advantages = returns - values.squeeze(-1).detach()
-            policy_loss = -(log_probs * advantages.detach()).mean()
-            value_loss = F.mse_loss(values.squeeze(-1), returns)
-
-            self.policy_optimizer.zero_grad()
-            self.value_optimizer.zero_grad()
-            policy_loss.backward()
-            value_loss.backward()
-            self.policy_optimizer.step()
-            self.value_optimizer.step()
+            if self.budget is None or not self.budget.evaluating:
+                self.update(log_probs, values, rewards)
 
             reward_records.append(episode_reward)
             episode += 1
@@ -91,5 +178,16 @@ class A2C:
             if episode % 10 == 0:
                 avg_reward = np.mean(reward_records[-10:])
                 print(f"Steps: {total_steps}, Episode: {episode}, Avg Reward: {avg_reward:.1f}")
+                if self.timer.enabled:
+                    print(self.timer.report())
 
+            if self.budget is not None and self.budget.update(episode_reward, total_steps):
+                break
+
+        if self.budget is not None:
+            step_rewards = self.budget.finish(step_rewards, max_steps, np.mean(reward_records[-50:]) if reward_records else 0)
         return step_rewards  # Return list of (step, avg_reward) pairs
+
+    def train_vector(self, envs, max_steps=200000, rollout_steps=32, seed=None):
+        # Training on a vector env (Algorithms/vector.py), e.g. Envs.remote.RemoteVectorEnv
+        return train_vectorized(self, envs, max_steps, rollout_steps, seed)
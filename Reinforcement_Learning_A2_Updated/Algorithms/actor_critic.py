@@ -3,9 +3,12 @@ import torch.optim as optim
 import torch.nn.functional as F
 import numpy as np
 from Models.networks import PolicyNetwork, ValueNetwork
+from Utils.optim import make_joint_adam
+from Utils.timing import PhaseTimer
+from Utils.normalization import NormalizeObservation, ReturnNormalizer
 
 class ActorCritic:
-    def __init__(self, env, learning_rate=0.002, gamma=0.99):  
+    def __init__(self, env, learning_rate=0.002, gamma=0.99, fused_update=False, timer=None, normalize=False):  
         self.env = env
         self.state_dim = env.observation_space.shape[0]
         self.action_dim = env.action_space.n
@@ -19,18 +22,89 @@ class ActorCritic:
         self.value_net = ValueNetwork(self.state_dim)
         self.value_optimizer = optim.Adam(self.value_net.parameters(), lr=learning_rate)
         
+        # Optional single optimizer over both networks: one backward and one step per update
+        self.optimizer = None
+        if fused_update:
+            self.optimizer = make_joint_adam([
+                {"params": self.policy_net.parameters(), "lr": learning_rate},
+                {"params": self.value_net.parameters(), "lr": learning_rate},
+            ])
+            self.policy_optimizer = self.value_optimizer = None
+        
         self.gamma = gamma
+
+        # Hot-path phase timing (a disabled timer costs one method call per phase)
+        self.timer = timer if timer is not None else PhaseTimer(enabled=False)
+        # Callables run after every environment step with the global step count
+        self.step_hooks = []
+        # Optional Utils.budget.BudgetController that ends learning once the task is solved
+        self.budget = None
+        # Optional Utils.recorder.TrajectoryRecorder that streams every transition to disk
+        self.recorder = None
+
+        # Optional running normalization (Utils.normalization): observations through an
+        # env wrapper, returns with statistics kept across episodes
+        self.obs_normalizer = self.return_normalizer = None
+        if normalize:
+            self.env = self.obs_normalizer = NormalizeObservation(env)
+            self.return_normalizer = ReturnNormalizer(center=True)
         
     def select_action(self, state):
-        state = torch.FloatTensor(state).unsqueeze(0)
-        probs = self.policy_net(state)
-        action_dist = torch.distributions.Categorical(probs)
-        action = action_dist.sample()
-        log_prob = action_dist.log_prob(action)
-        state_value = self.value_net(state)  # Outputs V(s)
-        return action.item(), log_prob, state_value
+        with self.timer.phase("to_tensor"):
+            state = torch.FloatTensor(state).unsqueeze(0)
+        with self.timer.phase("forward"):
+            probs = self.policy_net(state)
+            action_dist = torch.distributions.Categorical(probs)
+            action = action_dist.sample()
+            log_prob = action_dist.log_prob(action)
+            state_value = self.value_net(state)  # Outputs V(s)
+            return action.item(), log_prob, state_value
+    
+    def update(self, log_probs, values, rewards):
+        # Compute Monte-Carlo returns
+        returns = []
+        R = 0
+        for r in reversed(rewards):
+            R = r + self.gamma * R
+            returns.insert(0, R)
+
+        # Normalize returns
+        with self.timer.phase("to_tensor"):
+            returns = torch.tensor(returns).float()
+            if self.return_normalizer is not None:
+                returns = self.return_normalizer(returns)
+            else:
+                returns = (returns - returns.mean()) / (returns.std() + 1e-8)
+
+            log_probs = torch.cat(log_probs)
+            values = torch.cat(values)  # Shape: [N, 1]
+
+        
+        with self.timer.phase("forward"):
+            values = values.squeeze(-1)  
+            policy_loss = -(log_probs * returns.detach()).mean()  # Use normalized returns
+            value_loss = F.mse_loss(values, returns)
+
+        # Backprop (no gradient clipping)
+        if self.optimizer is not None:
+            with self.timer.phase("backward"):
+                self.optimizer.zero_grad()
+                (policy_loss + value_loss).backward()
+            with self.timer.phase("optimizer"):
+                self.optimizer.step()
+        else:
+            with self.timer.phase("backward"):
+                self.policy_optimizer.zero_grad()
+                self.value_optimizer.zero_grad()
+                policy_loss.backward()
+                value_loss.backward()
+            with self.timer.phase("optimizer"):
+                self.policy_optimizer.step()
+                self.value_optimizer.step()
+        return policy_loss.item(), value_loss.item(), returns.mean().item()
     
     def train(self, max_steps=200000):
+        self.timer.reset()  # Time the training loop only, not agent construction
         reward_records = []  
         step_rewards = [] 
         total_steps = 0
@@ -46,8 +120,11 @@ class ActorCritic:
                     break
                 
                 action, log_prob, value = self.select_action(state)
-                next_state, reward, terminated, truncated, _ = self.env.step(action)
+                with self.timer.phase("env_step"):
+                    next_state, reward, terminated, truncated, _ = self.env.step(action)
                 done = terminated or truncated
+                if self.recorder is not None:
+                    self.recorder.record(state, action, reward, terminated, truncated, next_state, log_prob.item(), value.item())
 
                 log_probs.append(log_prob)
                 values.append(value)
@@ -56,6 +133,8 @@ class ActorCritic:
                 episode_reward += reward
                 state = next_state
                 
+                for hook in self.step_hooks:
+                    hook(total_steps)
                 
                 if total_steps % 1000 == 0:
                     avg_reward = np.mean(reward_records[-50:]) if reward_records else 0
@@ -64,36 +143,12 @@ class ActorCritic:
             if total_steps >= max_steps:
                 break
 
-            # Compute Monte-Carlo returns
-            returns = []
-            R = 0
-            for r in reversed(rewards):
-                R = r + self.gamma * R
-                returns.insert(0, R)
+            if self.budget is None or not self.budget.evaluating:
+                policy_loss, value_loss, avg_return = self.update(log_probs, values, rewards)
 
-            # Normalize returns
-            returns = torch.tensor(returns).float()
-            returns = (returns - returns.mean()) / (returns.std() + 1e-8)  
-
-            log_probs = torch.cat(log_probs)
-            values = torch.cat(values)  # Shape: [N, 1]
-
-            
-            values = values.squeeze(-1)  
-            policy_loss = -(log_probs * returns.detach()).mean()  # Use normalized returns
-            value_loss = F.mse_loss(values, returns)
-
-            # Debugging prints
-            if episode % 10 == 0:
-                print(f"Episode: {episode}, Policy Loss: {policy_loss.item():.4f}, Value Loss: {value_loss.item():.4f}, Avg Return: {returns.mean().item():.1f}")
-
-            # Backprop (no gradient clipping)
-            self.policy_optimizer.zero_grad()
-            self.value_optimizer.zero_grad()
-            policy_loss.backward()
-            value_loss.backward()
-            self.policy_optimizer.step()
-            self.value_optimizer.step()
+                # Debugging prints
+                if episode % 10 == 0:
+                    print(f"Episode: {episode}, Policy Loss: {policy_loss:.4f}, Value Loss: {value_loss:.4f}, Avg Return: {avg_return:.1f}")
 
             reward_records.append(episode_reward)
             episode += 1
@@ -101,5 +156,12 @@ class ActorCritic:
             if episode % 10 == 0:
                 avg_reward = np.mean(reward_records[-50:])  
                 print(f"Steps: {total_steps}, Episode: {episode}, Avg Reward: {avg_reward:.1f}")
+                if self.timer.enabled:
+                    print(self.timer.report())
+
+            if self.budget is not None and self.budget.update(episode_reward, total_steps):
+                break
 
+        if self.budget is not None:
+            step_rewards = self.budget.finish(step_rewards, max_steps, np.mean(reward_records[-50:]) if reward_records else 0)
         return step_rewards  
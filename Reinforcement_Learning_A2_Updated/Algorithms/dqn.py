@@ -3,31 +3,174 @@ import torch.optim as optim
 import torch.nn as nn
 import random
 import numpy as np
-from Models.networks import DQN
+import copy
+from Models.networks import DQN, DuelingDQN
+from Utils.timing import PhaseTimer
+from Utils.normalization import NormalizeObservation
+from Utils.replay import ReplayMemory
+from Utils.schedules import make_schedule
+from Algorithms.vector import train_vectorized_dqn
 
 class DQNagent:
-    def __init__(self, env, learning_rate=0.0005, gamma=0.99, epsilon=1.0, epsilom_min=0.01, epsilon_decay=0.995):
+    def __init__(self, env, learning_rate=0.0005, gamma=0.99, epsilon=1.0, epsilom_min=0.01, epsilon_decay=0.995, timer=None,
+                 replay_capacity=None, batch_size=64, learning_starts=1000, replay_dir=None, replay_dtype="float32",
+                 double_dqn=False, dueling=False, n_step=1, target_update=None, epsilon_schedule=None, epsilon_decay_steps=100000,
+                 normalize=False):
         self.env = env
         self.state_dim = env.observation_space.shape[0]
         self.action_dim = env.action_space.n
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
-        self.policy_net = DQN(self.state_dim, self.action_dim).to(self.device)
+        network = DuelingDQN if dueling else DQN
+        self.policy_net = network(self.state_dim, self.action_dim).to(self.device)
         self.optimizer = optim.Adam(self.policy_net.parameters(), lr=learning_rate)
         
         self.gamma = gamma
         self.epsilon = epsilon
         self.epsilon_min = epsilom_min  # Fixed typo: epsilom_min -> epsilon_min
         self.epsilon_decay = epsilon_decay
+        # epsilon_schedule ("linear"/"exponential") replaces the per-episode decay with a
+        # precomputed array indexed by global step, from epsilon to epsilon_min over epsilon_decay_steps
+        self.epsilon_start = epsilon
+        self.epsilon_schedule = epsilon_schedule
+        self.epsilon_decay_steps = epsilon_decay_steps
+        self.epsilons = None
+
+        # Hot-path phase timing (a disabled timer costs one method call per phase)
+        self.timer = timer if timer is not None else PhaseTimer(enabled=False)
+        # Callables run after every environment step with the global step count
+        self.step_hooks = []
+        # Optional Utils.budget.BudgetController that ends learning once the task is solved
+        self.budget = None
+        # Optional Utils.recorder.TrajectoryRecorder that streams every transition to disk
+        self.recorder = None
+
+        # Optional running normalization (Utils.normalization): observations through an
+        # env wrapper (rewards and Q-targets stay unscaled)
+        self.obs_normalizer = None
+        if normalize:
+            self.env = self.obs_normalizer = NormalizeObservation(env)
+
+        # Optional experience replay: without it every step is one online update.
+        # replay_dir keeps the buffer in memmapped files that persist across restarts.
+        self.memory = None
+        if replay_capacity:
+            action_dtype = np.uint8 if self.action_dim <= 256 else np.int64
+            self.memory = ReplayMemory(replay_capacity, self.state_dim, replay_dtype, action_dtype, replay_dir)
+        self.batch_size = batch_size
+        self.learning_starts = max(learning_starts, batch_size)
+
+        # Optional target network, hard-synced every target_update gradient steps.
+        # Double DQN picks next actions with policy_net and evaluates them with target_net.
+        if double_dqn and not target_update:
+            raise ValueError("Double DQN needs a target network (set target_update)")
+        if n_step > 1 and self.memory is None:
+            raise ValueError("n-step returns are built from the replay memory (set replay_capacity)")
+        self.double_dqn = double_dqn
+        self.n_step = n_step
+        self.target_update = target_update
+        self.target_net = copy.deepcopy(self.policy_net) if target_update else None
+        if self.target_net is not None:
+            self.target_net.requires_grad_(False)
+        self.updates = 0
         
     def select_action(self, state):
         if random.random() < self.epsilon:
             return self.env.action_space.sample()
         with torch.no_grad():
-            state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-            return torch.argmax(self.policy_net(state)).item()
+            with self.timer.phase("to_tensor"):
+                state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+            with self.timer.phase("forward"):
+                return torch.argmax(self.policy_net(state)).item()
+        
+    def select_actions(self, states):
+        # Batched epsilon-greedy for N environments: one Q forward pass and one
+        # vectorized uniform draw for the exploration mask
+        with torch.no_grad():
+            with self.timer.phase("to_tensor"):
+                states = torch.as_tensor(np.asarray(states), dtype=torch.float32, device=self.device)
+            with self.timer.phase("forward"):
+                greedy = self.policy_net(states).argmax(dim=1).cpu().numpy()
+        explore = np.random.random(len(greedy)) < self.epsilon
+        return np.where(explore, np.random.randint(self.action_dim, size=len(greedy)), greedy)
+
+    def train_vector(self, envs, max_steps=200000, rollout_steps=None, seed=None):
+        # Training on a vector env (Algorithms/vector.py); rollout_steps is unused since
+        # DQN learns every env step
+        return train_vectorized_dqn(self, envs, max_steps, seed)
+
+    def prepare_schedule(self, max_steps):
+        if self.epsilon_schedule is not None:
+            self.epsilons = make_schedule(self.epsilon_schedule, self.epsilon_start, self.epsilon_min,
+                                          self.epsilon_decay_steps, max_steps)
+
+    def schedule_epsilon(self, step):
+        # Called before acting at global `step`; no-op without a schedule
+        if self.epsilons is not None:
+            self.epsilon = float(self.epsilons[min(step, len(self.epsilons) - 1)])
+
+    def end_episode(self):
+        # Per-episode decay only applies when there is no step-indexed schedule
+        if self.epsilons is None:
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+    def update(self, state, action, reward, next_state, done):
+        # Online one-step update: a minibatch of one transition
+        return self.update_batch([state], [action], [reward], [next_state], [done])
+
+    def update_batch(self, states, actions, rewards, next_states, dones, discounts=None):
+        # discounts holds gamma^n per transition for n-step returns (default: gamma)
+        with self.timer.phase("to_tensor"):
+            states = torch.as_tensor(np.asarray(states), dtype=torch.float32, device=self.device)
+            actions = torch.as_tensor(np.asarray(actions), dtype=torch.int64, device=self.device)
+            rewards = torch.as_tensor(np.asarray(rewards), dtype=torch.float32, device=self.device)
+            next_states = torch.as_tensor(np.asarray(next_states), dtype=torch.float32, device=self.device)
+            dones = torch.as_tensor(np.asarray(dones), dtype=torch.float32, device=self.device)
+            if discounts is not None:
+                discounts = torch.as_tensor(discounts, dtype=torch.float32, device=self.device)
+
+        with self.timer.phase("forward"):
+            q_values = self.policy_net(states).gather(1, actions.unsqueeze(1)).squeeze(1)
+
+            # All bootstrap values come from one no_grad pass of the target network
+            # (the online network itself when there is no target network); Double DQN
+            # picks argmax_a' Q(s', a') with the online network in the same block
+            with torch.no_grad():
+                bootstrap_net = self.target_net if self.target_net is not None else self.policy_net
+                next_q_values = bootstrap_net(next_states)
+                if self.double_dqn:
+                    next_actions = self.policy_net(next_states).argmax(dim=1, keepdim=True)
+                    next_q_values = next_q_values.gather(1, next_actions).squeeze(1)
+                else:
+                    next_q_values = next_q_values.max(dim=1)[0]
+                expected_q = rewards + (self.gamma if discounts is None else discounts) * next_q_values * (1 - dones)
+            loss = nn.MSELoss()(q_values, expected_q)
+        with self.timer.phase("backward"):
+            self.optimizer.zero_grad()
+            loss.backward()
+        with self.timer.phase("optimizer"):
+            self.optimizer.step()
+
+        self.updates += 1
+        if self.target_net is not None and self.updates % self.target_update == 0:
+            self.target_net.load_state_dict(self.policy_net.state_dict())
+        return loss.item()
+
+    def learn(self, state, action, reward, next_state, done):
+        # One learning step per environment step: an online update, or a replayed
+        # minibatch once the memory holds learning_starts transitions
+        if self.memory is None:
+            return self.update(state, action, reward, next_state, done)
+        self.memory.push(state, action, reward, next_state, done)
+        if len(self.memory) >= self.learning_starts:
+            if self.n_step > 1:
+                return self.update_batch(*self.memory.sample_n_step(self.batch_size, self.n_step, self.gamma))
+            return self.update_batch(*self.memory.sample(self.batch_size))
+        return None
         
     def train(self, max_steps=200000):
+        self.timer.reset()  # Time the training loop only, not agent construction
+        self.prepare_schedule(max_steps)
         reward_records = []  # Store total reward per episode
         step_rewards = []  # Store (step, avg_reward) pairs
         total_steps = 0
@@ -42,31 +185,24 @@ class DQNagent:
                 if total_steps >= max_steps:
                     break
                 
+                self.schedule_epsilon(total_steps)
                 action = self.select_action(state)
-                next_state, reward, terminated, truncated, _ = self.env.step(action)
+                with self.timer.phase("env_step"):
+                    next_state, reward, terminated, truncated, _ = self.env.step(action)
                 done = terminated or truncated
+                if self.recorder is not None:
+                    self.recorder.record(state, action, reward, terminated, truncated, next_state)
                 
-                state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-                next_state_tensor = torch.FloatTensor(next_state).unsqueeze(0).to(self.device)
-                
-                # Compute current Q-value for the action taken
-                q_value = self.policy_net(state_tensor)[0, action]
-                
-                # Compute target Q-values using the same network (naive approach)
-                with torch.no_grad():
-                    next_q_value = torch.max(self.policy_net(next_state_tensor))
-                expected_q = reward + self.gamma * next_q_value * (1 - float(done))
-                
-                # Calculate loss and update network
-                loss = nn.MSELoss()(q_value, expected_q.clone().detach())
-                self.optimizer.zero_grad()
-                loss.backward()
-                self.optimizer.step()
+                if self.budget is None or not self.budget.evaluating:
+                    self.learn(state, action, reward, next_state, done)
                 
                 state = next_state
                 episode_reward += reward
                 total_steps += 1
                 
+                for hook in self.step_hooks:
+                    hook(total_steps)
+                
                 # Record average reward every 1,000 steps
                 if total_steps % 1000 == 0:
                     avg_reward = np.mean(reward_records[-50:]) if reward_records else 0
@@ -76,11 +212,22 @@ class DQNagent:
                 break
 
             reward_records.append(episode_reward)
-            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+            self.end_episode()
             episode += 1
             
             if episode % 10 == 0:
                 avg_reward = np.mean(reward_records[-10:])
                 print(f"Steps: {total_steps}, Episode: {episode}, Reward: {episode_reward:.1f}, Avg Reward: {avg_reward:.1f}, Epsilon: {self.epsilon:.3f}")
+                if self.timer.enabled:
+                    print(self.timer.report())
+                if self.memory is not None:
+                    self.memory.flush()
+
+            if self.budget is not None and self.budget.update(episode_reward, total_steps):
+                break
 
+        if self.memory is not None:
+            self.memory.flush()
+        if self.budget is not None:
+            step_rewards = self.budget.finish(step_rewards, max_steps, np.mean(reward_records[-50:]) if reward_records else 0)
         return step_rewards  # Return list of (step, avg_reward) pairs
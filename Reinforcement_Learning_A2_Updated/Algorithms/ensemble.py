@@ -0,0 +1,192 @@
+# ensemble.py
+import copy
+import torch
+import numpy as np
+from torch.func import stack_module_state, functional_call, vmap
+from Algorithms.reinforce import REINFORCE
+from Algorithms.actor_critic import ActorCritic
+from Algorithms.a2c import A2C
+from Algorithms.dqn import DQNagent
+from Algorithms.ppo import PPO
+
+class VmappedNetwork:
+    # Runs K networks with the same architecture as one batched call.
+    # Parameters are stacked copies, so call refresh() after a member is updated.
+    def __init__(self, networks):
+        self.networks = list(networks)
+        self.base = copy.deepcopy(self.networks[0]).to("meta")
+        self.params, self.buffers = stack_module_state(self.networks)
+
+    def refresh(self, index=None):
+        members = range(len(self.networks)) if index is None else [index]
+        with torch.no_grad():
+            for k in members:
+                for name, param in self.networks[k].named_parameters():
+                    self.params[name][k].copy_(param)
+                for name, buffer in self.networks[k].named_buffers():
+                    self.buffers[name][k].copy_(buffer)
+
+    def _forward_one(self, params, buffers, x):
+        return functional_call(self.base, (params, buffers), (x,))
+
+    def __call__(self, x):
+        # x: [K, ..., input_dim] -> one output per member
+        with torch.no_grad():
+            return vmap(self._forward_one)(self.params, self.buffers, x)
+
+class EnsembleTrainer:
+    # Trains K independent agents (one per seed) with their envs stepped in lockstep.
+    # Acting for all members is a single vmapped forward pass; each member keeps its own
+    # networks, optimizers and update rule, so the runs stay statistically independent.
+    def __init__(self, agents, seeds):
+        self.agents = list(agents)
+        self.seeds = list(seeds)
+        self.num_members = len(self.agents)
+        self.device = next(self.agents[0].policy_net.parameters()).device
+        self.policy = VmappedNetwork([agent.policy_net for agent in self.agents])
+
+        # One generator per member, seeded with its own seed, so a member's action samples
+        # do not depend on which other seeds share the ensemble (runs are cached per seed)
+        self.generators = [torch.Generator(device=self.device) for _ in self.seeds]
+        for generator, seed in zip(self.generators, self.seeds):
+            generator.manual_seed(seed)
+
+        if isinstance(self.agents[0], DQNagent):
+            self.kind = "dqn"
+        elif isinstance(self.agents[0], PPO):
+            self.kind = "ppo"
+        elif isinstance(self.agents[0], (ActorCritic, A2C)):
+            self.kind = "actor_critic"
+        elif isinstance(self.agents[0], REINFORCE):
+            self.kind = "reinforce"
+        else:
+            raise ValueError(f"Unsupported agent type: {type(self.agents[0]).__name__}")
+
+    def select_actions(self, states):
+        states = torch.as_tensor(np.array(states), dtype=torch.float32, device=self.device)
+        outputs = self.policy(states.unsqueeze(1)).squeeze(1)  # [K, action_dim]
+
+        if self.kind == "dqn":
+            greedy = outputs.argmax(dim=-1)
+            random_actions = torch.stack([torch.randint(outputs.shape[-1], (), generator=generator, device=self.device)
+                                          for generator in self.generators])
+            epsilons = torch.tensor([agent.epsilon for agent in self.agents], device=self.device)
+            explore = torch.stack([torch.rand((), generator=generator, device=self.device)
+                                   for generator in self.generators]) < epsilons
+            return torch.where(explore, random_actions, greedy).tolist(), None
+
+        actions = torch.cat([torch.multinomial(outputs[k:k + 1], 1, generator=generator)
+                             for k, generator in enumerate(self.generators)]).squeeze(-1)
+        log_probs = torch.log(outputs.gather(-1, actions.unsqueeze(-1)).squeeze(-1))
+        return actions.tolist(), log_probs.tolist()
+
+    def _update_member(self, k, trajectory):
+        agent = self.agents[k]
+        states, actions, rewards, masks, log_probs = trajectory
+
+        if self.kind == "ppo":
+            agent.update(states, actions, log_probs, rewards, masks)
+        else:
+            # Recompute the episode's log-probs (and values) with gradients in one batched pass
+            state_batch = torch.as_tensor(np.array(states), dtype=torch.float32, device=self.device)
+            action_batch = torch.as_tensor(actions, device=self.device)
+            dist = torch.distributions.Categorical(agent.policy_net(state_batch))
+            episode_log_probs = dist.log_prob(action_batch)
+            if self.kind == "reinforce":
+                agent.update(list(episode_log_probs), rewards)
+            else:
+                values = agent.value_net(state_batch)
+                agent.update([episode_log_probs], [values], rewards)
+        self.policy.refresh(k)
+
+    @staticmethod
+    def _stopped(agent):
+        return agent.budget is not None and agent.budget.triggered and agent.budget.mode == "stop"
+
+    def train(self, max_steps=200000):
+        K = self.num_members
+        for agent in self.agents:
+            agent.timer.reset()
+            if self.kind == "dqn":
+                agent.prepare_schedule(max_steps)
+        reward_records = [[] for _ in range(K)]
+        step_rewards = [[] for _ in range(K)]
+        trajectories = [([], [], [], [], []) for _ in range(K)]
+        episode_rewards = [0.0] * K
+        total_episodes = 0
+
+        # Each member's first reset is seeded with its own seed, so ensemble runs are
+        # reproducible. Single-run train() resets unseeded, so an ensemble member and a
+        # sequential run of the same seed see different env randomness.
+        states = [agent.env.reset(seed=seed)[0] for agent, seed in zip(self.agents, self.seeds)]
+
+        for total_steps in range(1, max_steps + 1):
+            if self.kind == "dqn":
+                for agent in self.agents:
+                    agent.schedule_epsilon(total_steps - 1)
+            actions, log_probs = self.select_actions(states)
+
+            for k, agent in enumerate(self.agents):
+                if self._stopped(agent):
+                    continue  # As in train(), a stopped run takes no more steps; finish() pads its curve
+                with agent.timer.phase("env_step"):
+                    next_state, reward, terminated, truncated, _ = agent.env.step(actions[k])
+                done = terminated or truncated
+                if agent.recorder is not None:
+                    agent.recorder.record(states[k], actions[k], reward, terminated, truncated, next_state,
+                                          np.nan if log_probs is None else log_probs[k])
+                episode_rewards[k] += reward
+
+                learning = agent.budget is None or not agent.budget.triggered
+                if self.kind == "dqn":
+                    if learning:
+                        agent.learn(states[k], actions[k], reward, next_state, done)
+                        self.policy.refresh(k)
+                else:
+                    trajectory = trajectories[k]
+                    trajectory[0].append(states[k])
+                    trajectory[1].append(actions[k])
+                    trajectory[2].append(reward)
+                    trajectory[3].append(1 - float(done))
+                    trajectory[4].append(log_probs[k])
+
+                for hook in agent.step_hooks:
+                    hook(total_steps)
+
+                # Record average reward every 1,000 steps
+                if total_steps % 1000 == 0:
+                    avg_reward = np.mean(reward_records[k][-50:]) if reward_records[k] else 0
+                    step_rewards[k].append((total_steps, avg_reward))
+
+                if done and total_steps < max_steps:
+                    if self.kind == "dqn":
+                        agent.end_episode()
+                    else:
+                        if learning:
+                            self._update_member(k, trajectories[k])
+                        trajectories[k] = ([], [], [], [], [])
+                    reward_records[k].append(episode_rewards[k])
+                    if agent.budget is not None:
+                        agent.budget.update(episode_rewards[k], total_steps)
+                    episode_rewards[k] = 0.0
+                    total_episodes += 1
+                    next_state, _ = agent.env.reset()
+
+                states[k] = next_state
+
+            # Log Progress
+            if total_steps % 10000 == 0:
+                avg_reward = np.mean([np.mean(r[-10:]) if r else 0 for r in reward_records])
+                print(f"Steps: {total_steps}, Members: {K}, Episodes: {total_episodes}, Avg Reward: {avg_reward:.1f}")
+
+            # The ensemble stops once every member's budget says stop
+            if all(self._stopped(agent) for agent in self.agents):
+                break
+
+        for k, agent in enumerate(self.agents):
+            if self.kind == "dqn" and agent.memory is not None:
+                agent.memory.flush()
+            if agent.budget is not None:
+                avg_reward = np.mean(reward_records[k][-50:]) if reward_records[k] else 0
+                step_rewards[k] = agent.budget.finish(step_rewards[k], max_steps, avg_reward)
+        return step_rewards  # One list of (step, avg_reward) pairs per member
@@ -0,0 +1,67 @@
+# offline.py
+# Training from a Utils.dataset.OfflineDataset instead of environment steps:
+# offline DQN and a behaviour-cloning warm start for PolicyNetwork agents.
+import itertools
+import time
+import numpy as np
+import torch
+from Algorithms.dqn import DQNagent
+from Utils.dataset import BatchLoader
+
+def _check_dataset(agent, dataset):
+    state_dim = agent.policy_net.fc1.in_features
+    if dataset.obs_dim != state_dim:
+        raise ValueError(f"Dataset observations have {dataset.obs_dim} features, the agent expects {state_dim}")
+
+def _epoch(loader, max_batches):
+    # One shuffled pass, optionally cut to its first max_batches minibatches
+    return loader if max_batches is None else itertools.islice(loader, max_batches)
+
+def train_dqn_offline(agent, dataset, epochs=1, batch_size=256, prefetch=4, seed=0, max_batches=None):
+    # Fits a DQNagent with its own update_batch. Only `terminated` ends bootstrapping:
+    # the dataset keeps time-limit truncations separate.
+    _check_dataset(agent, dataset)
+    loader = BatchLoader(dataset, ("obs", "action", "reward", "next_obs", "terminated"), batch_size, prefetch, seed)
+    history = []
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        losses = [agent.update_batch(*batch) for batch in _epoch(loader, max_batches)]
+        elapsed = time.perf_counter() - start
+        history.append({"loss": float(np.mean(losses)), "updates_per_sec": len(losses) / elapsed})
+        print(f"Offline DQN epoch {epoch+1}/{epochs}: loss {history[-1]['loss']:.4f}, {history[-1]['updates_per_sec']:.0f} updates/s")
+    return history
+
+def behaviour_cloning(agent, dataset, epochs=1, batch_size=256, prefetch=4, seed=0, max_batches=None):
+    # Warm start for an agent's PolicyNetwork: maximizes log pi(a|s) of the dataset
+    # actions with the agent's own policy optimizer (or its joint optimizer)
+    _check_dataset(agent, dataset)
+    optimizer = getattr(agent, "policy_optimizer", None) or agent.optimizer
+    device = next(agent.policy_net.parameters()).device
+    loader = BatchLoader(dataset, ("obs", "action"), batch_size, prefetch, seed)
+    history = []
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        losses = []
+        for obs, actions in _epoch(loader, max_batches):
+            with agent.timer.phase("to_tensor"):
+                obs = torch.as_tensor(obs, dtype=torch.float32, device=device)
+                actions = torch.as_tensor(actions, dtype=torch.int64, device=device)
+            with agent.timer.phase("forward"):
+                probs = agent.policy_net(obs).gather(1, actions.unsqueeze(1)).squeeze(1)
+                loss = -torch.log(probs + 1e-8).mean()
+            with agent.timer.phase("backward"):
+                optimizer.zero_grad()
+                loss.backward()
+            with agent.timer.phase("optimizer"):
+                optimizer.step()
+            losses.append(loss.item())
+        elapsed = time.perf_counter() - start
+        history.append({"loss": float(np.mean(losses)), "updates_per_sec": len(losses) / elapsed})
+        print(f"Behaviour cloning epoch {epoch+1}/{epochs}: loss {history[-1]['loss']:.4f}, {history[-1]['updates_per_sec']:.0f} updates/s")
+    return history
+
+def pretrain(agent, dataset, epochs=1, batch_size=256):
+    # Offline DQN for DQN agents, behaviour cloning for the policy-gradient agents
+    if isinstance(agent, DQNagent):
+        return train_dqn_offline(agent, dataset, epochs, batch_size)
+    return behaviour_cloning(agent, dataset, epochs, batch_size)
@@ -3,9 +3,13 @@ import torch.nn.functional as F
 import numpy as np
 from Models.networks import PolicyNetwork, ValueNetwork
 import torch.optim as optim
+from Utils.optim import make_joint_adam
+from Utils.timing import PhaseTimer
+from Utils.normalization import NormalizeObservation, ReturnNormalizer
+from Algorithms.vector import bootstrapped_returns, train_vectorized
 
 class PPO:
-    def __init__(self, env, lr_policy=0.0005, lr_value=0.0005, gamma=0.99, clip_eps=0.2):
+    def __init__(self, env, lr_policy=0.0005, lr_value=0.0005, gamma=0.99, clip_eps=0.2, fused_update=False, timer=None, normalize=False):
         self.env = env
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
@@ -15,19 +19,59 @@ class PPO:
         self.policy_optimizer = optim.Adam(self.policy_net.parameters(), lr=lr_policy)
         self.value_optimizer = optim.Adam(self.value_net.parameters(), lr=lr_value)
         
+        # Optional single optimizer over both networks: one backward and one step per epoch
+        self.optimizer = None
+        if fused_update:
+            self.optimizer = make_joint_adam([
+                {"params": self.policy_net.parameters(), "lr": lr_policy},
+                {"params": self.value_net.parameters(), "lr": lr_value},
+            ])
+            self.policy_optimizer = self.value_optimizer = None
+        
         self.gamma = gamma
         self.clip_eps = clip_eps
+
+        # Hot-path phase timing (a disabled timer costs one method call per phase)
+        self.timer = timer if timer is not None else PhaseTimer(enabled=False)
+        # Callables run after every environment step with the global step count
+        self.step_hooks = []
+        # Optional Utils.budget.BudgetController that ends learning once the task is solved
+        self.budget = None
+        # Optional Utils.recorder.TrajectoryRecorder that streams every transition to disk
+        self.recorder = None
+        # Optional callable run between backward() and the optimizer step; data-parallel
+        # training sets Utils.distributed.GradientAllReduce here
+        self.grad_sync = None
+
+        # Optional running normalization (Utils.normalization): observations through an
+        # env wrapper, returns with statistics kept across episodes
+        self.obs_normalizer = self.return_normalizer = None
+        if normalize:
+            self.env = self.obs_normalizer = NormalizeObservation(env)
+            self.return_normalizer = ReturnNormalizer(center=False)
         
     def select_action(self, state):
-        state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-        with torch.no_grad():
-            probs = self.policy_net(state)
-        
-        dist = torch.distributions.Categorical(probs)
-        action = dist.sample()
-        log_prob = dist.log_prob(action)
-        
-        return action.item(), log_prob.item()
+        with self.timer.phase("to_tensor"):
+            state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+        with self.timer.phase("forward"):
+            with torch.no_grad():
+                probs = self.policy_net(state)
+            
+            dist = torch.distributions.Categorical(probs)
+            action = dist.sample()
+            log_prob = dist.log_prob(action)
+            
+            return action.item(), log_prob.item()
+
+    def select_actions(self, states):
+        # Batched select_action for a vector env: actions and their log-probabilities
+        with self.timer.phase("to_tensor"):
+            states = torch.as_tensor(states, dtype=torch.float32, device=self.device)
+        with self.timer.phase("forward"):
+            with torch.no_grad():
+                dist = torch.distributions.Categorical(self.policy_net(states))
+                actions = dist.sample()
+            return actions.cpu().numpy(), dist.log_prob(actions).cpu().numpy()
     
     def compute_returns(self, rewards, masks):
         returns = []
@@ -38,7 +82,71 @@ class PPO:
             returns.insert(0, R)
         return returns
     
+    def update(self, states, actions, log_probs, rewards, masks, batch_size=5):
+        with self.timer.phase("to_tensor"):
+            states = torch.FloatTensor(np.array(states)).to(self.device)
+            actions = torch.LongTensor(actions).to(self.device)
+            old_log_probs = torch.FloatTensor(log_probs).to(self.device)
+            returns = torch.FloatTensor(self.compute_returns(rewards, masks)).to(self.device)
+        return self.optimize(states, actions, old_log_probs, returns, batch_size)
+
+    def update_rollout(self, rollout, last_states, batch_size=5):
+        # Vector-env rollout of T steps x N envs, flattened after computing bootstrapped returns
+        with self.timer.phase("to_tensor"):
+            returns = bootstrapped_returns(self, np.array(rollout["rewards"]), np.array(rollout["masks"]), last_states)
+            states = torch.as_tensor(np.concatenate(rollout["states"]), device=self.device)
+            actions = torch.as_tensor(np.concatenate(rollout["actions"]), dtype=torch.long, device=self.device)
+            old_log_probs = torch.as_tensor(np.concatenate(rollout["extras"]), device=self.device)
+            returns = torch.as_tensor(returns.reshape(-1), device=self.device)
+        return self.optimize(states, actions, old_log_probs, returns, batch_size)
+
+    def sync_gradients(self):
+        if self.grad_sync is not None:
+            with self.timer.phase("allreduce"):
+                self.grad_sync()
+
+    def optimize(self, states, actions, old_log_probs, returns, batch_size=5):
+        # `batch_size` clipped-objective epochs over the whole batch
+        if self.return_normalizer is not None:
+            returns = self.return_normalizer(returns)
+
+        for _ in range(batch_size):
+            with self.timer.phase("forward"):
+                values = self.value_net(states).squeeze(-1)
+                advantages = returns - values.detach()
+
+                action_probs = self.policy_net(states)
+                dist = torch.distributions.Categorical(action_probs)
+                curr_log_probs = dist.log_prob(actions)
+
+                ratios = torch.exp(curr_log_probs - old_log_probs)
+                surr1 = ratios * advantages
+                surr2 = torch.clamp(ratios, 1 - self.clip_eps, 1 + self.clip_eps) * advantages
+
+                policy_loss = -torch.min(surr1, surr2).mean()
+                value_loss = F.mse_loss(values, returns)
+
+            if self.optimizer is not None:
+                with self.timer.phase("backward"):
+                    self.optimizer.zero_grad()
+                    (policy_loss + value_loss).backward()
+                self.sync_gradients()
+                with self.timer.phase("optimizer"):
+                    self.optimizer.step()
+            else:
+                with self.timer.phase("backward"):
+                    self.policy_optimizer.zero_grad()
+                    policy_loss.backward()
+                    self.value_optimizer.zero_grad()
+                    value_loss.backward()
+                self.sync_gradients()
+                with self.timer.phase("optimizer"):
+                    self.policy_optimizer.step()
+                    self.value_optimizer.step()
+        return policy_loss.item(), value_loss.item()
+    
     def train(self, max_steps=200000, batch_size=5):
+        self.timer.reset()  # Time the training loop only, not agent construction
         reward_records = []  # Store total reward per episode
         step_rewards = []  # Store (step, avg_reward) pairs
         total_steps = 0
@@ -56,8 +164,11 @@ class PPO:
                     break
                 
                 action, log_prob = self.select_action(state)
-                next_state, reward, terminated, truncated, _ = self.env.step(action)
+                with self.timer.phase("env_step"):
+                    next_state, reward, terminated, truncated, _ = self.env.step(action)
                 done = terminated or truncated
+                if self.recorder is not None:
+                    self.recorder.record(state, action, reward, terminated, truncated, next_state, log_prob)
 
                 states.append(state)
                 actions.append(action)
@@ -70,6 +181,9 @@ class PPO:
                 total_steps += 1
                 episode_steps += 1
                 
+                for hook in self.step_hooks:
+                    hook(total_steps)
+                
                 # Record average reward every 1,000 steps
                 if total_steps % 1000 == 0:
                     avg_reward = np.mean(reward_records[-50:]) if reward_records else 0
@@ -79,33 +193,8 @@ class PPO:
                 break
 
             # Perform PPO update
-            states = torch.FloatTensor(np.array(states)).to(self.device)
-            actions = torch.LongTensor(actions).to(self.device)
-            old_log_probs = torch.FloatTensor(log_probs).to(self.device)
-            returns = torch.FloatTensor(self.compute_returns(rewards, masks)).to(self.device)
-
-            for _ in range(batch_size):
-                values = self.value_net(states).squeeze(-1)
-                advantages = returns - values.detach()
-
-                action_probs = self.policy_net(states)
-                dist = torch.distributions.Categorical(action_probs)
-                curr_log_probs = dist.log_prob(actions)
-
-                ratios = torch.exp(curr_log_probs - old_log_probs)
-                surr1 = ratios * advantages
-                surr2 = torch.clamp(ratios, 1 - self.clip_eps, 1 + self.clip_eps) * advantages
-
-                policy_loss = -torch.min(surr1, surr2).mean()
-                value_loss = F.mse_loss(values, returns)
-
-                self.policy_optimizer.zero_grad()
-                policy_loss.backward()
-                self.policy_optimizer.step()
-
-                self.value_optimizer.zero_grad()
-                value_loss.backward()
-                self.value_optimizer.step()
+            if self.budget is None or not self.budget.evaluating:
+                self.update(states, actions, log_probs, rewards, masks, batch_size)
 
             reward_records.append(episode_reward)
             episode += 1
@@ -114,5 +203,16 @@ class PPO:
             if episode % 10 == 0:
                 avg_reward = np.mean(reward_records[-10:])
                 print(f"Steps: {total_steps}, Episode: {episode}, Avg Reward: {avg_reward:.1f}")
+                if self.timer.enabled:
+                    print(self.timer.report())
+
+            if self.budget is not None and self.budget.update(episode_reward, total_steps):
+                break
+
+        if self.budget is not None:
+            step_rewards = self.budget.finish(step_rewards, max_steps, np.mean(reward_records[-50:]) if reward_records else 0)
+        return step_rewards
 
-        return step_rewards 
+    def train_vector(self, envs, max_steps=200000, rollout_steps=32, seed=None):
+        # Training on a vector env (Algorithms/vector.py), e.g. Envs.remote.RemoteVectorEnv
+        return train_vectorized(self, envs, max_steps, rollout_steps, seed) 
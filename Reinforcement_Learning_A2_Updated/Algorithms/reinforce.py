@@ -3,9 +3,11 @@ import torch
 import torch.optim as optim
 import numpy as np
 from Models.networks import PolicyNetwork
+from Utils.timing import PhaseTimer
+from Utils.normalization import NormalizeObservation, ReturnNormalizer
 
 class REINFORCE:
-    def __init__(self, env, learning_rate=0.0005, gamma=0.99):
+    def __init__(self, env, learning_rate=0.0005, gamma=0.99, timer=None, normalize=False):
         self.env = env
         self.state_dim = env.observation_space.shape[0]
         self.action_dim = env.action_space.n
@@ -17,16 +19,34 @@ class REINFORCE:
         
         # Discount Factor
         self.gamma = gamma
+
+        # Hot-path phase timing (a disabled timer costs one method call per phase)
+        self.timer = timer if timer is not None else PhaseTimer(enabled=False)
+        # Callables run after every environment step with the global step count
+        self.step_hooks = []
+        # Optional Utils.budget.BudgetController that ends learning once the task is solved
+        self.budget = None
+        # Optional Utils.recorder.TrajectoryRecorder that streams every transition to disk
+        self.recorder = None
+
+        # Optional running normalization (Utils.normalization): observations through an
+        # env wrapper, returns with statistics kept across episodes
+        self.obs_normalizer = self.return_normalizer = None
+        if normalize:
+            self.env = self.obs_normalizer = NormalizeObservation(env)
+            self.return_normalizer = ReturnNormalizer(center=True)
         
     def select_action(self, state):
         # State to tensor and action probs
-        state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-        probs = self.policy_net(state)
-        # Action Sample
-        action_dist = torch.distributions.Categorical(probs)
-        action = action_dist.sample()
-        log_prob = action_dist.log_prob(action)
-        return action.item(), log_prob
+        with self.timer.phase("to_tensor"):
+            state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+        with self.timer.phase("forward"):
+            probs = self.policy_net(state)
+            # Action Sample
+            action_dist = torch.distributions.Categorical(probs)
+            action = action_dist.sample()
+            log_prob = action_dist.log_prob(action)
+            return action.item(), log_prob
     
     # Monte Carlo estimation of Q-Values
     def calculate_returns(self, rewards):
@@ -38,10 +58,32 @@ class REINFORCE:
             R = r + self.gamma * R
             returns.insert(0, R)
         returns = torch.tensor(returns).to(self.device)
+        if self.return_normalizer is not None:
+            return self.return_normalizer(returns)
         returns = (returns - returns.mean()) / (returns.std() + 1e-9)
         return returns
     
+    def update(self, log_probs, rewards):
+        # Calculate return
+        with self.timer.phase("to_tensor"):
+            returns = self.calculate_returns(rewards)
+        
+        # Calculate loss and update policy
+        with self.timer.phase("forward"):
+            policy_loss = []
+            for log_prob, R in zip(log_probs, returns):
+                policy_loss.append(-log_prob * R)  # Negative for gradient ascent
+            loss = torch.stack(policy_loss).sum()
+            
+        with self.timer.phase("backward"):
+            self.optimizer.zero_grad()
+            loss.backward()
+        with self.timer.phase("optimizer"):
+            self.optimizer.step()
+        return loss.item()
+    
     def train(self, max_steps=200000):
+        self.timer.reset()  # Time the training loop only, not agent construction
         reward_records = []  # Store total reward per episode
         step_rewards = []  # Store (step, avg_reward) pairs
         total_steps = 0
@@ -59,8 +101,11 @@ class REINFORCE:
                 
                 # Collect trajectory (Monte Carlo Method)
                 action, log_prob = self.select_action(state)
-                next_state, reward, terminated, truncated, _ = self.env.step(action)
+                with self.timer.phase("env_step"):
+                    next_state, reward, terminated, truncated, _ = self.env.step(action)
                 done = terminated or truncated
+                if self.recorder is not None:
+                    self.recorder.record(state, action, reward, terminated, truncated, next_state, log_prob.item())
                 
                 log_probs.append(log_prob)
                 rewards.append(reward)
@@ -68,6 +113,9 @@ class REINFORCE:
                 state = next_state
                 total_steps += 1
                 
+                for hook in self.step_hooks:
+                    hook(total_steps)
+                
                 # Record average reward every 1,000 steps
                 if total_steps % 1000 == 0:
                     avg_reward = np.mean(reward_records[-50:]) if reward_records else 0
@@ -76,18 +124,8 @@ class REINFORCE:
             if total_steps >= max_steps:
                 break    
                 
-            # Calculate return
-            returns = self.calculate_returns(rewards)
-            
-            # Calculate loss and update policy
-            policy_loss = []
-            for log_prob, R in zip(log_probs, returns):
-                policy_loss.append(-log_prob * R)  # Negative for gradient ascent
-                
-            self.optimizer.zero_grad()
-            loss = torch.stack(policy_loss).sum()
-            loss.backward()
-            self.optimizer.step()
+            if self.budget is None or not self.budget.evaluating:
+                self.update(log_probs, rewards)
             
             reward_records.append(episode_reward)
             episode += 1
@@ -96,5 +134,12 @@ class REINFORCE:
             if episode % 10 == 0:
                 avg_reward = np.mean(reward_records[-10:])
                 print(f"Steps: {total_steps}, Episode: {episode}, Avg Reward: {avg_reward:.1f}")
+                if self.timer.enabled:
+                    print(self.timer.report())
+
+            if self.budget is not None and self.budget.update(episode_reward, total_steps):
+                break
         
+        if self.budget is not None:
+            step_rewards = self.budget.finish(step_rewards, max_steps, np.mean(reward_records[-50:]) if reward_records else 0)
         return step_rewards  # Return list of (step, avg_reward) pairs
@@ -0,0 +1,161 @@
+# vector.py
+# Rollout collection from a vector env (gym.make_vec with same-step autoreset, or
+# Envs.remote.RemoteVectorEnv) shared by A2C and PPO. The agent acts for all envs
+# with one batched forward pass per step and is updated every `rollout_steps` vector
+# steps with returns bootstrapped from its critic. As in the single-env loops, a
+# terminated or truncated step ends its return (mask 0). The agent provides
+# select_actions(states) -> (actions, extras) and update_rollout(rollout).
+# `seed` is a run seed (expanded with env_seeds) or a list of per-env reset seeds.
+# DQNagent has its own off-policy loop below (train_vectorized_dqn).
+import numpy as np
+import torch
+
+def env_seeds(seed, num_envs, *key):
+    # Reset seeds for the envs of one run, drawn from a seed sequence keyed on the run's
+    # seed (and e.g. its rank). With seed + i, runs seeded s and s + 1 would share
+    # num_envs - 1 of their envs.
+    return [int(s) for s in np.random.SeedSequence(seed, spawn_key=key + (0,)).generate_state(num_envs)]
+
+def observe(agent, observations):
+    # The agent's observation normalizer, applied to a whole batch (it wraps a single env)
+    normalizer = agent.obs_normalizer
+    if normalizer is None:
+        return np.asarray(observations, dtype=np.float32)
+    if normalizer.training:
+        normalizer.obs_rms.update(observations)
+    return normalizer.normalize(observations)
+
+def bootstrapped_returns(agent, rewards, masks, last_states):
+    # rewards, masks: [T, N] -> discounted returns [T, N], starting from V(last_states)
+    with torch.no_grad():
+        last_values = agent.value_net(torch.as_tensor(last_states, device=agent.device)).squeeze(-1).cpu().numpy()
+    if agent.return_normalizer is not None:
+        # The critic is fit to returns divided by the running std (not centered); rewards are raw
+        last_values = last_values * float(agent.return_normalizer.return_rms.std)
+    returns = np.zeros_like(rewards, dtype=np.float32)
+    R = last_values
+    for step in reversed(range(len(rewards))):
+        R = rewards[step] + agent.gamma * R * masks[step]
+        returns[step] = R
+    return returns
+
+def train_vectorized(agent, envs, max_steps=200000, rollout_steps=32, seed=None):
+    agent.timer.reset()
+    reward_records = []  # Store total reward per episode
+    step_rewards = []  # Store (step, avg_reward) pairs
+    total_steps = 0
+    episode = 0
+    num_envs = envs.num_envs
+    episode_rewards = np.zeros(num_envs)
+    raw_states, _ = envs.reset(seed=env_seeds(seed, num_envs) if isinstance(seed, int) else seed)
+    states = observe(agent, raw_states)
+    stop = False
+
+    while total_steps < max_steps and not stop:
+        rollout = {"states": [], "actions": [], "rewards": [], "masks": [], "extras": []}
+        for _ in range(rollout_steps):
+            actions, extras = agent.select_actions(states)
+            with agent.timer.phase("env_step"):
+                raw_states, rewards, terminated, truncated, _ = envs.step(actions)
+            dones = terminated | truncated
+            rollout["states"].append(states)
+            rollout["actions"].append(actions)
+            rollout["rewards"].append(rewards)
+            rollout["masks"].append(1.0 - dones)
+            rollout["extras"].append(extras)
+            states = observe(agent, raw_states)
+
+            episode_rewards += rewards
+            for i in np.flatnonzero(dones):
+                reward_records.append(episode_rewards[i])
+                episode_rewards[i] = 0
+                episode += 1
+                if episode % 10 == 0:
+                    print(f"Steps: {total_steps + num_envs}, Episode: {episode}, Avg Reward: {np.mean(reward_records[-10:]):.1f}")
+                    if agent.timer.enabled:
+                        print(agent.timer.report())
+                if agent.budget is not None and agent.budget.update(reward_records[-1], total_steps + num_envs):
+                    stop = True
+
+            # One vector step is num_envs environment steps; hooks and the curve see each of them
+            for step in range(total_steps + 1, total_steps + num_envs + 1):
+                for hook in agent.step_hooks:
+                    hook(step)
+                if step % 1000 == 0:
+                    avg_reward = np.mean(reward_records[-50:]) if reward_records else 0
+                    step_rewards.append((step, avg_reward))
+            total_steps += num_envs
+            if total_steps >= max_steps or stop:
+                break
+
+        if total_steps >= max_steps or stop:
+            break
+        if agent.budget is None or not agent.budget.evaluating:
+            agent.update_rollout(rollout, states)
+
+    if agent.budget is not None:
+        step_rewards = agent.budget.finish(step_rewards, max_steps, np.mean(reward_records[-50:]) if reward_records else 0)
+    return step_rewards
+
+def train_vectorized_dqn(agent, envs, max_steps=200000, seed=None):
+    # Off-policy loop for DQNagent on a vector env: one batched epsilon-greedy action
+    # pass per vector step (select_actions), epsilon indexed by global step, and every
+    # env's transition learned from as in the single-env loop (one update per env step).
+    # A done transition never bootstraps, so the reset observation stands in for its
+    # next state. n-step sampling reads consecutive replay slots, which interleaved envs
+    # would mix, so it stays single-env.
+    if agent.n_step > 1:
+        raise ValueError("n-step returns need the single-env loop (the replay would interleave envs)")
+    agent.timer.reset()
+    agent.prepare_schedule(max_steps)
+    reward_records = []  # Store total reward per episode
+    step_rewards = []  # Store (step, avg_reward) pairs
+    total_steps = 0
+    episode = 0
+    num_envs = envs.num_envs
+    episode_rewards = np.zeros(num_envs)
+    raw_states, _ = envs.reset(seed=env_seeds(seed, num_envs) if isinstance(seed, int) else seed)
+    states = observe(agent, raw_states)
+    stop = False
+
+    while total_steps < max_steps and not stop:
+        agent.schedule_epsilon(total_steps)
+        actions = agent.select_actions(states)
+        with agent.timer.phase("env_step"):
+            raw_states, rewards, terminated, truncated, _ = envs.step(actions)
+        dones = terminated | truncated
+        next_states = observe(agent, raw_states)
+        if agent.budget is None or not agent.budget.evaluating:
+            for i in range(num_envs):
+                agent.learn(states[i], actions[i], rewards[i], next_states[i], dones[i])
+        states = next_states
+
+        episode_rewards += rewards
+        for i in np.flatnonzero(dones):
+            reward_records.append(episode_rewards[i])
+            episode_rewards[i] = 0
+            agent.end_episode()
+            episode += 1
+            if episode % 10 == 0:
+                print(f"Steps: {total_steps + num_envs}, Episode: {episode}, Avg Reward: {np.mean(reward_records[-10:]):.1f}, "
+                      f"Epsilon: {agent.epsilon:.3f}")
+                if agent.timer.enabled:
+                    print(agent.timer.report())
+                if agent.memory is not None:
+                    agent.memory.flush()
+            if agent.budget is not None and agent.budget.update(reward_records[-1], total_steps + num_envs):
+                stop = True
+
+        for step in range(total_steps + 1, total_steps + num_envs + 1):
+            for hook in agent.step_hooks:
+                hook(step)
+            if step % 1000 == 0:
+                avg_reward = np.mean(reward_records[-50:]) if reward_records else 0
+                step_rewards.append((step, avg_reward))
+        total_steps += num_envs
+
+    if agent.memory is not None:
+        agent.memory.flush()
+    if agent.budget is not None:
+        step_rewards = agent.budget.finish(step_rewards, max_steps, np.mean(reward_records[-50:]) if reward_records else 0)
+    return step_rewards
@@ -0,0 +1,15 @@
+# protocol.py
+# Little-endian framing between remote env clients and simulator servers. Every request
+# is op u8, env handle u32, argument i64:
+#   MAKE  (arg = length of the env id, followed by the id in UTF-8) -> handle u32, obs_dim u16, n_actions u16
+#   RESET (arg = seed, or -1 for none)                            -> reward f32 (0), terminated u8, truncated u8, obs
+#   STEP  (arg = action)                                          -> reward f32, terminated u8, truncated u8, obs
+# with obs as obs_dim float32. Envs live as long as the connection that made them, and
+# responses come back in request order, so clients may pipeline many requests.
+import struct
+
+REQUEST = struct.Struct("<BIq")
+MADE = struct.Struct("<IHH")
+RESULT = struct.Struct("<fBB")
+MAKE, RESET, STEP = 0, 1, 2
+NO_SEED = -1
@@ -0,0 +1,123 @@
+# remote.py
+# Many simulator-hosted env instances presented as one gymnasium vector env. The envs
+# are spread over a pool of persistent connections. On every step the requests for all
+# envs on a connection are written back to back before any response is read, and all
+# connections are driven at once from one asyncio loop, so a vector step costs about
+# one round trip instead of one per env.
+import asyncio
+import socket
+import gymnasium as gym
+import numpy as np
+from Envs.protocol import REQUEST, MADE, RESULT, MAKE, RESET, STEP, NO_SEED
+from Serving.protocol import parse_address
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def make(self, env_id, count):
+        name = env_id.encode()
+        self.writer.write((REQUEST.pack(MAKE, 0, len(name)) + name) * count)
+        return [MADE.unpack(await self.reader.readexactly(MADE.size)) for _ in range(count)]
+
+    async def call(self, requests, obs_dim, pipelined=True):
+        # requests: [(op, handle, arg)] -> [(reward, terminated, truncated, obs)]
+        size = RESULT.size + 4 * obs_dim
+        if pipelined:
+            self.writer.write(b"".join(REQUEST.pack(*request) for request in requests))
+            responses = [await self.reader.readexactly(size) for _ in requests]
+        else:
+            responses = []
+            for request in requests:
+                self.writer.write(REQUEST.pack(*request))
+                responses.append(await self.reader.readexactly(size))
+        return [RESULT.unpack_from(response) + (np.frombuffer(response, dtype="<f4", offset=RESULT.size),)
+                for response in responses]
+
+class RemoteVectorEnv(gym.vector.VectorEnv):
+    # Same-step autoreset, like gym.make_vec(..., autoreset_mode=SAME_STEP): when an env
+    # finishes, step() returns its reset observation and puts the last one in
+    # infos["final_obs"]. pipelined=False sends one request at a time (for comparison).
+    metadata = {"autoreset_mode": gym.vector.AutoresetMode.SAME_STEP}
+
+    def __init__(self, address, env_id, num_envs, connections=4, pipelined=True):
+        self.address = address
+        self.num_envs = num_envs
+        self.pipelined = pipelined
+        self.loop = asyncio.new_event_loop()
+        self.connections = self.loop.run_until_complete(self._connect(min(connections, num_envs)))
+        # Env i lives on connection i % len(connections)
+        self.slots = [[i for i in range(num_envs) if i % len(self.connections) == c] for c in range(len(self.connections))]
+        made = self.loop.run_until_complete(self._make(env_id))
+        self.handles = [0] * num_envs
+        for slots, results in zip(self.slots, made):
+            for i, (handle, obs_dim, n_actions) in zip(slots, results):
+                self.handles[i] = handle
+        self.obs_dim, n_actions = made[0][0][1], made[0][0][2]
+
+        self.single_observation_space = gym.spaces.Box(-np.inf, np.inf, (self.obs_dim,), np.float32)
+        self.single_action_space = gym.spaces.Discrete(n_actions)
+        self.observation_space = gym.vector.utils.batch_space(self.single_observation_space, num_envs)
+        self.action_space = gym.vector.utils.batch_space(self.single_action_space, num_envs)
+
+    async def _connect(self, count):
+        kind, target = parse_address(self.address)
+        connections = []
+        for _ in range(count):
+            if kind == "unix":
+                reader, writer = await asyncio.open_unix_connection(target)
+            else:
+                reader, writer = await asyncio.open_connection(*target)
+                writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connections.append(_Connection(reader, writer))
+        return connections
+
+    async def _make(self, env_id):
+        return await asyncio.gather(*(connection.make(env_id, len(slots))
+                                      for connection, slots in zip(self.connections, self.slots)))
+
+    def _call(self, requests):
+        # requests: {env index: (op, arg)} -> {env index: (reward, terminated, truncated, obs)}
+        async def run():
+            per_connection = [[i for i in slots if i in requests] for slots in self.slots]
+            results = await asyncio.gather(*(
+                connection.call([(requests[i][0], self.handles[i], requests[i][1]) for i in indices],
+                                self.obs_dim, self.pipelined)
+                for connection, indices in zip(self.connections, per_connection)))
+            return {i: result for indices, batch in zip(per_connection, results) for i, result in zip(indices, batch)}
+        return self.loop.run_until_complete(run())
+
+    def reset(self, seed=None, options=None):
+        # Env i is reset with seed + i, as in gymnasium's vector envs, or with seed[i] for a list
+        if seed is None:
+            seeds = [NO_SEED] * self.num_envs
+        elif isinstance(seed, int):
+            seeds = [seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+        results = self._call({i: (RESET, seeds[i]) for i in range(self.num_envs)})
+        return np.stack([results[i][3] for i in range(self.num_envs)]), {}
+
+    def step(self, actions):
+        results = self._call({i: (STEP, int(action)) for i, action in enumerate(actions)})
+        obs = np.stack([results[i][3] for i in range(self.num_envs)])
+        rewards = np.array([results[i][0] for i in range(self.num_envs)], dtype=np.float64)
+        terminated = np.array([results[i][1] for i in range(self.num_envs)], dtype=bool)
+        truncated = np.array([results[i][2] for i in range(self.num_envs)], dtype=bool)
+        infos = {}
+        done = np.flatnonzero(terminated | truncated)
+        if len(done):
+            # Finished envs are reset together in one more pipelined round trip
+            infos["final_obs"] = np.array([obs[i].copy() if i in done else None for i in range(self.num_envs)], dtype=object)
+            infos["_final_obs"] = terminated | truncated
+            resets = self._call({int(i): (RESET, NO_SEED) for i in done})
+            for i in done:
+                obs[i] = resets[int(i)][3]
+        return obs, rewards, terminated, truncated, infos
+
+    def close_extras(self, **kwargs):
+        for connection in self.connections:
+            connection.writer.close()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
@@ -0,0 +1,92 @@
+# sim_server.py
+# Local stand-in for a remote simulator: gymnasium envs behind a socket, with a fixed
+# delay before every response to model the network round trip and simulator queueing.
+# Requests are served concurrently, so pipelined clients overlap their delays.
+#   python -m Envs.sim_server --address 127.0.0.1:6000 --latency-ms 2
+import argparse
+import asyncio
+import os
+import gymnasium as gym
+import numpy as np
+from Envs.protocol import REQUEST, MADE, RESULT, MAKE, RESET, STEP, NO_SEED
+from Serving.protocol import parse_address
+
+class SimulatorServer:
+    def __init__(self, latency_ms=2.0):
+        self.latency = latency_ms / 1000
+
+    def _apply(self, envs, op, handle, arg, payload):
+        if op == MAKE:
+            env = gym.make(payload.decode())
+            handle = len(envs)
+            envs.append(env)
+            return MADE.pack(handle, env.observation_space.shape[0], env.action_space.n)
+        env = envs[handle]
+        if op == RESET:
+            obs, _ = env.reset(seed=None if arg == NO_SEED else arg)
+            return RESULT.pack(0.0, 0, 0) + np.asarray(obs, dtype="<f4").tobytes()
+        if op == STEP:
+            obs, reward, terminated, truncated, _ = env.step(arg)
+            return RESULT.pack(reward, terminated, truncated) + np.asarray(obs, dtype="<f4").tobytes()
+        raise ValueError(f"Unknown op {op}")
+
+    async def _delayed(self, envs, op, handle, arg, payload):
+        await asyncio.sleep(self.latency)
+        return self._apply(envs, op, handle, arg, payload)
+
+    async def handle(self, reader, writer):
+        envs = []
+        pending = asyncio.Queue()
+        responder = asyncio.create_task(self._respond(pending, writer))
+        try:
+            while True:
+                op, handle, arg = REQUEST.unpack(await reader.readexactly(REQUEST.size))
+                payload = await reader.readexactly(arg) if op == MAKE else b""
+                if op == MAKE:
+                    # Makes run in order so handles match the order of requests
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result(self._apply(envs, op, handle, arg, payload))
+                else:
+                    future = asyncio.create_task(self._delayed(envs, op, handle, arg, payload))
+                await pending.put(future)
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            await pending.put(None)
+            await responder
+            writer.close()
+            for env in envs:
+                env.close()
+
+    async def _respond(self, pending, writer):
+        while (future := await pending.get()) is not None:
+            writer.write(await future)
+            try:
+                await writer.drain()
+            except ConnectionResetError:
+                return
+
+    async def serve(self, address):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self.handle, path=target)
+        else:
+            server = await asyncio.start_server(self.handle, *target)
+        print(f"Simulating envs on {address} with {self.latency * 1000:.1f}ms latency", flush=True)
+        async with server:
+            await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in remote simulator server")
+    parser.add_argument("--address", type=str, default="127.0.0.1:6000", help="host:port or unix:/path.sock")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Delay before every reset/step response")
+    args = parser.parse_args()
+    try:
+        asyncio.run(SimulatorServer(args.latency_ms).serve(args.address))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
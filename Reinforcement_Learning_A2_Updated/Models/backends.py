@@ -0,0 +1,16 @@
+# backends.py
+# Opens a saved policy with the backend its file type needs. Each backend is imported
+# only when used, so .rlp files load without torch and .onnx files without torch.
+import os
+
+def open_policy(path, threads=1):
+    # .pt: agent checkpoint (torch), .rlp: Models/runtime.py (NumPy), .onnx: ONNX Runtime
+    extension = os.path.splitext(path)[1]
+    if extension == ".rlp":
+        from Models.runtime import NumpyPolicy
+        return NumpyPolicy(path)
+    if extension == ".onnx":
+        from Models.onnx_runtime import OnnxPolicy
+        return OnnxPolicy(path, threads)
+    from Models.policy import load_policy
+    return load_policy(path)
@@ -0,0 +1,124 @@
+# export.py
+# Writes a trained policy to the flat float32 format read by Models/runtime.py,
+# so acting processes only need NumPy, or to ONNX for Models/onnx_runtime.py.
+#   python -m Models.export checkpoints/PPO_seed42.pt --output policies/PPO_seed42.rlp
+#   python -m Models.export checkpoints/PPO_seed42.pt --output policies/PPO_seed42.onnx
+import argparse
+import importlib.util
+import json
+import os
+import numpy as np
+import torch
+import torch.nn as nn
+from Models.networks import DuelingDQN, PolicyNetwork
+from Models.policy import load_policy
+from Models.runtime import ALIGN, LENGTH, MAGIC, VERSION
+
+def _layer(network, name):
+    # Weights stored transposed, [in, out], so the runtime computes x @ W + b
+    layer = getattr(network, name)
+    return {f"{name}.weight": layer.weight.detach().numpy().T, f"{name}.bias": layer.bias.detach().numpy()}
+
+def export_policy(policy, path, **metadata):
+    # policy: a Models.policy.Policy (network plus optional observation normalization);
+    # metadata (JSON values) is stored in the header for readers
+    network = policy.network
+    arrays = {**_layer(network, "fc1"), **_layer(network, "fc2")}
+    if isinstance(network, DuelingDQN):
+        head, heads = "dueling", ["value", "advantage"]
+    else:
+        head, heads = ("softmax" if isinstance(network, PolicyNetwork) else "linear"), ["fc3"]
+    for name in heads:
+        arrays.update(_layer(network, name))
+    if policy.obs_rms is not None:
+        arrays["obs_mean"] = policy.obs_rms.mean
+        arrays["obs_std"] = policy.obs_rms.std
+
+    # Element offsets, each array starting on an ALIGN-byte boundary
+    step = ALIGN // 4
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = (offset, list(array.shape))
+        offset += -(-array.size // step) * step
+    header = {"version": VERSION, "output": policy.output, "head": head, "hidden": ["fc1", "fc2"],
+              "heads": heads, "clip": float(policy.clip), "arrays": layout, "metadata": metadata, "data_offset": 0}
+    # data_offset is part of the header it depends on, so iterate until it is stable
+    while True:
+        encoded = json.dumps(header).encode()
+        data_offset = -(-(len(MAGIC) + LENGTH.size + len(encoded)) // ALIGN) * ALIGN
+        if data_offset == header["data_offset"]:
+            break
+        header["data_offset"] = data_offset
+
+    data = np.zeros(offset, dtype="<f4")
+    for name, array in arrays.items():
+        start = layout[name][0]
+        data[start:start + array.size] = np.asarray(array, dtype=np.float32).ravel()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + LENGTH.pack(len(encoded)) + encoded)
+        f.write(b"\0" * (data_offset - f.tell()))
+        f.write(data.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+class DeployedPolicy(nn.Module):
+    # The network with its observation normalization folded in, as exported to ONNX
+    def __init__(self, policy):
+        super(DeployedPolicy, self).__init__()
+        self.network = policy.network
+        self.clip = policy.clip
+        self.normalize = policy.obs_rms is not None
+        if self.normalize:
+            self.register_buffer("obs_mean", torch.as_tensor(policy.obs_rms.mean, dtype=torch.float32))
+            self.register_buffer("obs_std", torch.as_tensor(policy.obs_rms.std, dtype=torch.float32))
+
+    def forward(self, obs):
+        if self.normalize:
+            obs = torch.clamp((obs - self.obs_mean) / self.obs_std, -self.clip, self.clip)
+        return self.network(obs)
+
+def export_onnx(policy, path, opset=18):
+    # Input "obs" [batch, obs_dim] with a dynamic batch axis; the single output is
+    # named after policy.output ("probs" or "q_values") so the runtime knows how to act
+    missing = [name for name in ("onnx", "onnxscript") if importlib.util.find_spec(name) is None]
+    if missing:
+        raise ImportError(f"ONNX export needs {' and '.join(missing)}: pip install -r requirements-onnx.txt")
+    model = DeployedPolicy(policy).eval()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    torch.onnx.export(model, (torch.zeros(1, policy.obs_dim),), tmp_path, input_names=["obs"],
+                      output_names=[policy.output], dynamic_shapes={"obs": {0: torch.export.Dim("batch")}},
+                      opset_version=opset, external_data=False, verbose=False)
+    os.replace(tmp_path, path)
+    return path
+
+def validate_onnx(policy, path, states, tolerance=1e-5):
+    # Largest difference between onnxruntime and torch outputs on `states`, relative to
+    # the largest output magnitude (at least 1) since Q-values can be far from unit scale
+    from Models.onnx_runtime import OnnxPolicy
+    expected = policy.outputs(states)
+    error = float(np.abs(OnnxPolicy(path).outputs(states) - expected).max() / max(1.0, np.abs(expected).max()))
+    if error > tolerance:
+        raise ValueError(f"ONNX outputs differ from torch by {error:.2e} (tolerance {tolerance:.0e})")
+    return error
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an agent checkpoint for the NumPy runtime")
+    parser.add_argument("checkpoint", help="Agent checkpoint saved with --checkpoint-dir")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Output file, .rlp (NumPy runtime) or .onnx (default: checkpoint path with .rlp)")
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.checkpoint)[0] + ".rlp"
+    policy = load_policy(args.checkpoint)
+    if output.endswith(".onnx"):
+        export_onnx(policy, output)
+        states = np.random.default_rng(0).standard_normal((1024, policy.obs_dim)).astype(np.float32)
+        print(f"ONNX outputs match torch within {validate_onnx(policy, output, states):.1e}")
+    else:
+        export_policy(policy, output)
+    print(f"Exported {args.checkpoint} to {output} ({os.path.getsize(output)} bytes)")
+
+if __name__ == "__main__":
+    main()
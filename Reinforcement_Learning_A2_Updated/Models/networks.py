@@ -13,6 +13,22 @@ class DQN(nn.Module):
         x = torch.relu(self.fc1(x))
         x = torch.relu(self.fc2(x))
         return self.fc3(x)
+
+class DuelingDQN(nn.Module):
+    # Same trunk as DQN with separate state-value and advantage heads:
+    # Q(s, a) = V(s) + A(s, a) - mean_a A(s, a)
+    def __init__(self, input_dim, output_dim):
+        super(DuelingDQN, self).__init__()
+        self.fc1 = nn.Linear(input_dim, 64)
+        self.fc2 = nn.Linear(64, 64)
+        self.value = nn.Linear(64, 1)
+        self.advantage = nn.Linear(64, output_dim)
+        
+    def forward(self, x):
+        x = torch.relu(self.fc1(x))
+        x = torch.relu(self.fc2(x))
+        advantage = self.advantage(x)
+        return self.value(x) + advantage - advantage.mean(dim=-1, keepdim=True)
     
 class PolicyNetwork(nn.Module):
     def __init__(self, input_dim, output_dim):
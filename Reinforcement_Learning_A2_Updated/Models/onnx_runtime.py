@@ -0,0 +1,37 @@
+# onnx_runtime.py
+# ONNX Runtime (CPU) backend for policies exported with Models.export.export_onnx.
+# onnxruntime is optional: pip install -r requirements-onnx.txt
+import numpy as np
+
+class OnnxPolicy:
+    # Same interface as Models.policy.Policy. Observation normalization is part of the
+    # exported graph, so normalize() is the identity here.
+    def __init__(self, path, threads=1):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("The ONNX backend needs onnxruntime: pip install -r requirements-onnx.txt") from e
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        output = self.session.get_outputs()[0]
+        self.output = output.name
+        self.obs_dim = self.session.get_inputs()[0].shape[1]
+        self.action_dim = output.shape[1]
+
+    def normalize(self, obs):
+        return np.asarray(obs, dtype=np.float32)
+
+    def outputs(self, obs):
+        # Action probabilities or Q-values, [N, action_dim]
+        return self.session.run(None, {"obs": self.normalize(obs)})[0]
+
+    def act(self, obs, greedy=False, rng=np.random):
+        # Same sampling rule as Models.policy.Policy.act
+        outputs = self.outputs(obs)
+        if self.output == "q_values" or greedy:
+            return outputs.argmax(axis=1), outputs
+        cdf = outputs.cumsum(axis=1)
+        draws = rng.random(len(outputs))[:, None] * cdf[:, -1:]
+        return (cdf <= draws).sum(axis=1).clip(max=outputs.shape[1] - 1), outputs
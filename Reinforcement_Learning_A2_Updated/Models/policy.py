@@ -0,0 +1,70 @@
+# policy.py
+import numpy as np
+import torch
+from Models.networks import DQN, DuelingDQN, PolicyNetwork
+from Utils.normalization import RunningMeanStd
+
+def build_network(agent_name, state):
+    # Rebuilds an agent's acting network from the shapes in its state_dict.
+    # Returns (network, output) with output "q_values" (DQN) or "probs" (policy agents).
+    input_dim = state["fc1.weight"].shape[1]
+    if agent_name == "DQNagent":
+        if "advantage.weight" in state:
+            return DuelingDQN(input_dim, state["advantage.weight"].shape[0]), "q_values"
+        return DQN(input_dim, state["fc3.weight"].shape[0]), "q_values"
+    return PolicyNetwork(input_dim, state["fc3.weight"].shape[0]), "probs"
+
+class Policy:
+    # Inference-only view of a trained agent: the acting network plus the observation
+    # normalization it was trained with. Works on [N, obs_dim] batches.
+    def __init__(self, network, output, obs_rms=None, clip=10.0):
+        self.network = network
+        self.output = output
+        self.obs_rms = obs_rms
+        self.clip = clip
+        self.obs_dim = network.fc1.in_features
+        with torch.no_grad():
+            self.action_dim = network(torch.zeros(1, self.obs_dim)).shape[-1]
+
+    def normalize(self, obs):
+        obs = np.asarray(obs, dtype=np.float32)
+        if self.obs_rms is None:
+            return obs
+        return np.clip((obs - self.obs_rms.mean) / self.obs_rms.std, -self.clip, self.clip).astype(np.float32)
+
+    def outputs(self, obs):
+        # Action probabilities or Q-values, [N, action_dim]
+        with torch.inference_mode():
+            return self.network(torch.from_numpy(self.normalize(obs))).numpy()
+
+    def act(self, obs, greedy=False, rng=np.random):
+        # Q-networks always act greedily; policies sample unless greedy=True.
+        # Sampling inverts each row's CDF with one uniform draw per row.
+        outputs = self.outputs(obs)
+        if self.output == "q_values" or greedy:
+            return outputs.argmax(axis=1), outputs
+        cdf = outputs.cumsum(axis=1)
+        draws = rng.random(len(outputs))[:, None] * cdf[:, -1:]
+        return (cdf <= draws).sum(axis=1).clip(max=outputs.shape[1] - 1), outputs
+
+def agent_policy(agent):
+    # Policy view of a live agent, sharing its network and normalization statistics
+    output = "q_values" if type(agent).__name__ == "DQNagent" else "probs"
+    normalizer = agent.obs_normalizer
+    if normalizer is None:
+        return Policy(agent.policy_net, output)
+    return Policy(agent.policy_net, output, normalizer.obs_rms, normalizer.clip)
+
+def load_policy(path):
+    # Policy from a Utils.checkpoint file (any agent); no env or optimizer needed
+    checkpoint = torch.load(path, map_location="cpu", weights_only=True)
+    state = checkpoint["state"]
+    network, output = build_network(checkpoint["agent"], state["policy_net"])
+    network.load_state_dict(state["policy_net"])
+    network.eval()
+    obs_rms, clip = None, 10.0
+    if "obs_normalizer" in state:
+        obs_rms = RunningMeanStd((network.fc1.in_features,))
+        obs_rms.load_state_dict(state["obs_normalizer"]["obs_rms"])
+        clip = state["obs_normalizer"]["clip"]
+    return Policy(network, output, obs_rms, clip)
@@ -0,0 +1,28 @@
+# quantize.py
+# Post-training dynamic int8 quantization (torch.ao): Linear weights are stored as int8
+# with a per-tensor scale and activations are quantized per batch at run time.
+# Works for PolicyNetwork, ValueNetwork, DQN and DuelingDQN.
+import copy
+import io
+import warnings
+import torch
+import torch.nn as nn
+
+def quantize_network(network):
+    # A quantized copy; the float network is left untouched
+    with warnings.catch_warnings():
+        # torch.ao marks its quantized tensor constructors as deprecated in favour of torchao
+        warnings.simplefilter("ignore", UserWarning)
+        return torch.ao.quantization.quantize_dynamic(copy.deepcopy(network).eval(), {nn.Linear}, dtype=torch.qint8)
+
+def quantize_policy(policy):
+    # Same observation normalization, int8 network
+    quantized = copy.copy(policy)
+    quantized.network = quantize_network(policy.network)
+    return quantized
+
+def state_bytes(network):
+    # Serialized size of the weights, the memory a host keeps per loaded policy
+    buffer = io.BytesIO()
+    torch.save(network.state_dict(), buffer)
+    return len(buffer.getvalue())
@@ -0,0 +1,76 @@
+# runtime.py
+# NumPy-only runtime for exported policies (see Models/export.py); never imports torch.
+# File layout: MAGIC, u32 header length, JSON header, zero padding to ALIGN bytes,
+# then every array as flat little-endian float32. The header lists each array's
+# offset and shape, so loading is a single np.memmap and the weights are views into it.
+import json
+import struct
+import numpy as np
+
+MAGIC = b"RLPOLICY"
+VERSION = 1
+ALIGN = 64
+LENGTH = struct.Struct("<I")
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an exported policy")
+        (length,) = LENGTH.unpack(f.read(LENGTH.size))
+        header = json.loads(f.read(length))
+    if header["version"] != VERSION:
+        raise ValueError(f"Unsupported policy format version {header['version']}")
+    return header
+
+class NumpyPolicy:
+    # Same interface as Models.policy.Policy: obs_dim, action_dim, output,
+    # normalize(obs), outputs(obs) and act(obs, greedy, rng) on [N, obs_dim] batches
+    def __init__(self, path):
+        header = read_header(path)
+        data = np.memmap(path, dtype="<f4", mode="r", offset=header["data_offset"])
+        arrays = {name: data[offset:offset + int(np.prod(shape))].reshape(shape)
+                  for name, (offset, shape) in header["arrays"].items()}
+        self.header = header
+        self.arrays = arrays
+        self.metadata = header.get("metadata", {})
+        self.output = header["output"]
+        self.head = header["head"]
+        self.clip = header["clip"]
+        # Hidden layers as (weight [in, out], bias [out]) pairs, applied with ReLU
+        self.hidden = [(arrays[f"{name}.weight"], arrays[f"{name}.bias"]) for name in header["hidden"]]
+        self.heads = [(arrays[f"{name}.weight"], arrays[f"{name}.bias"]) for name in header["heads"]]
+        self.obs_mean = arrays.get("obs_mean")
+        self.obs_std = arrays.get("obs_std")
+        self.obs_dim = self.hidden[0][0].shape[0]
+        self.action_dim = self.heads[-1][0].shape[1]
+
+    def normalize(self, obs):
+        obs = np.asarray(obs, dtype=np.float32)
+        if self.obs_mean is None:
+            return obs
+        return np.clip((obs - self.obs_mean) / self.obs_std, -self.clip, self.clip)
+
+    def outputs(self, obs):
+        # Action probabilities or Q-values, [N, action_dim]
+        x = self.normalize(obs)
+        for weight, bias in self.hidden:
+            x = np.maximum(x @ weight + bias, 0.0)
+        if self.head == "dueling":
+            (value_w, value_b), (advantage_w, advantage_b) = self.heads
+            advantage = x @ advantage_w + advantage_b
+            return x @ value_w + value_b + advantage - advantage.mean(axis=-1, keepdims=True)
+        weight, bias = self.heads[0]
+        x = x @ weight + bias
+        if self.head == "softmax":
+            x = np.exp(x - x.max(axis=-1, keepdims=True))
+            x /= x.sum(axis=-1, keepdims=True)
+        return x
+
+    def act(self, obs, greedy=False, rng=np.random):
+        # Same sampling rule as Models.policy.Policy.act
+        outputs = self.outputs(obs)
+        if self.output == "q_values" or greedy:
+            return outputs.argmax(axis=1), outputs
+        cdf = outputs.cumsum(axis=1)
+        draws = rng.random(len(outputs))[:, None] * cdf[:, -1:]
+        return (cdf <= draws).sum(axis=1).clip(max=outputs.shape[1] - 1), outputs
@@ -0,0 +1,84 @@
+# client.py
+import asyncio
+import socket
+import numpy as np
+from Serving.protocol import HELLO, HEADER, WANT_OUTPUTS, ERROR, OUTPUT_KINDS, PolicyError, parse_address
+
+def _encode(obs, obs_dim, outputs):
+    obs = np.asarray(obs, dtype="<f4").reshape(-1, obs_dim)
+    return HEADER.pack(len(obs), WANT_OUTPUTS if outputs else 0) + obs.tobytes()
+
+def _decode(header, body, action_dim):
+    rows, flags = HEADER.unpack(header)
+    if flags & ERROR:
+        raise PolicyError(body.decode("utf-8", errors="replace"))
+    actions = np.frombuffer(body, dtype="<i4", count=rows)
+    outputs = None
+    if flags & WANT_OUTPUTS:
+        outputs = np.frombuffer(body, dtype="<f4", offset=4 * rows).reshape(rows, action_dim)
+    return actions, outputs
+
+def _body_size(header, action_dim):
+    rows, flags = HEADER.unpack(header)
+    if flags & ERROR:
+        return rows  # Message length
+    return 4 * rows * (1 + (action_dim if flags & WANT_OUTPUTS else 0))
+
+class PolicyClient:
+    # Blocking client for simulators: act(obs) for one observation or an [N, obs_dim] batch
+    def __init__(self, address):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect(target)
+        self.obs_dim, self.action_dim, output = HELLO.unpack(self._recv(HELLO.size))
+        self.output = OUTPUT_KINDS[output]
+
+    def _recv(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Server closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def act(self, obs, outputs=False):
+        # Returns (actions, outputs); a single observation gives a scalar action
+        single = np.ndim(obs) == 1
+        self.sock.sendall(_encode(obs, self.obs_dim, outputs))
+        header = self._recv(HEADER.size)
+        actions, values = _decode(header, self._recv(_body_size(header, self.action_dim)), self.action_dim)
+        if single:
+            return int(actions[0]), None if values is None else values[0]
+        return actions, values
+
+    def close(self):
+        self.sock.close()
+
+class AsyncPolicyClient:
+    # asyncio client; one outstanding request per client object
+    @classmethod
+    async def connect(cls, address):
+        self = cls()
+        kind, target = parse_address(address)
+        if kind == "unix":
+            self.reader, self.writer = await asyncio.open_unix_connection(target)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(*target)
+        self.obs_dim, self.action_dim, output = HELLO.unpack(await self.reader.readexactly(HELLO.size))
+        self.output = OUTPUT_KINDS[output]
+        return self
+
+    async def act(self, obs, outputs=False):
+        self.writer.write(_encode(obs, self.obs_dim, outputs))
+        header = await self.reader.readexactly(HEADER.size)
+        body = await self.reader.readexactly(_body_size(header, self.action_dim))
+        return _decode(header, body, self.action_dim)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
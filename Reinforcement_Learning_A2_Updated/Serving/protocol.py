@@ -0,0 +1,33 @@
+# protocol.py
+# Little-endian binary framing shared by the server and the clients:
+#   hello    (server -> client, once): obs_dim u16, action_dim u16, output u8 (0 probs, 1 q_values)
+#   request  (client -> server): rows u16, flags u8, rows x obs_dim float32
+#   response (server -> client): rows u16, flags u8, rows int32 actions,
+#            then rows x action_dim float32 outputs when flags & WANT_OUTPUTS
+#   error    (server -> client, instead of a response): length u16, flags u8 with ERROR,
+#            then a UTF-8 message of `length` bytes; the connection stays usable
+# Responses on a connection come back in request order, so clients may pipeline.
+import struct
+
+HELLO = struct.Struct("<HHB")
+HEADER = struct.Struct("<HB")
+WANT_OUTPUTS = 1
+ERROR = 2
+OUTPUT_KINDS = ("probs", "q_values")
+
+class PolicyError(RuntimeError):
+    # The server could not act on a request (its batch's forward pass raised)
+    pass
+
+def error_frame(message, flags=0):
+    body = message.encode("utf-8")[:0xFFFF]
+    return HEADER.pack(len(body), flags | ERROR) + body
+
+def parse_address(address):
+    # "unix:/path/to.sock" or "host:port"
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Address must be unix:/path or host:port, got {address!r}")
+    return "tcp", (host, int(port))
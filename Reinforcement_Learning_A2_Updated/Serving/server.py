@@ -0,0 +1,188 @@
+# server.py
+# Asyncio inference server for a trained policy with dynamic batching: requests from
+# all connections are grouped into one forward pass of up to --max-batch rows, waiting
+# at most --max-wait-us after the first queued request.
+#   python -m Serving.server --checkpoint checkpoints/PPO_seed42.pt --address 127.0.0.1:5555
+# Exported .rlp and .onnx policies (Models/export.py) are served without torch. With
+# --watch DIR the server follows a learner's published weights (Serving/weights.py)
+# and swaps each new version in between batches.
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from Models.backends import open_policy
+from Serving.weights import WeightSubscriber
+from Serving.protocol import HELLO, HEADER, WANT_OUTPUTS, OUTPUT_KINDS, error_frame, parse_address
+
+class PolicyServer:
+    def __init__(self, policy, max_batch=256, max_wait_us=500, greedy=False, subscriber=None, poll_interval=0.1):
+        self.policy = policy
+        self.subscriber = subscriber
+        self.poll_interval = poll_interval
+        self.max_batch = max_batch
+        self.max_wait = max_wait_us / 1e6
+        self.greedy = greedy
+        self.queue = None  # Created inside the running loop
+        # One inference thread: the event loop keeps reading requests during a forward pass
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.stats = {"requests": 0, "rows": 0, "batches": 0}
+        self.obs_bytes = 4 * policy.obs_dim
+
+    async def handle(self, reader, writer):
+        writer.write(HELLO.pack(self.policy.obs_dim, self.policy.action_dim, OUTPUT_KINDS.index(self.policy.output)))
+        pending = asyncio.Queue()
+        responder = asyncio.create_task(self._respond(pending, writer))
+        try:
+            while True:
+                rows, flags = HEADER.unpack(await reader.readexactly(HEADER.size))
+                obs = np.frombuffer(await reader.readexactly(rows * self.obs_bytes), dtype="<f4").reshape(rows, self.policy.obs_dim)
+                future = asyncio.get_running_loop().create_future()
+                await self.queue.put((obs, future))
+                await pending.put((flags, future))
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            await pending.put(None)
+            await responder
+            writer.close()
+
+    async def _respond(self, pending, writer):
+        # Writes responses in request order; a failed batch answers each of its
+        # requests with an error frame, and the connection carries on
+        while (item := await pending.get()) is not None:
+            flags, future = item
+            try:
+                actions, outputs = await future
+            except Exception as e:
+                writer.write(error_frame(f"{type(e).__name__}: {e}", flags))
+            else:
+                parts = [HEADER.pack(len(actions), flags), actions.astype("<i4").tobytes()]
+                if flags & WANT_OUTPUTS:
+                    parts.append(outputs.astype("<f4").tobytes())
+                writer.write(b"".join(parts))
+            try:
+                await writer.drain()
+            except ConnectionResetError:
+                return
+
+    async def _next_batch(self):
+        # First request, then everything queued (or arriving within max_wait) up to max_batch rows
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while rows < self.max_batch:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def refresh(self):
+        # Swaps in a newly published version; in-flight batches finish on the old one
+        if not self.subscriber.poll():
+            return
+        policy = self.subscriber.policy
+        if (policy.obs_dim, policy.action_dim) != (self.policy.obs_dim, self.policy.action_dim):
+            print(f"Ignoring weights version {self.subscriber.version}: shape differs from the served policy", flush=True)
+            return
+        self.policy = policy
+        print(f"Serving weights version {self.subscriber.version} (step {self.subscriber.step})", flush=True)
+
+    async def batch_loop(self):
+        loop = asyncio.get_running_loop()
+        next_poll = 0.0
+        while True:
+            batch = await self._next_batch()
+            if self.subscriber is not None and loop.time() >= next_poll:
+                self.refresh()
+                next_poll = loop.time() + self.poll_interval
+            obs = np.concatenate([item[0] for item in batch])
+            try:
+                actions, outputs = await loop.run_in_executor(self.executor, self.policy.act, obs, self.greedy)
+            except Exception as e:
+                print(f"Batch of {len(obs)} rows failed: {type(e).__name__}: {e}", flush=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            start = 0
+            for item_obs, future in batch:
+                stop = start + len(item_obs)
+                if not future.done():
+                    future.set_result((actions[start:stop], outputs[start:stop]))
+                start = stop
+            self.stats["requests"] += len(batch)
+            self.stats["rows"] += len(obs)
+            self.stats["batches"] += 1
+
+    async def report(self, interval):
+        last, last_time = dict(self.stats), time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            batches = self.stats["batches"] - last["batches"]
+            rows = self.stats["rows"] - last["rows"]
+            if batches:
+                print(f"{rows / (now - last_time):.0f} rows/s, {batches / (now - last_time):.0f} batches/s, "
+                      f"mean batch {rows / batches:.1f}", flush=True)
+            last, last_time = dict(self.stats), now
+
+    async def serve(self, address, stats_interval=None):
+        self.queue = asyncio.Queue()
+        kind, target = parse_address(address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self.handle, path=target)
+        else:
+            server = await asyncio.start_server(self.handle, *target)
+        tasks = [asyncio.create_task(self.batch_loop())]
+        if stats_interval:
+            tasks.append(asyncio.create_task(self.report(stats_interval)))
+        print(f"Serving {self.policy.output} policy on {address} (max batch {self.max_batch}, "
+              f"max wait {self.max_wait * 1e6:.0f}us)", flush=True)
+        async with server:
+            await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic-batching policy inference server")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Agent checkpoint (.pt) or exported policy (.rlp, .onnx)")
+    parser.add_argument("--watch", type=str, default=None, metavar="DIR",
+                        help="Serve the newest weights published to DIR (main.py --publish-dir) instead")
+    parser.add_argument("--address", type=str, default="127.0.0.1:5555", help="host:port or unix:/path.sock")
+    parser.add_argument("--max-batch", type=int, default=256, help="Maximum rows per forward pass")
+    parser.add_argument("--max-wait-us", type=float, default=500, help="Longest wait for a batch to fill")
+    parser.add_argument("--greedy", action="store_true", help="Argmax actions for policy networks instead of sampling")
+    parser.add_argument("--stats-interval", type=float, default=None, help="Print throughput every N seconds")
+    args = parser.parse_args()
+    if (args.checkpoint is None) == (args.watch is None):
+        parser.error("Give exactly one of --checkpoint and --watch")
+
+    subscriber = None
+    if args.watch:
+        subscriber = WeightSubscriber(args.watch)
+        print(f"Waiting for published weights in {args.watch}", flush=True)
+        while not subscriber.poll():
+            time.sleep(0.5)
+        policy = subscriber.policy
+    else:
+        policy = open_policy(args.checkpoint)
+    server = PolicyServer(policy, args.max_batch, args.max_wait_us, args.greedy, subscriber)
+    try:
+        asyncio.run(server.serve(args.address, args.stats_interval))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
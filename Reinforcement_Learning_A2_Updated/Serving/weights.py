@@ -0,0 +1,97 @@
+# weights.py
+# Versioned weight publishing from a running learner to evaluation workers and servers.
+# The learner exports its acting policy (Models/export.py format) to
+# policy_v<version>.rlp and then atomically replaces LATEST, a small JSON pointer with
+# the version, file name and global step. Readers stat() the pointer, which costs
+# microseconds, and only open the new file when the version has moved on. The files are
+# memory-mapped by the NumPy runtime, so readers never need torch.
+import json
+import os
+import numpy as np
+from Models.runtime import NumpyPolicy
+
+POINTER = "LATEST"
+
+def read_pointer(directory):
+    try:
+        with open(os.path.join(directory, POINTER)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+class WeightPublisher:
+    # Also a step hook: agent.step_hooks.append(WeightPublisher(directory, agent, every=1000))
+    def __init__(self, directory, agent, every=1000, keep=3):
+        self.directory = directory
+        self.agent = agent
+        self.every = every
+        self.keep = keep  # Older files stay around briefly for readers that are mid-open
+        os.makedirs(directory, exist_ok=True)
+        latest = read_pointer(directory)
+        self.version = latest["version"] if latest else 0  # Monotonic across restarts
+        self.step = None  # Step of the last publish
+        self.last_step = 0  # Last step the agent took (early-stopped runs end before max_steps)
+
+    def __call__(self, total_steps):
+        self.last_step = total_steps
+        if total_steps % self.every == 0:
+            self.publish(total_steps)
+
+    def publish(self, step=None):
+        # Imported here so readers of this module never load torch
+        from Models.export import export_policy
+        from Models.policy import agent_policy
+        self.version += 1
+        name = f"policy_v{self.version}.rlp"
+        export_policy(agent_policy(self.agent), os.path.join(self.directory, name), version=self.version, step=step)
+        pointer = os.path.join(self.directory, POINTER)
+        tmp_path = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": self.version, "file": name, "step": step}, f)
+        os.replace(tmp_path, pointer)
+        self.step = step
+        stale = os.path.join(self.directory, f"policy_v{self.version - self.keep}.rlp")
+        if os.path.exists(stale):
+            os.remove(stale)
+        return self.version
+
+class WeightSubscriber:
+    # poll() picks up the newest published version; `policy` is then a NumpyPolicy
+    # (same interface as the torch Policy) and `step` the learner's step at publish time
+    def __init__(self, directory, version=0):
+        self.directory = directory
+        self.version = version  # Only versions after this one are picked up
+        self.step = None
+        self.policy = None
+        self._stamp = None
+
+    def poll(self):
+        # True when a newer version was loaded
+        try:
+            stat = os.stat(os.path.join(self.directory, POINTER))
+        except FileNotFoundError:
+            return False
+        stamp = (stat.st_ino, stat.st_mtime_ns)  # os.replace gives the pointer a new inode
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        latest = read_pointer(self.directory)
+        if latest is None or latest["version"] <= self.version:
+            return False
+        try:
+            self.policy = NumpyPolicy(os.path.join(self.directory, latest["file"]))
+        except FileNotFoundError:
+            self._stamp = None  # Already superseded and removed; the next poll reads the newer pointer
+            return False
+        self.version, self.step = latest["version"], latest["step"]
+        return True
+
+    def load_into(self, network):
+        # Copies the current weights into a torch network of the same architecture in
+        # place (exported weights are stored [in, out], torch keeps [out, in])
+        import torch
+        with torch.no_grad():
+            for name, parameter in network.named_parameters():
+                array = self.policy.arrays[name]
+                parameter.copy_(torch.from_numpy(np.array(array.T if array.ndim == 2 else array)))
+        return network
@@ -0,0 +1,207 @@
+# analysis.py
+# Vectorized bootstrap statistics for comparing algorithms across many runs.
+# Score arrays are [runs, checkpoints] (one task) or [runs, tasks, checkpoints];
+# every resample of every checkpoint is computed in batched numpy calls.
+#   python -m Utils.analysis --results-dir results
+import argparse
+import glob
+import json
+import os
+import pickle
+import numpy as np
+
+def results_to_array(step_rewards_list, common_steps=None):
+    # List of runs of (step, avg_reward) pairs -> (steps, [runs, checkpoints]) on a
+    # shared 1,000-step grid, interpolated the same way as plot_learning_curves
+    if common_steps is None:
+        max_steps = max(step for run in step_rewards_list for step, _ in run)
+        common_steps = np.arange(0, max_steps + 1000, 1000)
+    scores = np.empty((len(step_rewards_list), len(common_steps)))
+    for i, run in enumerate(step_rewards_list):
+        steps, rewards = (np.asarray(column, dtype=float) for column in zip(*run))
+        scores[i] = np.interp(common_steps, steps, rewards)
+    return common_steps, scores
+
+def load_results(results_dir="results"):
+    # {algorithm: (steps, [runs, checkpoints])} from every <algorithm>_rewards.pkl
+    loaded = {}
+    for path in sorted(glob.glob(os.path.join(results_dir, "*_rewards.pkl"))):
+        algo_name = os.path.basename(path)[:-len("_rewards.pkl")]
+        with open(path, "rb") as f:
+            runs = pickle.load(f)
+        if runs:
+            loaded[algo_name] = results_to_array(runs)
+    return loaded
+
+def _as_stratified(scores):
+    # -> [runs, tasks, checkpoints]
+    scores = np.asarray(scores, dtype=float)
+    if scores.ndim == 1:
+        return scores[:, None, None]
+    if scores.ndim == 2:
+        return scores[:, None, :]
+    return scores
+
+# Order statistics use a full sort: on [resamples, runs, checkpoints] blocks numpy's
+# sort along the runs axis is faster than np.partition/np.median
+def iqm(scores, axis=0):
+    # Interquartile mean: mean of the middle 50% after sorting along `axis`
+    scores = np.sort(scores, axis=axis)
+    n = scores.shape[axis]
+    cut = n // 4
+    return np.take(scores, np.arange(cut, n - cut), axis=axis).mean(axis=axis)
+
+def median(scores, axis=0):
+    scores = np.sort(scores, axis=axis)
+    n = scores.shape[axis]
+    return np.take(scores, np.arange((n - 1) // 2, n // 2 + 1), axis=axis).mean(axis=axis)
+
+def mean(scores, axis=0):
+    return np.mean(scores, axis=axis)
+
+STATISTICS = {"mean": mean, "median": median, "iqm": iqm}
+
+def _chunks(num_resamples, bytes_per_resample, max_chunk_bytes):
+    size = max(1, int(max_chunk_bytes // max(bytes_per_resample, 1)))
+    for start in range(0, num_resamples, size):
+        yield min(size, num_resamples - start)
+
+def _stratified_indices(rng, chunk, runs, tasks):
+    # Runs are resampled independently within each task (stratum)
+    return rng.integers(runs, size=(chunk, runs, tasks))
+
+def _stratified_counts(rng, chunk, runs, tasks):
+    # How often each run is drawn per task -> [chunk, runs * tasks] weights
+    counts = rng.multinomial(runs, np.full(runs, 1 / runs), size=(chunk, tasks))
+    return counts.transpose(0, 2, 1).reshape(chunk, runs * tasks).astype(np.float32)
+
+def bootstrap_ci(scores, statistic=iqm, num_resamples=2000, confidence=0.95, seed=0, max_chunk_bytes=1 << 28):
+    # Point estimate and percentile CI of `statistic` (pooled over runs x tasks) at
+    # every checkpoint. Returns three [checkpoints] arrays (scalars for 1-D input).
+    flat = np.ndim(scores) == 1
+    scores = _as_stratified(scores)
+    runs, tasks, checkpoints = scores.shape
+    rng = np.random.default_rng(seed)
+    task_index = np.arange(tasks)[None, None, :]
+
+    pooled = scores.reshape(runs * tasks, checkpoints).astype(np.float32)
+
+    estimates = []
+    for chunk in _chunks(num_resamples, pooled.nbytes, max_chunk_bytes):
+        if statistic is mean:
+            # The resampled mean is a weighted sum: one matmul per chunk
+            estimates.append(_stratified_counts(rng, chunk, runs, tasks) @ pooled / (runs * tasks))
+            continue
+        idx = _stratified_indices(rng, chunk, runs, tasks)
+        resampled = pooled.reshape(runs, tasks, checkpoints)[idx, task_index]  # [chunk, runs, tasks, checkpoints]
+        estimates.append(statistic(resampled.reshape(chunk, runs * tasks, checkpoints), axis=1))
+    estimates = np.concatenate(estimates)
+
+    alpha = (1 - confidence) / 2
+    point = statistic(scores.reshape(runs * tasks, checkpoints), axis=0)
+    low, high = np.quantile(estimates, [alpha, 1 - alpha], axis=0)
+    if flat:
+        return point[0], low[0], high[0]
+    return point, low, high
+
+def _average_ranks(values, axis):
+    # 1-based ranks along `axis` with ties sharing their average rank (batched)
+    values = np.moveaxis(values, axis, -1)
+    order = np.argsort(values, axis=-1, kind="stable")
+    sorted_values = np.take_along_axis(values, order, axis=-1)
+    n = values.shape[-1]
+    positions = np.broadcast_to(np.arange(n), sorted_values.shape)
+
+    new_group = np.ones(sorted_values.shape, dtype=bool)
+    new_group[..., 1:] = sorted_values[..., 1:] != sorted_values[..., :-1]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0), axis=-1)
+    group_end_flag = np.ones(sorted_values.shape, dtype=bool)
+    group_end_flag[..., :-1] = new_group[..., 1:]
+    group_end = n - 1 - np.maximum.accumulate(np.where(group_end_flag, n - 1 - positions, 0)[..., ::-1], axis=-1)[..., ::-1]
+
+    ranks = np.empty(sorted_values.shape)
+    np.put_along_axis(ranks, order, (group_start + group_end) / 2 + 1, axis=-1)
+    return np.moveaxis(ranks, -1, axis)
+
+def _probability_of_improvement(x, y):
+    # P(X > Y) + 0.5 P(X = Y) per task from Mann-Whitney U, averaged over tasks.
+    # x: [..., n, tasks, checkpoints], y: [..., m, tasks, checkpoints]
+    n, m = x.shape[-3], y.shape[-3]
+    ranks = _average_ranks(np.concatenate([x, y], axis=-3), axis=-3)
+    u = ranks[..., :n, :, :].sum(axis=-3) - n * (n + 1) / 2
+    return (u / (n * m)).mean(axis=-2)
+
+def probability_of_improvement(x, y, num_resamples=2000, confidence=0.95, seed=0, max_chunk_bytes=1 << 28):
+    # Probability that a run of algorithm X beats a run of algorithm Y at each
+    # checkpoint, with a stratified bootstrap CI (X and Y resampled independently)
+    flat = np.ndim(x) == 1
+    x, y = _as_stratified(x), _as_stratified(y)
+    n, tasks, checkpoints = x.shape
+    m = y.shape[0]
+    rng = np.random.default_rng(seed)
+    task_index = np.arange(tasks)[None, None, :]
+
+    estimates = []
+    bytes_per_resample = 4 * (x.nbytes + y.nbytes)  # Values, ranks and sort buffers
+    for chunk in _chunks(num_resamples, bytes_per_resample, max_chunk_bytes):
+        x_resampled = x[_stratified_indices(rng, chunk, n, tasks), task_index]
+        y_resampled = y[_stratified_indices(rng, chunk, m, tasks), task_index]
+        estimates.append(_probability_of_improvement(x_resampled, y_resampled))
+    estimates = np.concatenate(estimates)
+
+    alpha = (1 - confidence) / 2
+    point = _probability_of_improvement(x, y)
+    low, high = np.quantile(estimates, [alpha, 1 - alpha], axis=0)
+    if flat:
+        return point[0], low[0], high[0]
+    return point, low, high
+
+def summarize(loaded, statistics=("mean", "median", "iqm"), num_resamples=2000, confidence=0.95, seed=0):
+    # Whole-curve CIs per algorithm plus final-checkpoint pairwise probability of improvement
+    summary = {"curves": {}, "final": {}, "probability_of_improvement": {}}
+    for algo_name, (steps, scores) in loaded.items():
+        curves = {"steps": steps}
+        final = {"runs": scores.shape[0], "step": int(steps[-1])}
+        for name in statistics:
+            point, low, high = bootstrap_ci(scores, STATISTICS[name], num_resamples, confidence, seed)
+            curves[name] = np.stack([point, low, high])
+            final[name] = {"value": float(point[-1]), "ci_low": float(low[-1]), "ci_high": float(high[-1])}
+        summary["curves"][algo_name] = curves
+        summary["final"][algo_name] = final
+
+    names = list(loaded)
+    for a in names:
+        for b in names:
+            if a != b:
+                point, low, high = probability_of_improvement(loaded[a][1][:, -1], loaded[b][1][:, -1], num_resamples, confidence, seed)
+                summary["probability_of_improvement"][f"{a} > {b}"] = {"value": float(point), "ci_low": float(low), "ci_high": float(high)}
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals for saved results")
+    parser.add_argument("--results-dir", type=str, default="results", help="Directory with <algorithm>_rewards.pkl files")
+    parser.add_argument("--resamples", type=int, default=2000, help="Bootstrap resamples")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level")
+    parser.add_argument("--seed", type=int, default=0, help="Resampling seed")
+    args = parser.parse_args()
+
+    loaded = load_results(args.results_dir)
+    if not loaded:
+        raise SystemExit(f"No *_rewards.pkl files in {args.results_dir}")
+    summary = summarize(loaded, num_resamples=args.resamples, confidence=args.confidence, seed=args.seed)
+
+    # Whole-curve CIs as arrays ([point, low, high] x checkpoints), final scores as JSON
+    curves_path = os.path.join(args.results_dir, "analysis_curves.npz")
+    np.savez(curves_path, **{f"{algo}_{key}": value for algo, curves in summary["curves"].items() for key, value in curves.items()})
+    summary_path = os.path.join(args.results_dir, "analysis_summary.json")
+    with open(summary_path, "w") as f:
+        json.dump({"final": summary["final"], "probability_of_improvement": summary["probability_of_improvement"]}, f, indent=2)
+
+    print(f"{'Algorithm':<12} {'runs':>5} " + " ".join(f"{name:>24}" for name in ("mean", "median", "iqm")))
+    for algo_name, final in summary["final"].items():
+        cells = [f"{final[n]['value']:.1f} [{final[n]['ci_low']:.1f}, {final[n]['ci_high']:.1f}]" for n in ("mean", "median", "iqm")]
+        print(f"{algo_name:<12} {final['runs']:>5} " + " ".join(f"{c:>24}" for c in cells))
+    print(f"Curves saved to {curves_path}, summary to {summary_path}")
+
+if __name__ == "__main__":
+    main()
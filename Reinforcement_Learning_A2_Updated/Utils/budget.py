@@ -0,0 +1,53 @@
+# budget.py
+import numpy as np
+
+class BudgetController:
+    # Ends learning once the mean return of `window` consecutive episodes reaches
+    # `threshold` for `patience` windows in a row.
+    #   mode="stop":     the run stops and its (step, avg_reward) curve is padded to max_steps
+    #   mode="evaluate": the run keeps acting until max_steps without any updates,
+    #                    so the rest of the curve is measured rather than padded. It acts
+    #                    with the training policy (sampled actions, DQN's epsilon), so the
+    #                    curve reports exploring returns, not greedy ones
+    def __init__(self, threshold=475.0, window=50, patience=3, mode="stop"):
+        if mode not in ("stop", "evaluate"):
+            raise ValueError(f"Unknown budget mode: {mode}")
+        self.threshold = threshold
+        self.window = window
+        self.patience = patience
+        self.mode = mode
+        self.window_rewards = []
+        self.windows_passed = 0
+        self.triggered = False
+        self.triggered_at = None
+
+    @property
+    def evaluating(self):
+        return self.triggered and self.mode == "evaluate"
+
+    def update(self, episode_reward, total_steps):
+        # Call at every episode end; returns True when the run should stop
+        if self.triggered:
+            return self.mode == "stop"
+        self.window_rewards.append(episode_reward)
+        if len(self.window_rewards) < self.window:
+            return False
+
+        passed = np.mean(self.window_rewards) >= self.threshold
+        self.window_rewards = []
+        self.windows_passed = self.windows_passed + 1 if passed else 0
+        if self.windows_passed < self.patience:
+            return False
+
+        self.triggered = True
+        self.triggered_at = total_steps
+        print(f"Budget: criterion met at step {total_steps} ({self.patience} windows of {self.window} episodes >= {self.threshold:g}), mode={self.mode}")
+        return self.mode == "stop"
+
+    def finish(self, step_rewards, max_steps, avg_reward):
+        # Call after the training loop: for stopped runs, pads the 1,000-step
+        # (step, avg_reward) series with the final average up to max_steps
+        if self.triggered and self.mode == "stop":
+            last_step = step_rewards[-1][0] if step_rewards else 0
+            step_rewards = step_rewards + [(step, avg_reward) for step in range(last_step + 1000, max_steps + 1, 1000)]
+        return step_rewards
@@ -0,0 +1,25 @@
+# checkpoint.py
+import os
+import torch
+
+def agent_state(agent):
+    # state_dict of every network, optimizer and normalizer the agent holds
+    return {name: value.state_dict() for name, value in vars(agent).items()
+            if name != "env" and callable(getattr(value, "state_dict", None))}
+
+def save_checkpoint(agent, path, **extra):
+    # Written to a temporary file and renamed so a crash never leaves a partial checkpoint
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    checkpoint = {"agent": type(agent).__name__, "state": agent_state(agent), "extra": extra}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save(checkpoint, tmp_path)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(agent, path):
+    # Restores into an agent built with the same options; returns the saved extras
+    checkpoint = torch.load(path, map_location=getattr(agent, "device", "cpu"), weights_only=True)
+    if checkpoint["agent"] != type(agent).__name__:
+        raise ValueError(f"Checkpoint {path} is for {checkpoint['agent']}, not {type(agent).__name__}")
+    for name, state in checkpoint["state"].items():
+        getattr(agent, name).load_state_dict(state)
+    return checkpoint["extra"]
@@ -0,0 +1,143 @@
+# dataset.py
+# On-disk transition datasets for offline training. Recorded runs (compressed
+# chunks from Utils.recorder) are converted once into one uncompressed .npy file
+# per column, which np.load memory-maps, so datasets can be larger than RAM.
+#   python -m Utils.dataset trajectories/CartPole-v1/PPO_seed42 ... --output datasets/cartpole
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import numpy as np
+from Utils.recorder import COLUMNS, DTYPES
+
+def build_dataset(record_dirs, output_dir):
+    # Streams every chunk of the recorded runs into preallocated .npy columns
+    paths = [path for directory in record_dirs for path in sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))]
+    if not paths:
+        raise FileNotFoundError(f"No trajectory chunks in {record_dirs}")
+    sizes = []
+    for path in paths:
+        with np.load(path) as chunk:
+            sizes.append(len(chunk["reward"]))
+    with np.load(paths[0]) as chunk:
+        shapes = {name: chunk[name].shape[1:] for name in COLUMNS}
+
+    os.makedirs(output_dir, exist_ok=True)
+    total = sum(sizes)
+    columns = {name: np.lib.format.open_memmap(os.path.join(output_dir, f"{name}.npy"), mode="w+",
+                                               dtype=DTYPES[name], shape=(total,) + shapes[name])
+               for name in COLUMNS}
+    offset = 0
+    for path, size in zip(paths, sizes):
+        with np.load(path) as chunk:
+            for name in COLUMNS:
+                columns[name][offset:offset + size] = chunk[name]
+        offset += size
+    for column in columns.values():
+        column.flush()
+    with open(os.path.join(output_dir, "meta.json"), "w") as f:
+        json.dump({"size": total, "sources": list(record_dirs)}, f, indent=2)
+    return total
+
+def dataset_fingerprint(directory):
+    # Size and modification time of every column file: rebuilding a dataset in place
+    # changes it, so cached runs pretrained on the old data are not reused
+    fingerprint = {}
+    for name in COLUMNS:
+        stat = os.stat(os.path.join(directory, f"{name}.npy"))
+        fingerprint[name] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+class OfflineDataset:
+    # Read-only memory-mapped columns of a built dataset
+    def __init__(self, directory):
+        self.directory = directory
+        self.columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+
+    def __len__(self):
+        return len(self.columns["reward"])
+
+    @property
+    def obs_dim(self):
+        return self.columns["obs"].shape[1]
+
+_END = object()
+
+class BatchLoader:
+    # Shuffled minibatches of the given columns, one pass per iteration. A background
+    # thread gathers up to `prefetch` batches ahead while the caller trains on the
+    # current one (prefetch=0 gathers inline). Indices within a batch are sorted so
+    # every gather walks the memory-mapped files front to back.
+    def __init__(self, dataset, columns=COLUMNS, batch_size=256, prefetch=4, seed=0, drop_last=True):
+        self.dataset = dataset
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.drop_last = drop_last
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.dataset) // self.batch_size
+        return -(-len(self.dataset) // self.batch_size)
+
+    def _gather(self, indices):
+        return tuple(self.dataset.columns[name][indices] for name in self.columns)
+
+    def __iter__(self):
+        order = self.rng.permutation(len(self.dataset))
+        batches = [np.sort(order[start:start + self.batch_size])
+                   for start in range(0, len(self) * self.batch_size, self.batch_size)]
+        if self.prefetch <= 0:
+            for indices in batches:
+                yield self._gather(indices)
+            return
+
+        ready = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            # Gives up once the consumer has stopped iterating
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for indices in batches:
+                    if not put(self._gather(indices)):
+                        return
+                put(_END)
+            except Exception as e:  # Re-raised in the consuming thread
+                put(e)
+
+        thread = threading.Thread(target=produce, name="batch-prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a memory-mappable dataset from recorded trajectories")
+    parser.add_argument("record_dirs", nargs="+", help="Recorded run directories (with chunk_*.npz)")
+    parser.add_argument("--output", type=str, required=True, help="Dataset directory")
+    args = parser.parse_args()
+    total = build_dataset(args.record_dirs, args.output)
+    print(f"Dataset with {total} transitions saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
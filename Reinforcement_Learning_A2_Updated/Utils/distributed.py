@@ -0,0 +1,58 @@
+# distributed.py
+# Data-parallel training with torch.distributed (gloo, CPU). Every rank runs the same
+# agent on its own envs; parameters start identical (broadcast from rank 0) and every
+# optimizer step uses gradients averaged over all ranks, so the replicas stay in sync.
+# Ranks, world size and the rendezvous come from the environment set by torchrun:
+#   torchrun --standalone --nproc-per-node 4 main.py --algorithm ppo --distributed --num-envs 4
+import os
+import numpy as np
+import torch
+import torch.distributed as dist
+
+def init_distributed(backend="gloo"):
+    # Returns (rank, world_size); a no-op when already initialized
+    if not dist.is_initialized():
+        dist.init_process_group(backend)
+    return dist.get_rank(), dist.get_world_size()
+
+def launched_with_torchrun():
+    return "RANK" in os.environ and "WORLD_SIZE" in os.environ
+
+def rank_seed(seed, rank):
+    # Process seed (torch/numpy sampling) of one rank in a run, from a seed sequence keyed
+    # on (run seed, rank): seed + rank would collide with the next run's seeds
+    return int(np.random.SeedSequence(seed, spawn_key=(rank, 1)).generate_state(1)[0])
+
+def broadcast_parameters(modules, src=0):
+    with torch.no_grad():
+        for module in modules:
+            for tensor in list(module.parameters()) + list(module.buffers()):
+                dist.broadcast(tensor, src)
+
+class GradientAllReduce:
+    # Averages the gradients of `modules` over all ranks with one all_reduce of a flat
+    # buffer per call. Agents call it between backward() and the optimizer step.
+    def __init__(self, modules):
+        self.parameters = [parameter for module in modules for parameter in module.parameters()]
+        self.world_size = dist.get_world_size()
+
+    def __call__(self):
+        grads = [parameter.grad if parameter.grad is not None else torch.zeros_like(parameter)
+                 for parameter in self.parameters]
+        flat = torch.cat([grad.reshape(-1) for grad in grads])
+        dist.all_reduce(flat)
+        flat /= self.world_size
+        offset = 0
+        for parameter in self.parameters:
+            size = parameter.numel()
+            parameter.grad = flat[offset:offset + size].view_as(parameter)
+            offset += size
+
+def merge_curves(step_rewards):
+    # Per-rank (local_step, avg_reward) curves -> one curve in global steps (local step
+    # times world size) averaged over ranks; the same result on every rank
+    curves = [None] * dist.get_world_size()
+    dist.all_gather_object(curves, step_rewards)
+    length = min(len(curve) for curve in curves)
+    world_size = len(curves)
+    return [(curves[0][i][0] * world_size, float(np.mean([curve[i][1] for curve in curves]))) for i in range(length)]
@@ -0,0 +1,98 @@
+# evaluation.py
+# Episode returns of a policy from any backend (Models.policy.Policy, NumpyPolicy,
+# OnnxPolicy). The first reset is seeded with `seed` and sampled actions draw from
+# np.random, so after set_seeds(seed) every backend sees the same episodes.
+# EvalWorker runs greedy evaluations of published weights in a separate process.
+import json
+import multiprocessing
+import os
+import time
+import gymnasium as gym
+import numpy as np
+from Serving.weights import WeightSubscriber
+
+def evaluate_policy(policy, env, episodes=10, seed=42, greedy=False):
+    returns = []
+    state, _ = env.reset(seed=seed)
+    for _ in range(episodes):
+        done, episode_return = False, 0.0
+        while not done:
+            actions, _ = policy.act(np.asarray(state, dtype=np.float32)[None], greedy)
+            state, reward, terminated, truncated, _ = env.step(int(actions[0]))
+            episode_return += reward
+            done = terminated or truncated
+        returns.append(episode_return)
+        state, _ = env.reset()
+    return np.array(returns)
+
+def evaluate_vectorized(policy, envs, seed=0, greedy=True):
+    # One episode per env, all stepped together with one batched forward pass per
+    # step. Env i always starts from reset(seed=seed + i), so successive weight
+    # versions are scored on the same start states.
+    states = np.array([env.reset(seed=seed + i)[0] for i, env in enumerate(envs)], dtype=np.float32)
+    returns = np.zeros(len(envs))
+    active = np.arange(len(envs))
+    while len(active):
+        actions, _ = policy.act(states[active], greedy)
+        still_running = []
+        for i, action in zip(active, actions):
+            states[i], reward, terminated, truncated, _ = envs[i].step(int(action))
+            returns[i] += reward
+            if not (terminated or truncated):
+                still_running.append(i)
+        active = np.array(still_running, dtype=int)
+    return returns
+
+def _eval_loop(directory, env_id, output_path, episodes, seed, greedy, version, ready, stop):
+    # Worker process: evaluates the newest published version whenever one appears
+    # (versions published while an evaluation runs are skipped) and appends one JSON
+    # line per evaluation. After `stop` is set it still evaluates the last version.
+    subscriber = WeightSubscriber(directory, version)
+    envs = [gym.make(env_id) for _ in range(episodes)]
+    with open(output_path, "w") as f:
+        ready.set()
+        while True:
+            stopping = stop.is_set()
+            if subscriber.poll():
+                start = time.perf_counter()
+                returns = evaluate_vectorized(subscriber.policy, envs, seed, greedy)
+                f.write(json.dumps({"version": subscriber.version, "step": subscriber.step,
+                                    "eval_return": float(returns.mean()), "eval_std": float(returns.std()),
+                                    "episodes": episodes, "seconds": time.perf_counter() - start}) + "\n")
+                f.flush()
+            elif stopping:
+                break
+            else:
+                time.sleep(0.05)
+    for env in envs:
+        env.close()
+
+class EvalWorker:
+    # Periodic greedy evaluation in a separate process, fed by the weights a
+    # Serving.weights.WeightPublisher writes to `directory`. The learner only pays for
+    # publishing; evaluation episodes never run in the training loop.
+    def __init__(self, directory, env_id, output_path, episodes=10, seed=0, greedy=True, version=0):
+        self.output_path = output_path
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        # spawn: the worker must not inherit the learner's torch state through fork
+        context = multiprocessing.get_context("spawn")
+        ready, self.stop = context.Event(), context.Event()
+        self.process = context.Process(target=_eval_loop, name="eval-worker", daemon=True,
+                                       args=(directory, env_id, output_path, episodes, seed, greedy, version, ready, self.stop))
+        self.process.start()
+        # Startup (imports, envs) is waited for once here, so the first versions are not missed
+        while not ready.wait(timeout=1.0):
+            if not self.process.is_alive():
+                raise RuntimeError(f"Evaluation worker exited with code {self.process.exitcode}")
+
+    def close(self):
+        # Waits for the evaluation of the last published version; returns [(step, eval_return)]
+        self.stop.set()
+        self.process.join()
+        if self.process.exitcode != 0:
+            raise RuntimeError(f"Evaluation worker exited with code {self.process.exitcode}")
+        return [(record["step"], record["eval_return"]) for record in load_evaluations(self.output_path)]
+
+def load_evaluations(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,181 @@
+# job_queue.py
+# An experiment grid as a job queue in one SQLite file on a shared filesystem, so idle
+# machines can work through a sweep without a cluster manager. A job is one (algorithm,
+# env, seed) cell with its step budget and run options (`main.py enqueue`). Workers
+# (`main.py worker`) claim jobs inside a write transaction, so each claim goes to
+# exactly one worker. While a job runs, a background thread refreshes its heartbeat.
+# Claims re-queue running jobs whose heartbeat is older than `stale_after` seconds
+# (a crashed or disconnected host), up to `max_attempts` claims per job.
+#   python -m Utils.job_queue jobs.db [--retry-failed]
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    spec TEXT UNIQUE NOT NULL,
+    algorithm TEXT NOT NULL,
+    env_id TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    max_steps INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    heartbeat REAL,
+    finished REAL,
+    result TEXT,
+    error TEXT
+)"""
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    def __init__(self, path, timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+        with self._transaction() as db:
+            db.execute(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        # A short-lived connection per operation, so heartbeat threads never share one.
+        # BEGIN IMMEDIATE takes the write lock up front; concurrent writers wait up to
+        # `timeout`. The default rollback journal is kept: WAL needs shared memory,
+        # which network filesystems do not provide.
+        with closing(sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)) as db:
+            db.row_factory = sqlite3.Row
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def enqueue(self, jobs):
+        # jobs: dicts of algorithm, env_id, seed, max_steps, options. Returns how many were
+        # new; a job that is already queued (in any state) is left alone
+        with self._transaction() as db:
+            before = db.total_changes
+            for job in jobs:
+                db.execute("INSERT OR IGNORE INTO jobs (spec, algorithm, env_id, seed, max_steps, options) "
+                           "VALUES (?, ?, ?, ?, ?, ?)",
+                           (json.dumps(job, sort_keys=True), job["algorithm"], job["env_id"], job["seed"],
+                            job["max_steps"], json.dumps(job["options"], sort_keys=True)))
+            return db.total_changes - before
+
+    def claim(self, worker, stale_after=300.0, max_attempts=3):
+        # The oldest pending job, now running under `worker`, or None
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET worker = NULL, "
+                       "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                       "error = 'heartbeat lost on ' || worker WHERE status = 'running' AND heartbeat < ?",
+                       (max_attempts, now - stale_after))
+            row = db.execute("SELECT * FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, attempts = attempts + 1 "
+                       "WHERE id = ?", (worker, now, row["id"]))
+        job = dict(row, status=RUNNING, worker=worker, heartbeat=now, attempts=row["attempts"] + 1)
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def heartbeat(self, job_id, worker):
+        # False once the job is no longer running under this worker (it was re-queued)
+        with self._transaction() as db:
+            cursor = db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                                (time.time(), job_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        # False when the job is no longer running under this worker (it was re-queued),
+        # in which case the result is not recorded
+        with self._transaction() as db:
+            cursor = db.execute("UPDATE jobs SET status = 'done', finished = ?, result = ?, error = NULL "
+                                "WHERE id = ? AND worker = ? AND status = 'running'",
+                                (time.time(), json.dumps(result), job_id, worker))
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error):
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET status = 'failed', finished = ?, error = ? "
+                       "WHERE id = ? AND worker = ? AND status = 'running'", (time.time(), error, job_id, worker))
+
+    def release(self, job_id, worker):
+        # Hand a job back untouched (e.g. the worker was interrupted)
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET status = 'pending', worker = NULL, attempts = attempts - 1 "
+                       "WHERE id = ? AND worker = ? AND status = 'running'", (job_id, worker))
+
+    def retry_failed(self):
+        with self._transaction() as db:
+            return db.execute("UPDATE jobs SET status = 'pending', worker = NULL, attempts = 0, error = NULL "
+                              "WHERE status = 'failed'").rowcount
+
+    def counts(self):
+        with self._transaction() as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in (PENDING, RUNNING, DONE, FAILED)}
+
+    def jobs(self, status=None):
+        with self._transaction() as db:
+            if status is None:
+                rows = db.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+            else:
+                rows = db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)).fetchall()
+        return [dict(row) for row in rows]
+
+class Heartbeat:
+    # Refreshes a claimed job's heartbeat every `interval` seconds while the block runs
+    def __init__(self, queue, job_id, worker, interval=30.0):
+        self.queue, self.job_id, self.worker, self.interval = queue, job_id, worker, interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker):
+                    self.lost = True
+            except sqlite3.OperationalError:
+                pass  # Filesystem hiccup or a long lock; the next beat tries again
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Status of a job queue written by main.py enqueue")
+    parser.add_argument("queue", type=str, help="SQLite file of the queue")
+    parser.add_argument("--retry-failed", action="store_true", help="Put failed jobs back in the queue")
+    args = parser.parse_args()
+    queue = JobQueue(args.queue)
+    if args.retry_failed:
+        print(f"Re-queued {queue.retry_failed()} failed jobs")
+    print(", ".join(f"{status}: {count}" for status, count in queue.counts().items()))
+    now = time.time()
+    for job in queue.jobs(RUNNING):
+        print(f"  running #{job['id']} {job['algorithm']} {job['env_id']} seed {job['seed']} on {job['worker']} "
+              f"(heartbeat {now - job['heartbeat']:.0f}s ago, attempt {job['attempts']})")
+    for job in queue.jobs(FAILED):
+        last_line = (job["error"] or "").strip().splitlines()[-1:] or [""]
+        print(f"  failed #{job['id']} {job['algorithm']} {job['env_id']} seed {job['seed']}: {last_line[0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# normalization.py
+import gymnasium as gym
+import numpy as np
+
+class RunningMeanStd:
+    # Running mean/variance of a stream of arrays. Each update merges a whole
+    # [N, *shape] batch with the parallel (Chan et al.) form of Welford's update,
+    # so one call costs a few vectorized reductions however large N is.
+    def __init__(self, shape=(), epsilon=1e-4):
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.var = np.ones(shape, dtype=np.float64)
+        self.count = epsilon  # Pseudo-count keeps the first merge well defined
+
+    def update(self, batch):
+        batch = np.asarray(batch, dtype=np.float64).reshape((-1,) + self.mean.shape)
+        self.merge(batch.mean(axis=0), batch.var(axis=0), batch.shape[0])
+
+    def merge(self, batch_mean, batch_var, batch_count):
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        m2 = self.var * self.count + batch_var * batch_count + delta ** 2 * self.count * batch_count / total
+        self.mean = self.mean + delta * batch_count / total
+        self.var = m2 / total
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self.var + 1e-8)
+
+    def state_dict(self):
+        # Plain lists so checkpoints load with torch.load(weights_only=True)
+        return {"mean": self.mean.tolist(), "var": self.var.tolist(), "count": float(self.count)}
+
+    def load_state_dict(self, state):
+        self.mean = np.asarray(state["mean"], dtype=np.float64).reshape(self.mean.shape)
+        self.var = np.asarray(state["var"], dtype=np.float64).reshape(self.var.shape)
+        self.count = state["count"]
+
+class NormalizeObservation(gym.ObservationWrapper):
+    # Standardizes observations with running statistics and clips them to +-clip.
+    # Set `training = False` to freeze the statistics (e.g. for evaluation).
+    def __init__(self, env, clip=10.0):
+        super().__init__(env)
+        self.obs_rms = RunningMeanStd(env.observation_space.shape)
+        self.clip = clip
+        self.training = True
+
+    def observation(self, observation):
+        if self.training:
+            self.obs_rms.update(observation)
+        return self.normalize(observation)
+
+    def normalize(self, observations):
+        # Works for one observation or an [N, obs_dim] batch
+        normalized = (np.asarray(observations) - self.obs_rms.mean) / self.obs_rms.std
+        return np.clip(normalized, -self.clip, self.clip).astype(np.float32)
+
+    def state_dict(self):
+        return {"obs_rms": self.obs_rms.state_dict(), "clip": self.clip}
+
+    def load_state_dict(self, state):
+        self.obs_rms.load_state_dict(state["obs_rms"])
+        self.clip = state["clip"]
+
+class ReturnNormalizer:
+    # Scales discounted returns by running statistics over all episodes seen so far,
+    # instead of standardizing each episode on its own statistics. center=True also
+    # subtracts the running mean (a baseline for REINFORCE-style updates).
+    def __init__(self, center=True):
+        self.return_rms = RunningMeanStd()
+        self.center = center
+
+    def __call__(self, returns):
+        # returns: numpy array or tensor of one episode's (or rollout's) returns
+        values = returns.detach().cpu().numpy() if hasattr(returns, "detach") else returns
+        self.return_rms.update(values)
+        if self.center:
+            returns = returns - float(self.return_rms.mean)
+        return returns / float(self.return_rms.std)
+
+    def state_dict(self):
+        return {"return_rms": self.return_rms.state_dict(), "center": self.center}
+
+    def load_state_dict(self, state):
+        self.return_rms.load_state_dict(state["return_rms"])
+        self.center = state["center"]
@@ -0,0 +1,11 @@
+# optim.py
+import torch.optim as optim
+
+def make_joint_adam(param_groups):
+    # One Adam over several parameter groups (each group keeps its own "lr").
+    # Use the fused kernel when this torch build/device supports it, otherwise the
+    # multi-tensor foreach implementation, so a step is one kernel sequence for all groups.
+    try:
+        return optim.Adam(param_groups, fused=True)
+    except (RuntimeError, TypeError):
+        return optim.Adam(param_groups, foreach=True)
@@ -0,0 +1,32 @@
+# parallel.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+def _init_worker(threads):
+    # Each worker trains one small MLP at a time: more intra-op threads than cores
+    # per worker only oversubscribes the machine
+    import torch
+    torch.set_num_threads(threads)
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) // 2)
+
+def run_parallel(fn, tasks, workers=None, threads_per_worker=1):
+    # Runs fn(*task) for every task in a pool of spawned processes and yields
+    # (task, result) as each one finishes. workers=1 runs inline (no pickling),
+    # which is also the easiest way to debug a failing cell.
+    tasks = list(tasks)
+    workers = default_workers() if workers is None else workers
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield task, fn(*task)
+        return
+
+    # spawn: torch and gymnasium state must not be inherited through fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context,
+                             initializer=_init_worker, initargs=(threads_per_worker,)) as pool:
+        futures = {pool.submit(fn, *task): task for task in tasks}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,56 @@
+# profiling.py
+import os
+import torch
+from torch.profiler import profile, ProfilerActivity
+
+def parse_step_window(window):
+    # "START:END" -> (start, end) in environment steps
+    try:
+        start, end = (int(part) for part in window.split(":"))
+    except ValueError:
+        raise ValueError(f"Expected START:END, got {window!r}")
+    if not 0 <= start < end:
+        raise ValueError(f"Profile window needs 0 <= START < END, got {window!r}")
+    return start, end
+
+class ProfileWindow:
+    # Step hook that runs torch.profiler between two global step counts and writes a
+    # Chrome trace plus operator tables (by CPU time and by CPU memory) to output_dir.
+    def __init__(self, start, end, name, output_dir="results", row_limit=40):
+        self.start = start
+        self.end = end
+        self.name = name
+        self.output_dir = output_dir
+        self.row_limit = row_limit
+        self.profiler = None
+        self.finished = False
+
+    def __call__(self, total_steps):
+        if self.profiler is None and not self.finished and self.start <= total_steps < self.end:
+            activities = [ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(ProfilerActivity.CUDA)
+            self.profiler = profile(activities=activities, record_shapes=True, profile_memory=True)
+            self.profiler.__enter__()
+        elif self.profiler is not None and total_steps >= self.end:
+            self.close()
+
+    def close(self):
+        # Also called after training, in case the run ended inside the window
+        if self.profiler is None:
+            return
+        self.profiler.__exit__(None, None, None)
+        os.makedirs(self.output_dir, exist_ok=True)
+        trace_path = os.path.join(self.output_dir, f"{self.name}_trace.json")
+        table_path = os.path.join(self.output_dir, f"{self.name}_ops.txt")
+        self.profiler.export_chrome_trace(trace_path)
+
+        averages = self.profiler.key_averages()
+        with open(table_path, "w") as f:
+            f.write(f"Steps {self.start}:{self.end}, sorted by self CPU time\n")
+            f.write(averages.table(sort_by="self_cpu_time_total", row_limit=self.row_limit))
+            f.write("\n\nSorted by self CPU memory\n")
+            f.write(averages.table(sort_by="self_cpu_memory_usage", row_limit=self.row_limit))
+        print(f"Profiler trace written to {trace_path}, operator table to {table_path}")
+        self.profiler = None
+        self.finished = True
@@ -0,0 +1,87 @@
+# recorder.py
+import glob
+import os
+import queue
+import threading
+import numpy as np
+
+COLUMNS = ("obs", "action", "reward", "terminated", "truncated", "log_prob", "value", "next_obs")
+DTYPES = {"obs": np.float32, "action": np.int64, "reward": np.float32, "terminated": np.bool_,
+          "truncated": np.bool_, "log_prob": np.float32, "value": np.float32, "next_obs": np.float32}
+
+def existing_chunks(directory):
+    return sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+
+class TrajectoryRecorder:
+    # Streams every transition to compressed columnar chunks (chunk_000000.npz, ...).
+    # The training thread only appends to Python lists; full chunks go through a
+    # bounded queue to a background thread that builds the arrays and compresses them.
+    # When the writer falls `max_pending` chunks behind, record() blocks instead of
+    # letting memory grow. Missing log_prob/value (e.g. DQN) are stored as NaN.
+    # Every recording starts in an empty directory: runs are not resumed, so chunks left
+    # by an earlier run would be concatenated with this one by load_trajectories.
+    def __init__(self, directory, chunk_size=10000, max_pending=4):
+        if existing_chunks(directory):
+            raise FileExistsError(f"{directory} already holds a recorded run; delete it before re-recording")
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        self.buffers = {name: [] for name in COLUMNS}
+        self.chunks_written = 0
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.writer = threading.Thread(target=self._write_loop, name="trajectory-writer", daemon=True)
+        self.writer.start()
+
+    def record(self, obs, action, reward, terminated, truncated, next_obs, log_prob=np.nan, value=np.nan):
+        buffers = self.buffers
+        buffers["obs"].append(obs)
+        buffers["action"].append(action)
+        buffers["reward"].append(reward)
+        buffers["terminated"].append(terminated)
+        buffers["truncated"].append(truncated)
+        buffers["log_prob"].append(log_prob)
+        buffers["value"].append(value)
+        buffers["next_obs"].append(next_obs)
+        if len(buffers["obs"]) >= self.chunk_size:
+            self._submit()
+
+    def _submit(self):
+        if self.error is not None:
+            raise RuntimeError("Trajectory writer failed") from self.error
+        if self.buffers["obs"]:
+            self.pending.put((self.chunks_written, self.buffers))
+            self.chunks_written += 1
+            self.buffers = {name: [] for name in COLUMNS}
+
+    def _write_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, buffers = item
+            try:
+                arrays = {name: np.asarray(buffers[name], dtype=DTYPES[name]) for name in COLUMNS}
+                path = os.path.join(self.directory, f"chunk_{index:06d}.npz")
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.savez_compressed(f, **arrays)
+                os.replace(tmp_path, path)  # Readers never see a partial chunk
+            except Exception as e:  # Surfaced to the training thread on the next submit/close
+                self.error = e
+
+    def close(self):
+        # Writes the partial last chunk and waits for the writer to finish
+        self._submit()
+        self.pending.put(None)
+        self.writer.join()
+        if self.error is not None:
+            raise RuntimeError("Trajectory writer failed") from self.error
+
+def load_trajectories(directory):
+    # All recorded chunks concatenated in order: {column: array}
+    paths = sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+    if not paths:
+        raise FileNotFoundError(f"No trajectory chunks in {directory}")
+    chunks = [np.load(path) for path in paths]
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMNS}
@@ -0,0 +1,107 @@
+# replay.py
+import json
+import os
+import numpy as np
+
+class ReplayMemory:
+    # Fixed-capacity ring buffer of transitions stored as typed numpy columns
+    # (state/next_state float32 or float16, action uint8, reward float32, done bool).
+    # With `directory` every column is a .npy memmap on disk, so the capacity is bounded
+    # by disk rather than RAM, and flush() makes the contents survive a restart.
+    COLUMNS = ("state", "action", "reward", "next_state", "done")
+
+    def __init__(self, capacity, state_dim, obs_dtype=np.float32, action_dtype=np.uint8, directory=None):
+        self.capacity = capacity
+        self.directory = directory
+        self.specs = {
+            "state": ((capacity, state_dim), np.dtype(obs_dtype)),
+            "action": ((capacity,), np.dtype(action_dtype)),
+            "reward": ((capacity,), np.dtype(np.float32)),
+            "next_state": ((capacity, state_dim), np.dtype(obs_dtype)),
+            "done": ((capacity,), np.dtype(np.bool_)),
+        }
+        self.position = 0
+        self.size = 0
+        if directory is None:
+            self.data = {name: np.zeros(shape, dtype) for name, (shape, dtype) in self.specs.items()}
+        else:
+            self.data = self._open_memmaps()
+
+    def _meta_path(self):
+        return os.path.join(self.directory, "meta.json")
+
+    def _layout(self):
+        return {name: [list(shape), dtype.str] for name, (shape, dtype) in self.specs.items()}
+
+    def _open_memmaps(self):
+        # Reopen an existing buffer with the same layout, otherwise create empty files
+        os.makedirs(self.directory, exist_ok=True)
+        meta = None
+        if os.path.exists(self._meta_path()):
+            with open(self._meta_path()) as f:
+                meta = json.load(f)
+            if meta["layout"] != self._layout():
+                raise ValueError(f"Replay memory in {self.directory} has a different layout: {meta['layout']}")
+            self.position, self.size = meta["position"], meta["size"]
+        mode = "r+" if meta is not None else "w+"
+        return {name: np.lib.format.open_memmap(os.path.join(self.directory, f"{name}.npy"), mode=mode, dtype=dtype, shape=shape)
+                for name, (shape, dtype) in self.specs.items()}
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state, done):
+        i = self.position
+        self.data["state"][i] = state
+        self.data["action"][i] = action
+        self.data["reward"][i] = reward
+        self.data["next_state"][i] = next_state
+        self.data["done"][i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample_indices(self, batch_size):
+        # Sorted so a memmapped gather reads pages in file order
+        return np.sort(np.random.randint(0, self.size, size=batch_size))
+
+    def gather(self, indices):
+        # (states, actions, rewards, next_states, dones) for the given slots
+        return tuple(self.data[name][indices] for name in self.COLUMNS)
+
+    def sample(self, batch_size):
+        return self.gather(self.sample_indices(batch_size))
+
+    def sample_n_step(self, batch_size, n_step, gamma):
+        # n-step transitions built from consecutive slots in one vectorized gather:
+        # (states, actions, returns, next_states, dones, discounts) where returns sums
+        # gamma^k r_{t+k} up to the episode end or the newest stored transition, and
+        # discounts is gamma^steps for bootstrapping from the last next_state
+        indices = self.sample_indices(batch_size)
+        offsets = np.arange(n_step)
+        slots = (indices[:, None] + offsets) % self.capacity  # [batch, n_step]
+        rewards = self.data["reward"][slots]
+        dones = self.data["done"][slots]
+
+        # A step counts if it has been stored and no earlier step in the window ended the episode
+        newer = (self.position - 1 - indices) % self.capacity
+        ended_before = (np.cumsum(dones, axis=1) - dones) > 0
+        valid = (offsets <= newer[:, None]) & ~ended_before
+        steps = valid.sum(axis=1)
+        returns = (rewards * valid * gamma ** offsets).sum(axis=1, dtype=np.float32)
+
+        last = slots[np.arange(batch_size), steps - 1]
+        states, actions = self.data["state"][indices], self.data["action"][indices]
+        return states, actions, returns, self.data["next_state"][last], self.data["done"][last], gamma ** steps
+
+    def flush(self):
+        # Write dirty pages, then the ring position; the metadata is replaced atomically
+        # so a crash leaves the previous consistent state
+        if self.directory is None:
+            return
+        for column in self.data.values():
+            column.flush()
+        meta = {"position": self.position, "size": self.size, "layout": self._layout()}
+        tmp_path = f"{self._meta_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path())
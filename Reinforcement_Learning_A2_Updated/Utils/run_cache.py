@@ -0,0 +1,81 @@
+# run_cache.py
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import platform
+import sys
+import types
+import gymnasium
+import numpy as np
+import torch
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _is_project_module(module):
+    path = getattr(module, "__file__", None)
+    return path is not None and os.path.abspath(path).startswith(PROJECT_DIR + os.sep)
+
+def project_sources(*objects):
+    # Source text of every project module reachable from the given objects through
+    # module-level names, so editing any helper an algorithm uses invalidates its runs
+    pending = [inspect.getmodule(obj) for obj in objects]
+    seen = {}
+    while pending:
+        module = pending.pop()
+        if module is None or module.__name__ in seen or not _is_project_module(module):
+            continue
+        seen[module.__name__] = inspect.getsource(module)
+        for value in vars(module).values():
+            if isinstance(value, types.ModuleType):
+                pending.append(value)
+            elif isinstance(getattr(value, "__module__", None), str) and value.__module__ in sys.modules:
+                pending.append(sys.modules[value.__module__])
+    return dict(sorted(seen.items()))
+
+def run_key(algo_class, hyperparameters, seed, max_steps, env_id, factory=None, extra_code=()):
+    # Content hash of everything that determines a run's (step, avg_reward) series.
+    # `factory` is the function that builds the agent; only its own source is hashed.
+    # `extra_code` adds other drivers of the run (e.g. the ensemble trainer).
+    fields = {
+        "algorithm": algo_class.__name__,
+        "sources": project_sources(algo_class, *extra_code),
+        "factory": inspect.getsource(factory) if factory is not None else None,
+        "hyperparameters": hyperparameters,
+        "seed": seed,
+        "max_steps": max_steps,
+        "env_id": env_id,
+        "versions": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "numpy": np.__version__,
+            "gymnasium": gymnasium.__version__,
+        },
+    }
+    blob = json.dumps(fields, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+class RunCache:
+    # One pickle per run key: {"step_rewards": [...], "timing": {...}, "meta": {...}}
+    def __init__(self, cache_dir=".run_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, key, step_rewards, timing=None, meta=None):
+        # Write to a temporary file and rename so readers never see a partial entry
+        entry = {"step_rewards": step_rewards, "timing": timing, "meta": meta or {}}
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
@@ -0,0 +1,22 @@
+# schedules.py
+import numpy as np
+
+# Precomputed step-indexed schedules: value[t] for every global step t = 0..total_steps,
+# so the training loop does one array lookup per step instead of recomputing a decay
+
+def linear_schedule(start, end, decay_steps, total_steps):
+    # Straight line from start to end over decay_steps, then flat at end
+    progress = np.minimum(np.arange(total_steps + 1) / max(decay_steps, 1), 1.0)
+    return (start + (end - start) * progress).astype(np.float32)
+
+def exponential_schedule(start, end, decay_steps, total_steps):
+    # Constant per-step decay rate that reaches end at decay_steps, then flat at end
+    progress = np.minimum(np.arange(total_steps + 1) / max(decay_steps, 1), 1.0)
+    return (start * (end / start) ** progress).astype(np.float32)
+
+SCHEDULES = {"linear": linear_schedule, "exponential": exponential_schedule}
+
+def make_schedule(kind, start, end, decay_steps, total_steps):
+    if kind not in SCHEDULES:
+        raise ValueError(f"Unknown schedule: {kind}")
+    return SCHEDULES[kind](start, end, decay_steps, total_steps)
@@ -0,0 +1,71 @@
+# timing.py
+import time
+from contextlib import nullcontext
+
+# Hot-path phases reported in this order (any other phase name is appended after them)
+PHASES = ["env_step", "to_tensor", "forward", "backward", "allreduce", "optimizer"]
+
+_DISABLED = nullcontext()
+
+class _Phase:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        self.timer.totals_ns[self.name] = self.timer.totals_ns.get(self.name, 0) + elapsed
+        self.timer.calls[self.name] = self.timer.calls.get(self.name, 0) + 1
+        return False
+
+class PhaseTimer:
+    # Cumulative per-phase wall time from monotonic ns counters.
+    # A disabled timer hands out one shared no-op context, so instrumented loops
+    # only pay for a method call when timing is off.
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.totals_ns = {}
+        self.calls = {}
+        self.start_ns = time.perf_counter_ns()
+
+    def phase(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _Phase(self, name)
+
+    def reset(self):
+        self.totals_ns.clear()
+        self.calls.clear()
+        self.start_ns = time.perf_counter_ns()
+
+    def summary(self):
+        # Per-phase totals, call counts and rates; env steps are the "env_step" calls
+        wall_s = (time.perf_counter_ns() - self.start_ns) / 1e9
+        names = [p for p in PHASES if p in self.totals_ns] + [p for p in self.totals_ns if p not in PHASES]
+        phases = {}
+        for name in names:
+            total_s = self.totals_ns[name] / 1e9
+            calls = self.calls[name]
+            phases[name] = {
+                "total_s": total_s,
+                "calls": calls,
+                "mean_us": total_s / calls * 1e6,
+                "share": total_s / wall_s if wall_s > 0 else 0.0,
+            }
+        steps = self.calls.get("env_step", 0)
+        return {
+            "wall_s": wall_s,
+            "steps": steps,
+            "steps_per_sec": steps / wall_s if wall_s > 0 else 0.0,
+            "phases": phases,
+        }
+
+    def report(self):
+        summary = self.summary()
+        parts = [f"{name} {p['share'] * 100:.0f}% ({p['mean_us']:.0f}us x{p['calls']})" for name, p in summary["phases"].items()]
+        return f"  Timing: {summary['steps_per_sec']:.0f} steps/s | " + ", ".join(parts)
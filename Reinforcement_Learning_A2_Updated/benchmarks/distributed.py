@@ -0,0 +1,91 @@
+# distributed.py
+# Scaling efficiency of data-parallel A2C/PPO (Utils.distributed). Each world size is
+# launched with torchrun on this machine and every rank trains on a fixed number of
+# env steps (weak scaling), so ideal scaling keeps the time constant and multiplies
+# the throughput by the number of ranks:
+#   efficiency(N) = steps/s at N ranks / (N * steps/s at 1 rank)
+# Each worker also checks that the replicas still hold identical weights at the end.
+#   python -m benchmarks.distributed --algorithm ppo --world-sizes 1 2 4 --num-envs 4
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import gymnasium as gym
+import torch
+import torch.distributed as dist
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def worker(args):
+    from main import make_agent, make_vector_env, set_seeds
+    from Algorithms.vector import env_seeds
+    from Utils.distributed import init_distributed, rank_seed, broadcast_parameters, GradientAllReduce
+    from Utils.timing import PhaseTimer
+    rank, world_size = init_distributed()
+    set_seeds(rank_seed(0, rank))
+    agent = make_agent(args.algorithm.upper(), gym.make(args.env), timer=PhaseTimer(enabled=True))
+    networks = [agent.policy_net, agent.value_net]
+    broadcast_parameters(networks)
+    agent.grad_sync = GradientAllReduce(networks)
+    envs = make_vector_env(args.env, dict(num_envs=args.num_envs))
+
+    dist.barrier()
+    start = time.perf_counter()
+    agent.train_vector(envs, args.steps, args.rollout_steps, seed=env_seeds(0, args.num_envs, rank))
+    dist.barrier()
+    elapsed = time.perf_counter() - start
+
+    # Largest difference between any rank's weights and rank 0's
+    flat = torch.cat([p.detach().reshape(-1) for network in networks for p in network.parameters()])
+    reference = flat.clone()
+    dist.broadcast(reference, 0)
+    drift = torch.tensor([(flat - reference).abs().max().item()])
+    dist.all_reduce(drift, op=dist.ReduceOp.MAX)
+    phases = agent.timer.summary()["phases"]
+    if rank == 0:
+        with open(args.output, "w") as f:
+            json.dump(dict(seconds=elapsed, steps=args.steps * world_size, drift=drift.item(),
+                           allreduce_share=phases.get("allreduce", {}).get("share", 0.0)), f)
+    envs.close()
+    dist.destroy_process_group()
+
+def launch(args, world_size, output):
+    command = [sys.executable, "-m", "torch.distributed.run", "--standalone", f"--nproc-per-node={world_size}",
+               "-m", "benchmarks.distributed", "--worker", "--output", output, "--algorithm", args.algorithm,
+               "--env", args.env, "--steps", str(args.steps), "--num-envs", str(args.num_envs),
+               "--rollout-steps", str(args.rollout_steps)]
+    subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    with open(output) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Data-parallel A2C/PPO scaling efficiency")
+    parser.add_argument("--algorithm", type=str, default="ppo", choices=["a2c", "ppo"])
+    parser.add_argument("--env", type=str, default="CartPole-v1")
+    parser.add_argument("--world-sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--steps", type=int, default=20000, help="Env steps per rank")
+    parser.add_argument("--num-envs", type=int, default=4, help="Envs per rank")
+    parser.add_argument("--rollout-steps", type=int, default=32)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    print(f"{args.algorithm.upper()} on {args.env}, {args.steps} env steps and {args.num_envs} envs per rank, "
+          f"{os.cpu_count()} CPU cores")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for world_size in args.world_sizes:
+            result = launch(args, world_size, os.path.join(tmp, f"world{world_size}.json"))
+            rate = result["steps"] / result["seconds"]
+            if baseline is None:
+                baseline = rate / world_size
+            print(f"{world_size:>3} ranks: {rate:8.0f} env steps/s, efficiency {rate / (world_size * baseline) * 100:5.1f}%, "
+                  f"allreduce {result['allreduce_share'] * 100:4.1f}% of rank 0, replica drift {result['drift']:.1e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# fused_update.py
+# Per-update cost of separate policy/value optimizers vs one joint (fused/foreach) Adam.
+# Run from the project directory: python -m benchmarks.fused_update
+import argparse
+import time
+import gymnasium as gym
+import numpy as np
+import torch
+from Algorithms.a2c import A2C
+from Algorithms.actor_critic import ActorCritic
+from Algorithms.ppo import PPO
+
+def make_episode(agent, episode_length):
+    # Synthetic CartPole-sized episode, the same for both variants
+    states = np.random.randn(episode_length, agent.policy_net.fc1.in_features).astype(np.float32)
+    actions = np.random.randint(agent.policy_net.fc3.out_features, size=episode_length)
+    rewards = [1.0] * episode_length
+    return states, actions, rewards
+
+def time_update(agent, episode, repeats):
+    states, actions, rewards = episode
+    masks = [1.0] * (len(rewards) - 1) + [0.0]
+    state_batch = torch.as_tensor(states)
+    action_batch = torch.as_tensor(actions)
+    timings = []
+
+    for _ in range(repeats):
+        if isinstance(agent, PPO):
+            with torch.no_grad():
+                old_log_probs = torch.distributions.Categorical(agent.policy_net(state_batch)).log_prob(action_batch)
+            start = time.perf_counter()
+            agent.update(states, actions, old_log_probs.tolist(), rewards, masks)
+        else:
+            # Build the rollout graph outside the timed region, as the train loop does
+            log_probs = torch.distributions.Categorical(agent.policy_net(state_batch)).log_prob(action_batch)
+            values = agent.value_net(state_batch)
+            start = time.perf_counter()
+            agent.update([log_probs], [values], rewards)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark separate vs joint actor/critic optimizer steps")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed updates per variant")
+    parser.add_argument("--episode-length", type=int, default=200, help="Transitions per update")
+    args = parser.parse_args()
+
+    env = gym.make("CartPole-v1")
+    print(f"{'Algorithm':<12} {'separate (ms)':>14} {'fused (ms)':>12} {'speedup':>8}")
+    for agent_cls in [A2C, ActorCritic, PPO]:
+        medians = []
+        for fused_update in [False, True]:
+            torch.manual_seed(0)
+            np.random.seed(0)
+            agent = agent_cls(env, fused_update=fused_update)
+            episode = make_episode(agent, args.episode_length)
+            time_update(agent, episode, 10)  # Warm-up
+            medians.append(np.median(time_update(agent, episode, args.repeats)) * 1000)
+        print(f"{agent_cls.__name__:<12} {medians[0]:>14.3f} {medians[1]:>12.3f} {medians[0] / medians[1]:>7.2f}x")
+    env.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# matrix.py
+# Algorithm x env x seed benchmark matrix. Every cell trains in its own worker process
+# and reports throughput and final score, to show how each algorithm's cost scales
+# with observation size and episode length.
+#   python -m benchmarks.matrix --envs CartPole-v1 Acrobot-v1 MountainCar-v0 --seeds 3 --steps 50000
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import time
+import numpy as np
+from main import make_agent, make_env, set_seeds
+from benchmarks.sample_efficiency import ALGORITHMS, EpisodeClock, json_safe
+from Utils.analysis import bootstrap_ci, mean
+from Utils.parallel import run_parallel
+from Utils.timing import PhaseTimer
+
+METRICS = ["env_steps_per_sec", "updates_per_sec", "final_score", "mean_episode_length"]
+
+def run_cell(algo_name, env_id, seed, max_steps, verbose=False):
+    set_seeds(seed)
+    env = EpisodeClock(make_env(env_id))
+    timer = PhaseTimer(enabled=True)
+    agent = make_agent(algo_name, env, timer=timer)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(None if verbose else io.StringIO()):
+        agent.train(max_steps=max_steps)
+    wall = time.perf_counter() - start
+    env.close()
+
+    returns = [episode_return for _, _, episode_return in env.episodes]
+    return {
+        "algorithm": algo_name,
+        "env": env_id,
+        "seed": seed,
+        "obs_dim": env.observation_space.shape[0],
+        "episodes": len(env.episodes),
+        "mean_episode_length": env.total_steps / len(env.episodes) if env.episodes else np.nan,
+        "env_steps_per_sec": env.total_steps / wall,
+        "updates_per_sec": timer.calls.get("optimizer", 0) / wall,
+        "final_score": np.mean(returns[-50:]) if returns else np.nan,
+        "wall_s": wall,
+        "phase_share": {name: phase["share"] for name, phase in timer.summary()["phases"].items()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Algorithm x env x seed throughput and score matrix")
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument("--envs", nargs="+", default=["CartPole-v1", "Acrobot-v1", "MountainCar-v0"])
+    parser.add_argument("--seeds", type=int, default=3, help="Runs per (algorithm, env) cell")
+    parser.add_argument("--seed", type=int, default=42, help="First seed")
+    parser.add_argument("--steps", type=int, default=50000, help="Environment steps per run")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the cores, 1 = inline)")
+    parser.add_argument("--resamples", type=int, default=2000, help="Bootstrap resamples for the score CI")
+    parser.add_argument("--verbose", action="store_true", help="Show the agents' training logs")
+    parser.add_argument("--output", type=str, default="results/matrix", help="Output path without extension")
+    args = parser.parse_args()
+
+    for env_id in args.envs:
+        make_env(env_id).close()  # Fail on unsupported envs before starting any worker
+
+    tasks = [(algo_name, env_id, args.seed + run, args.steps, args.verbose)
+             for env_id in args.envs for algo_name in args.algorithms for run in range(args.seeds)]
+    records = []
+    for (algo_name, env_id, seed, _, _), record in run_parallel(run_cell, tasks, args.workers):
+        records.append(record)
+        print(f"[{len(records)}/{len(tasks)}] {algo_name} on {env_id} seed {seed}: "
+              f"{record['env_steps_per_sec']:.0f} steps/s, final score {record['final_score']:.1f}")
+
+    rows = []
+    for env_id in args.envs:
+        for algo_name in args.algorithms:
+            cell = [r for r in records if r["algorithm"] == algo_name and r["env"] == env_id]
+            row = {"algorithm": algo_name, "env": env_id, "obs_dim": cell[0]["obs_dim"], "runs": len(cell)}
+            for metric in METRICS:
+                row[metric] = float(np.mean([r[metric] for r in cell]))
+            _, row["final_score_ci_low"], row["final_score_ci_high"] = bootstrap_ci([r["final_score"] for r in cell], mean, args.resamples)
+            rows.append(row)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(f"{args.output}.json", "w") as f:
+        json.dump(json_safe({"config": vars(args), "cells": rows, "runs": sorted(records, key=lambda r: (r["env"], r["algorithm"], r["seed"]))}), f, indent=2)
+    with open(f"{args.output}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"\n{'Env':<16} {'Algorithm':<12} {'obs':>4} {'steps/s':>9} {'updates/s':>10} {'ep len':>7} {'final score':>26}")
+    for row in rows:
+        score = f"{row['final_score']:.1f} [{row['final_score_ci_low']:.1f}, {row['final_score_ci_high']:.1f}]"
+        print(f"{row['env']:<16} {row['algorithm']:<12} {row['obs_dim']:>4} {row['env_steps_per_sec']:>9.0f} "
+              f"{row['updates_per_sec']:>10.1f} {row['mean_episode_length']:>7.1f} {score:>26}")
+    print(f"Results saved to {args.output}.json and {args.output}.csv")
+
+if __name__ == "__main__":
+    main()
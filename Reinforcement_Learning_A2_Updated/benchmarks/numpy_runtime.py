@@ -0,0 +1,74 @@
+# numpy_runtime.py
+# Torch checkpoint loading against the exported NumPy runtime: cold-start time and
+# peak RSS of a fresh process that loads the policy and acts once, then per-call latency.
+#   python -m benchmarks.numpy_runtime --checkpoint checkpoints/PPO_seed42.pt
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from benchmarks.run import format_time, time_benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter; prints seconds spent in-process and peak RSS in MB (Linux)
+COLD_START = """
+import time
+start = time.perf_counter()
+import json
+import numpy as np
+from {module} import {loader}
+policy = {loader}({path!r})
+policy.act(np.zeros((1, policy.obs_dim), dtype=np.float32))
+seconds = time.perf_counter() - start
+# VmHWM restarts at exec, unlike ru_maxrss, which keeps the forking parent's peak
+with open("/proc/self/status") as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM"))
+print(json.dumps({{"seconds": seconds, "rss_mb": peak_kb / 1024}}))
+"""
+
+def cold_start(module, loader, path, repeats):
+    # Median over fresh processes, including interpreter startup
+    results = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", COLD_START.format(module=module, loader=loader, path=path)],
+                                cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        result["process_seconds"] = time.perf_counter() - start
+        results.append(result)
+    return {key: float(np.median([result[key] for result in results])) for key in results[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Torch vs NumPy-runtime policy startup and latency")
+    parser.add_argument("--checkpoint", type=str, required=True, help="Agent checkpoint saved with --checkpoint-dir")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh processes per cold-start measurement")
+    args = parser.parse_args()
+
+    from Models.export import export_policy
+    from Models.policy import load_policy
+    from Models.runtime import NumpyPolicy
+    checkpoint = os.path.abspath(args.checkpoint)
+    exported = os.path.join(tempfile.mkdtemp(prefix="policy_export_"), "policy.rlp")
+    export_policy(load_policy(checkpoint), exported)
+
+    backends = {"torch": ("Models.policy", "load_policy", checkpoint),
+                "numpy": ("Models.runtime", "NumpyPolicy", exported)}
+    for name, (module, loader, path) in backends.items():
+        result = cold_start(module, loader, path, args.repeats)
+        print(f"{name:>6} cold start: {result['process_seconds'] * 1000:.0f}ms per process "
+              f"({result['seconds'] * 1000:.0f}ms import+load+act), peak RSS {result['rss_mb']:.0f}MB")
+
+    policies = {"torch": load_policy(checkpoint), "numpy": NumpyPolicy(exported)}
+    rng = np.random.default_rng(0)
+    for batch_size in (1, 64, 1024):
+        obs = rng.standard_normal((batch_size, policies["torch"].obs_dim)).astype(np.float32)
+        for name, policy in policies.items():
+            result = time_benchmark(lambda: policy.act(obs), repeat=5, min_sample_time=0.05)
+            print(f"{name:>6} act, batch {batch_size:>4}: {format_time(result['median'])} per call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# offline_throughput.py
+# Loader and offline update throughput on a large synthetic memory-mapped dataset.
+#   python -m benchmarks.offline_throughput --transitions 5000000
+import argparse
+import itertools
+import os
+import tempfile
+import time
+import gymnasium as gym
+import numpy as np
+from Algorithms.offline import behaviour_cloning, train_dqn_offline
+from Utils.dataset import BatchLoader, OfflineDataset
+from Utils.recorder import COLUMNS, DTYPES
+from main import make_agent
+
+def write_synthetic(directory, transitions, obs_dim, chunk=1 << 20):
+    # Random CartPole-shaped transitions written column by column in chunks
+    rng = np.random.default_rng(0)
+    os.makedirs(directory, exist_ok=True)
+    for name in COLUMNS:
+        shape = (transitions, obs_dim) if name in ("obs", "next_obs") else (transitions,)
+        column = np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+", dtype=DTYPES[name], shape=shape)
+        for start in range(0, transitions, chunk):
+            stop = min(start + chunk, transitions)
+            if name in ("obs", "next_obs"):
+                column[start:stop] = rng.standard_normal((stop - start, obs_dim))
+            elif name == "action":
+                column[start:stop] = rng.integers(2, size=stop - start)
+            elif name in ("terminated", "truncated"):
+                column[start:stop] = rng.random(stop - start) < 0.01
+            else:
+                column[start:stop] = rng.standard_normal(stop - start)
+        column.flush()
+
+def loader_rate(dataset, columns, batch_size, prefetch, batches):
+    loader = BatchLoader(dataset, columns, batch_size, prefetch)
+    start = time.perf_counter()
+    count = sum(1 for _ in itertools.islice(loader, batches))
+    return count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline loader and update throughput")
+    parser.add_argument("--transitions", type=int, default=2000000, help="Synthetic dataset size")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batches", type=int, default=500, help="Batches timed per measurement")
+    parser.add_argument("--dir", type=str, default=None, help="Dataset directory (default: a temporary one)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="offline_dataset_")
+    if not os.path.exists(os.path.join(directory, "reward.npy")):
+        print(f"Writing {args.transitions} synthetic transitions to {directory}")
+        write_synthetic(directory, args.transitions, gym.make("CartPole-v1").observation_space.shape[0])
+    dataset = OfflineDataset(directory)
+    print(f"Dataset: {len(dataset)} transitions")
+
+    dqn_columns = ("obs", "action", "reward", "next_obs", "terminated")
+    for prefetch in (0, 4):
+        rate = loader_rate(dataset, dqn_columns, args.batch_size, prefetch, args.batches)
+        print(f"Loader, prefetch={prefetch}: {rate:.0f} batches/s ({rate * args.batch_size:.0f} transitions/s)")
+
+    for prefetch in (0, 4):
+        agent = make_agent("DQNAgent", gym.make("CartPole-v1"))
+        history = train_dqn_offline(agent, dataset, 1, args.batch_size, prefetch, max_batches=args.batches)
+        print(f"Offline DQN, prefetch={prefetch}: {history[-1]['updates_per_sec']:.0f} updates/s")
+        agent = make_agent("PPO", gym.make("CartPole-v1"))
+        history = behaviour_cloning(agent, dataset, 1, args.batch_size, prefetch, max_batches=args.batches)
+        print(f"Behaviour cloning, prefetch={prefetch}: {history[-1]['updates_per_sec']:.0f} updates/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# onnx_backend.py
+# Exports a checkpoint to ONNX, checks it against torch, then compares throughput of the
+# torch, NumPy and ONNX Runtime backends at batch sizes 1, 64 and 4096, and the
+# evaluation return of each backend under the same seeds.
+#   python -m benchmarks.onnx_backend --checkpoint checkpoints/PPO_seed42.pt
+import argparse
+import os
+import tempfile
+import numpy as np
+from Models.export import export_onnx, export_policy, validate_onnx
+from Models.onnx_runtime import OnnxPolicy
+from Models.policy import load_policy
+from Models.runtime import NumpyPolicy
+from Utils.evaluation import evaluate_policy
+from benchmarks.run import format_time, time_benchmark
+from main import DEFAULT_ENV, make_env, set_seeds
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX Runtime backend validation and throughput")
+    parser.add_argument("--checkpoint", type=str, required=True, help="Agent checkpoint saved with --checkpoint-dir")
+    parser.add_argument("--env", type=str, default=DEFAULT_ENV, help="Environment for the evaluation returns")
+    parser.add_argument("--episodes", type=int, default=10, help="Evaluation episodes per backend")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="policy_export_")
+    policy = load_policy(args.checkpoint)
+    onnx_path = export_onnx(policy, os.path.join(directory, "policy.onnx"))
+    rlp_path = export_policy(policy, os.path.join(directory, "policy.rlp"))
+    states = np.random.default_rng(args.seed).standard_normal((4096, policy.obs_dim)).astype(np.float32)
+    print(f"ONNX outputs match torch within {validate_onnx(policy, onnx_path, states):.1e}")
+
+    backends = {"torch": policy, "numpy": NumpyPolicy(rlp_path), "onnx": OnnxPolicy(onnx_path)}
+    for batch_size in (1, 64, 4096):
+        obs = states[:batch_size]
+        for name, backend in backends.items():
+            result = time_benchmark(lambda: backend.outputs(obs), repeat=5, min_sample_time=0.05)
+            print(f"{name:>6}, batch {batch_size:>4}: {format_time(result['median'])} per call, "
+                  f"{batch_size / result['median']:.0f} states/s")
+
+    env = make_env(args.env)
+    for name, backend in backends.items():
+        set_seeds(args.seed)
+        returns = evaluate_policy(backend, env, args.episodes, args.seed)
+        print(f"{name:>6} evaluation: mean return {returns.mean():.1f} over {args.episodes} episodes")
+
+if __name__ == "__main__":
+    main()
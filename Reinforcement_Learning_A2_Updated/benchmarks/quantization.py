@@ -0,0 +1,75 @@
+# quantization.py
+# Float against dynamic int8 policies: action agreement on held-out states visited by
+# the float policy, evaluation return delta under the same seeds, per-call latency and
+# weight memory. The value network of actor-critic checkpoints is compared as well.
+#   python -m benchmarks.quantization --checkpoint checkpoints/PPO_seed42.pt
+import argparse
+import numpy as np
+import torch
+from Models.networks import ValueNetwork
+from Models.policy import load_policy
+from Models.quantize import quantize_network, quantize_policy, state_bytes
+from Utils.evaluation import evaluate_policy
+from benchmarks.run import format_time, time_benchmark
+from main import DEFAULT_ENV, make_env, set_seeds
+
+def held_out_states(policy, env, count, seed):
+    # States from float-policy episodes with a seed the evaluation does not use
+    set_seeds(seed)
+    states = []
+    state, _ = env.reset(seed=seed)
+    while len(states) < count:
+        states.append(state)
+        actions, _ = policy.act(np.asarray(state, dtype=np.float32)[None])
+        state, _, terminated, truncated, _ = env.step(int(actions[0]))
+        if terminated or truncated:
+            state, _ = env.reset()
+    return np.array(states, dtype=np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic int8 quantization of a trained policy")
+    parser.add_argument("--checkpoint", type=str, required=True, help="Agent checkpoint saved with --checkpoint-dir")
+    parser.add_argument("--env", type=str, default=DEFAULT_ENV)
+    parser.add_argument("--states", type=int, default=10000, help="Held-out states for the agreement rate")
+    parser.add_argument("--episodes", type=int, default=20, help="Evaluation episodes per model")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    env = make_env(args.env)
+    policy = load_policy(args.checkpoint)
+    quantized = quantize_policy(policy)
+    states = held_out_states(policy, env, args.states, args.seed + 1000)
+
+    float_outputs, int8_outputs = policy.outputs(states), quantized.outputs(states)
+    agreement = (float_outputs.argmax(axis=1) == int8_outputs.argmax(axis=1)).mean()
+    print(f"Greedy action agreement on {len(states)} held-out states: {agreement:.2%}")
+    print(f"Max |{policy.output} difference|: {np.abs(float_outputs - int8_outputs).max():.2e}")
+
+    returns = {}
+    for name, model in (("float32", policy), ("int8", quantized)):
+        set_seeds(args.seed)
+        returns[name] = evaluate_policy(model, env, args.episodes, args.seed)
+    print(f"Evaluation return: float32 {returns['float32'].mean():.1f}, int8 {returns['int8'].mean():.1f} "
+          f"(delta {returns['int8'].mean() - returns['float32'].mean():+.1f} over {args.episodes} episodes)")
+
+    for batch_size in (1, 64, 1024):
+        obs = states[:batch_size]
+        times = {name: time_benchmark(lambda: model.outputs(obs), repeat=5, min_sample_time=0.05)["median"]
+                 for name, model in (("float32", policy), ("int8", quantized))}
+        print(f"Batch {batch_size:>4}: float32 {format_time(times['float32'])}, int8 {format_time(times['int8'])} "
+              f"({times['float32'] / times['int8']:.2f}x)")
+    float_bytes, int8_bytes = state_bytes(policy.network), state_bytes(quantized.network)
+    print(f"Policy weights: float32 {float_bytes} bytes, int8 {int8_bytes} bytes ({float_bytes / int8_bytes:.2f}x smaller)")
+
+    state = torch.load(args.checkpoint, map_location="cpu", weights_only=True)["state"]
+    if "value_net" in state:
+        value_net = ValueNetwork(states.shape[1]).eval()
+        value_net.load_state_dict(state["value_net"])
+        with torch.inference_mode():
+            obs = torch.from_numpy(policy.normalize(states))
+            error = (value_net(obs) - quantize_network(value_net)(obs)).abs()
+        print(f"Value network: mean |V difference| {error.mean():.3e}, max {error.max():.3e}, "
+              f"weights {state_bytes(value_net)} -> {state_bytes(quantize_network(value_net))} bytes")
+
+if __name__ == "__main__":
+    main()
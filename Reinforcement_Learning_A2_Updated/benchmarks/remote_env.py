@@ -0,0 +1,75 @@
+# remote_env.py
+# Env steps/s against a stand-in simulator server with a fixed per-request latency:
+# one request at a time, pipelined on one connection, and pipelined over a pool,
+# then PPO training on the remote vector env against the same envs in-process.
+#   python -m benchmarks.remote_env --latency-ms 2 --num-envs 16
+import argparse
+import os
+import subprocess
+import sys
+import time
+import gymnasium as gym
+import numpy as np
+from Envs.remote import RemoteVectorEnv
+from main import make_agent, make_vector_env
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def wait_for_server(address, env_id, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return RemoteVectorEnv(address, env_id, 1, 1)
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.1)
+
+def step_rate(envs, steps):
+    rng = np.random.default_rng(0)
+    envs.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        envs.step(rng.integers(envs.single_action_space.n, size=envs.num_envs))
+    return steps * envs.num_envs / (time.perf_counter() - start)
+
+def train_rate(envs, env_id, max_steps):
+    agent = make_agent("PPO", gym.make(env_id))
+    start = time.perf_counter()
+    agent.train_vector(envs, max_steps, seed=0)
+    return max_steps / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Remote vector env throughput")
+    parser.add_argument("--env", type=str, default="CartPole-v1")
+    parser.add_argument("--address", type=str, default="127.0.0.1:6099", help="host:port or unix:/path.sock")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Simulator delay per request")
+    parser.add_argument("--num-envs", type=int, default=16)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=100, help="Vector steps per raw stepping measurement")
+    parser.add_argument("--train-steps", type=int, default=10000, help="Env steps of PPO training per measurement")
+    args = parser.parse_args()
+
+    server = subprocess.Popen([sys.executable, "-m", "Envs.sim_server", "--address", args.address,
+                               "--latency-ms", str(args.latency_ms)], cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_server(args.address, args.env).close()
+        print(f"{args.num_envs} envs, {args.latency_ms}ms per request "
+              f"(bound {args.num_envs / args.latency_ms * 1000:.0f} steps/s if requests fully overlap)")
+        for label, connections, pipelined in (("one at a time", 1, False), ("pipelined, 1 connection", 1, True),
+                                              (f"pipelined, {args.connections} connections", args.connections, True)):
+            envs = RemoteVectorEnv(args.address, args.env, args.num_envs, connections, pipelined)
+            print(f"{label:>26}: {step_rate(envs, args.steps):.0f} env steps/s")
+            envs.close()
+
+        vector = dict(num_envs=args.num_envs, connections=args.connections)
+        for label, remote in (("PPO, in-process envs", None), ("PPO, remote envs", args.address)):
+            envs = make_vector_env(args.env, dict(vector, remote=remote))
+            print(f"{label:>26}: {train_rate(envs, args.env, args.train_steps):.0f} env steps/s including updates")
+            envs.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# run.py
+# asv-style runner for benchmarks/suite.py.
+#   python -m benchmarks.run run                     # time everything, save JSON for HEAD
+#   python -m benchmarks.run run --filter update     # only benchmarks whose name contains "update"
+#   python -m benchmarks.run compare <base> <head>   # flag regressions between two result files/commits
+import argparse
+import datetime
+import glob
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import closing
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip()
+        return commit, bool(dirty)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+def machine_metadata():
+    import gymnasium
+    import torch
+    commit, dirty = git_commit()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "gymnasium": gymnasium.__version__,
+    }
+
+def time_benchmark(func, repeat, min_sample_time):
+    # Calibrate the loop count so one sample takes at least min_sample_time, then
+    # collect `repeat` samples of the mean time per call
+    func()  # Warm-up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_sample_time / elapsed * 1.2))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    samples = np.array(samples)
+    return {
+        "min": float(samples.min()),
+        "median": float(np.median(samples)),
+        "mean": float(samples.mean()),
+        "std": float(samples.std()),
+        "number": number,
+        "repeat": repeat,
+    }
+
+def format_time(seconds):
+    for unit, scale in [("s", 1), ("ms", 1e-3), ("us", 1e-6)]:
+        if seconds >= scale:
+            return f"{seconds / scale:.3f}{unit}"
+    return f"{seconds / 1e-9:.1f}ns"
+
+def run(args):
+    from benchmarks.suite import BENCHMARKS
+    metadata = machine_metadata()
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    results = {}
+    for name in names:
+        setup = BENCHMARKS[name]()
+        if inspect.isgenerator(setup):
+            # Generator setups clean up (files, threads) when closed
+            with closing(setup):
+                stats = time_benchmark(next(setup), args.repeat, args.min_sample_time)
+        else:
+            stats = time_benchmark(setup, args.repeat, args.min_sample_time)
+        results[name] = stats
+        print(f"{name:<45} {format_time(stats['median']):>12}  (min {format_time(stats['min'])}, x{stats['number']})")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        suffix = "-dirty" if metadata["dirty"] else ""
+        output = os.path.join(RESULTS_DIR, f"{metadata['commit']}{suffix}.json")
+    with open(output, "w") as f:
+        json.dump({"metadata": metadata, "results": results}, f, indent=2)
+    print(f"Results saved to {output}")
+
+def resolve(path_or_commit):
+    # Accept a results file or a commit prefix stored in benchmarks/results/
+    if os.path.isfile(path_or_commit):
+        return path_or_commit
+    matches = sorted(glob.glob(os.path.join(RESULTS_DIR, f"{path_or_commit}*.json")))
+    if not matches:
+        raise SystemExit(f"No benchmark results for {path_or_commit!r}")
+    return matches[-1]
+
+def compare(args):
+    with open(resolve(args.base)) as f:
+        base = json.load(f)
+    with open(resolve(args.head)) as f:
+        head = json.load(f)
+
+    for label, data in [("base", base), ("head", head)]:
+        meta = data["metadata"]
+        print(f"{label}: {meta['commit']}{' (dirty)' if meta['dirty'] else ''} on {meta['machine']}, torch {meta['torch']}")
+    if base["metadata"]["machine"] != head["metadata"]["machine"]:
+        print("Warning: results come from different machines")
+
+    regressions = []
+    print(f"\n{'Benchmark':<45} {'base':>12} {'head':>12} {'ratio':>7}")
+    for name in sorted(set(base["results"]) & set(head["results"])):
+        before = base["results"][name][args.stat]
+        after = head["results"][name][args.stat]
+        ratio = after / before
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - args.threshold:
+            flag = "  improved"
+        print(f"{name:<45} {format_time(before):>12} {format_time(after):>12} {ratio:>6.2f}x{flag}")
+
+    for name in sorted(set(base["results"]) ^ set(head["results"])):
+        print(f"{name:<45} only in {'base' if name in base['results'] else 'head'}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="RL hot-path microbenchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite")
+    run_parser.add_argument("--filter", type=str, default=None, help="Only run benchmarks whose name contains this")
+    run_parser.add_argument("--repeat", type=int, default=7, help="Timed samples per benchmark")
+    run_parser.add_argument("--min-sample-time", type=float, default=0.05, help="Minimum seconds per sample")
+    run_parser.add_argument("--output", type=str, default=None, help="Output JSON (default: benchmarks/results/<commit>.json)")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files or commits")
+    compare_parser.add_argument("base", help="Baseline results file or commit")
+    compare_parser.add_argument("head", help="New results file or commit")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown flagged as a regression")
+    compare_parser.add_argument("--stat", type=str, default="min", choices=["min", "median", "mean"], help="Statistic to compare")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+if __name__ == "__main__":
+    main()
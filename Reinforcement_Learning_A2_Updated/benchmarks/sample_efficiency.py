@@ -0,0 +1,148 @@
+# sample_efficiency.py
+# End-to-end benchmark: steps and wall-clock seconds to reach rolling-average reward
+# thresholds, plus env steps/s and updates/s, for each algorithm over N seeds.
+#   python -m benchmarks.sample_efficiency --seeds 5 --steps 300000
+import argparse
+import csv
+import json
+import os
+import time
+import gymnasium as gym
+import numpy as np
+from main import make_agent, set_seeds
+from Utils.analysis import bootstrap_ci, mean, median
+from Utils.timing import PhaseTimer
+
+ALGORITHMS = ["REINFORCE", "PPO", "ActorCritic", "A2C", "DQNAgent"]
+
+class EpisodeClock(gym.Wrapper):
+    # Logs (global step, seconds since the first reset, return) at every episode end
+    def __init__(self, env):
+        super().__init__(env)
+        self.total_steps = 0
+        self.episode_return = 0.0
+        self.start = None
+        self.episodes = []
+
+    def reset(self, **kwargs):
+        if self.start is None:
+            self.start = time.perf_counter()
+        self.episode_return = 0.0
+        return self.env.reset(**kwargs)
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.total_steps += 1
+        self.episode_return += reward
+        if terminated or truncated:
+            self.episodes.append((self.total_steps, time.perf_counter() - self.start, self.episode_return))
+        return obs, reward, terminated, truncated, info
+
+def first_crossing(episodes, threshold, window):
+    # (steps, seconds) when the average of the last `window` episode returns first
+    # reaches the threshold, computed for all episodes at once; NaN if never reached.
+    # Only full windows count, so a lucky first episode is not a crossing.
+    if len(episodes) < window:
+        return np.nan, np.nan
+    steps, seconds, returns = (np.array(column, dtype=float) for column in zip(*episodes))
+    rolling = np.convolve(returns, np.ones(window) / window, mode="valid")  # rolling[i] ends at episode i + window - 1
+    hits = np.flatnonzero(rolling >= threshold)
+    if len(hits) == 0:
+        return np.nan, np.nan
+    end = hits[0] + window - 1
+    return steps[end], seconds[end]
+
+def censored_median_ci(values, budgets, num_resamples=2000):
+    # Bootstrap CI of the median over all runs, counting a run that never reached the
+    # threshold as its whole budget. Dropping those runs would make an algorithm that
+    # often fails look faster; a median equal to the budget means most runs failed.
+    values = np.asarray(values, dtype=float)
+    values = np.where(np.isfinite(values), values, np.asarray(budgets, dtype=float))
+    return bootstrap_ci(values, median, num_resamples)
+
+def json_safe(value):
+    # NaN (threshold never reached) is written as null so the JSON stays standard
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [json_safe(item) for item in value]
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    return value
+
+def run_seed(algo_name, seed, max_steps, thresholds, window):
+    set_seeds(seed)
+    env = EpisodeClock(gym.make("CartPole-v1"))
+    timer = PhaseTimer(enabled=True)
+    agent = make_agent(algo_name, env, timer=timer)
+    start = time.perf_counter()
+    agent.train(max_steps=max_steps)
+    wall = time.perf_counter() - start
+    env.close()
+
+    record = {
+        "wall_seconds": wall,
+        "env_steps_per_sec": env.total_steps / wall,
+        "updates_per_sec": timer.calls.get("optimizer", 0) / wall,
+    }
+    for threshold in thresholds:
+        steps, seconds = first_crossing(env.episodes, threshold, window)
+        record[f"steps_to_{threshold:g}"] = steps
+        record[f"seconds_to_{threshold:g}"] = seconds
+    return record
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample-efficiency and throughput benchmark")
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument("--seeds", type=int, default=5, help="Runs per algorithm")
+    parser.add_argument("--seed", type=int, default=42, help="First seed")
+    parser.add_argument("--steps", type=int, default=300000, help="Environment steps per run")
+    parser.add_argument("--thresholds", nargs="+", type=float, default=[195, 475])
+    parser.add_argument("--window", type=int, default=50, help="Episodes in the rolling average")
+    parser.add_argument("--resamples", type=int, default=2000, help="Bootstrap resamples")
+    parser.add_argument("--output", type=str, default="results/sample_efficiency", help="Output path without extension")
+    args = parser.parse_args()
+
+    metrics = [f"{kind}_to_{t:g}" for t in args.thresholds for kind in ["steps", "seconds"]]
+    metrics += ["env_steps_per_sec", "updates_per_sec"]
+
+    rows = []
+    for algo_name in args.algorithms:
+        records = []
+        for run in range(args.seeds):
+            print(f"\nRunning {algo_name}, Run {run+1}/{args.seeds}")
+            records.append(run_seed(algo_name, args.seed + run, args.steps, args.thresholds, args.window))
+
+        row = {"algorithm": algo_name, "runs": args.seeds}
+        for metric in metrics:
+            values = [record[metric] for record in records]
+            if metric.startswith("steps_to"):
+                value, low, high = censored_median_ci(values, [args.steps] * len(records), args.resamples)
+                row[f"{metric}_reached"] = int(np.isfinite(values).sum())
+            elif metric.startswith("seconds_to"):
+                value, low, high = censored_median_ci(values, [record["wall_seconds"] for record in records], args.resamples)
+            else:
+                value, low, high = bootstrap_ci(np.asarray(values, dtype=float), mean, args.resamples)
+            row[metric] = value
+            row[f"{metric}_ci_low"] = low
+            row[f"{metric}_ci_high"] = high
+        row["per_run"] = records
+        rows.append(row)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(f"{args.output}.json", "w") as f:
+        json.dump(json_safe({"config": vars(args), "rows": rows}), f, indent=2)
+    with open(f"{args.output}.csv", "w", newline="") as f:
+        columns = [key for key in rows[0] if key != "per_run"]
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"\n{'Algorithm':<12}" + "".join(f"{m:>28}" for m in metrics))
+    for row in rows:
+        cells = [f"{row[m]:.4g} [{row[m + '_ci_low']:.3g},{row[m + '_ci_high']:.3g}]" for m in metrics]
+        print(f"{row['algorithm']:<12}" + "".join(f"{c:>28}" for c in cells))
+    print(f"Results saved to {args.output}.json and {args.output}.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# serving.py
+# Throughput and latency of the policy server under many concurrent closed-loop
+# clients (one simulator each), batch-1 serving against dynamic batching.
+#   python -m benchmarks.serving --checkpoint checkpoints/PPO_seed42.pt --clients 64
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from Serving.client import AsyncPolicyClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def connect(address, timeout=30.0):
+    # Retries until the server subprocess is listening
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await AsyncPolicyClient.connect(address)
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+async def closed_loop(client, duration, latencies, rng):
+    obs = rng.standard_normal((1, client.obs_dim)).astype(np.float32)
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await client.act(obs)
+        latencies.append(time.perf_counter() - start)
+
+async def measure(address, clients, duration):
+    connections = [await connect(address)]
+    connections += [await connect(address) for _ in range(clients - 1)]
+    rng = np.random.default_rng(0)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(closed_loop(client, duration, latencies, rng) for client in connections))
+    elapsed = time.perf_counter() - start
+    for client in connections:
+        await client.close()
+    latencies = np.array(latencies) * 1e6
+    return {"requests_per_sec": len(latencies) / elapsed,
+            "p50_us": float(np.percentile(latencies, 50)),
+            "p99_us": float(np.percentile(latencies, 99))}
+
+def run(checkpoint, address, clients, duration, max_batch, max_wait_us):
+    server = subprocess.Popen([sys.executable, "-m", "Serving.server", "--checkpoint", checkpoint,
+                               "--address", address, "--max-batch", str(max_batch),
+                               "--max-wait-us", str(max_wait_us)],
+                              cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        return asyncio.run(measure(address, clients, duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Policy server throughput and latency")
+    parser.add_argument("--checkpoint", type=str, required=True, help="Agent checkpoint saved with --checkpoint-dir")
+    parser.add_argument("--address", type=str, default="127.0.0.1:5599", help="host:port or unix:/path.sock")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent closed-loop clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per measurement")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-us", type=float, default=500)
+    args = parser.parse_args()
+
+    for label, max_batch, max_wait_us in (("batch 1", 1, 0), ("dynamic", args.max_batch, args.max_wait_us)):
+        result = run(os.path.abspath(args.checkpoint), args.address, args.clients, args.duration, max_batch, max_wait_us)
+        print(f"{label:>8}: {result['requests_per_sec']:.0f} requests/s, "
+              f"p50 {result['p50_us']:.0f}us, p99 {result['p99_us']:.0f}us")
+
+if __name__ == "__main__":
+    main()
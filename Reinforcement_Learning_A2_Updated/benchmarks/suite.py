@@ -0,0 +1,156 @@
+# suite.py
+# Microbenchmarks for the RL hot paths. Each benchmark is a setup function that
+# returns the zero-argument callable to time; run them with `python -m benchmarks.run`.
+# A setup that holds resources is a generator instead: it yields the callable and
+# cleans up after the yield once the benchmark has been timed.
+import os
+import tempfile
+import gymnasium as gym
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import torch
+from Algorithms.reinforce import REINFORCE
+from Algorithms.actor_critic import ActorCritic
+from Algorithms.a2c import A2C
+from Algorithms.dqn import DQNagent
+from Algorithms.ppo import PPO
+from Utils.plotting import plot_learning_curves
+from Utils.recorder import TrajectoryRecorder
+
+AGENTS = {"REINFORCE": REINFORCE, "ActorCritic": ActorCritic, "A2C": A2C, "DQNAgent": DQNagent, "PPO": PPO}
+EPISODE_LENGTH = 200
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def make_agent(algo_name):
+    torch.manual_seed(0)
+    np.random.seed(0)
+    return AGENTS[algo_name](gym.make("CartPole-v1"))
+
+def make_episode(agent, length=EPISODE_LENGTH):
+    # Synthetic CartPole-sized episode
+    rng = np.random.default_rng(0)
+    states = rng.standard_normal((length, agent.policy_net.fc1.in_features)).astype(np.float32)
+    actions = rng.integers(2, size=length)
+    rewards = [1.0] * length
+    masks = [1.0] * (length - 1) + [0.0]
+    return states, actions, rewards, masks
+
+# select_action, one per agent (DQN with epsilon=0 so the network is always used)
+def _select_action_setup(algo_name):
+    def setup():
+        agent = make_agent(algo_name)
+        if isinstance(agent, DQNagent):
+            agent.epsilon = 0.0
+        state, _ = agent.env.reset(seed=0)
+        return lambda: agent.select_action(state)
+    return setup
+
+for _name in AGENTS:
+    benchmark(f"select_action.{_name}")(_select_action_setup(_name))
+
+# Batched DQN acting for 64 environments: one forward pass and one exploration draw
+@benchmark("select_actions.DQNAgent.batch64")
+def select_actions_dqn():
+    agent = make_agent("DQNAgent")
+    agent.epsilon = 0.1
+    states = np.random.default_rng(0).standard_normal((64, agent.state_dim)).astype(np.float32)
+    return lambda: agent.select_actions(states)
+
+@benchmark("returns.REINFORCE.calculate_returns")
+def returns_reinforce():
+    agent = make_agent("REINFORCE")
+    rewards = [1.0] * EPISODE_LENGTH
+    return lambda: agent.calculate_returns(rewards)
+
+@benchmark("returns.PPO.compute_returns")
+def returns_ppo():
+    agent = make_agent("PPO")
+    _, _, rewards, masks = make_episode(agent)
+    return lambda: agent.compute_returns(rewards, masks)
+
+# One update per algorithm on a 200-step episode. Policy-gradient updates consume an
+# autograd graph, so the timed call includes the batched forward pass that builds it.
+@benchmark("update.REINFORCE")
+def update_reinforce():
+    agent = make_agent("REINFORCE")
+    states, actions, rewards, _ = make_episode(agent)
+    states, actions = torch.as_tensor(states), torch.as_tensor(actions)
+    def run():
+        log_probs = torch.distributions.Categorical(agent.policy_net(states)).log_prob(actions)
+        agent.update(list(log_probs), rewards)
+    return run
+
+def _actor_critic_update_setup(algo_name):
+    def setup():
+        agent = make_agent(algo_name)
+        states, actions, rewards, _ = make_episode(agent)
+        states, actions = torch.as_tensor(states), torch.as_tensor(actions)
+        def run():
+            log_probs = torch.distributions.Categorical(agent.policy_net(states)).log_prob(actions)
+            agent.update([log_probs], [agent.value_net(states)], rewards)
+        return run
+    return setup
+
+benchmark("update.ActorCritic")(_actor_critic_update_setup("ActorCritic"))
+benchmark("update.A2C")(_actor_critic_update_setup("A2C"))
+
+@benchmark("update.PPO")
+def update_ppo():
+    agent = make_agent("PPO")
+    states, actions, rewards, masks = make_episode(agent)
+    log_probs = [-0.69] * len(rewards)
+    return lambda: agent.update(states, actions, log_probs, rewards, masks)
+
+@benchmark("update.DQNAgent")
+def update_dqn():
+    agent = make_agent("DQNAgent")
+    states, actions, _, _ = make_episode(agent, 2)
+    return lambda: agent.update(states[0], int(actions[0]), 1.0, states[1], False)
+
+# Per-step cost the recorder adds to a training loop, including the background
+# chunk compression competing for the GIL
+@benchmark("recorder.record")
+def recorder_record():
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = TrajectoryRecorder(directory, chunk_size=10000)
+        obs = np.zeros(4, dtype=np.float32)
+        try:
+            yield lambda: recorder.record(obs, 0, 1.0, False, False, obs, -0.69, 0.5)
+        finally:
+            recorder.close()
+
+@benchmark("env.CartPole-v1.step")
+def env_step():
+    env = gym.make("CartPole-v1")
+    env.reset(seed=0)
+    env.action_space.seed(0)
+    def run():
+        _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+        if terminated or truncated:
+            env.reset()
+    return run
+
+@benchmark("plot.plot_learning_curves.5x5x1000")
+def plot_large():
+    # 5 algorithms x 5 runs x 1,000 checkpoints (a 1M-step comparison)
+    rng = np.random.default_rng(0)
+    steps = np.arange(1000, 1000001, 1000)
+    all_results = {
+        f"algo{a}": [list(zip(steps, rng.uniform(0, 500, len(steps)))) for _ in range(5)]
+        for a in range(5)
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "learning_curves.png")
+        def run():
+            plot_learning_curves(all_results, filename)
+            plt.close("all")
+        yield run
@@ -4,13 +4,62 @@ import torch
 import random
 import numpy as np
 import argparse
+import json
 import os
+import sys
+import time
+import traceback
 from Algorithms.reinforce import REINFORCE
 from Algorithms.actor_critic import ActorCritic
 from Algorithms.a2c import A2C
 from Algorithms.dqn import DQNagent
 from Algorithms.ppo import PPO
+from Algorithms.ensemble import EnsembleTrainer
+from Algorithms import offline
+from Algorithms.offline import pretrain
 from Utils.plotting import plot_learning_curves, plot_comparison_boxplot
+from Utils.timing import PhaseTimer
+from Utils.profiling import ProfileWindow, parse_step_window
+from Utils.run_cache import RunCache, run_key
+from Utils.budget import BudgetController
+from Utils.checkpoint import save_checkpoint
+from Utils.recorder import TrajectoryRecorder, existing_chunks
+from Utils.dataset import OfflineDataset, dataset_fingerprint
+from Serving.weights import WeightPublisher
+from Utils.evaluation import EvalWorker
+from Envs.remote import RemoteVectorEnv
+from Utils.distributed import (init_distributed, launched_with_torchrun, rank_seed, broadcast_parameters,
+                               GradientAllReduce, merge_curves)
+from Algorithms.vector import env_seeds
+from Utils.job_queue import JobQueue, Heartbeat, worker_name
+
+DEFAULT_ENV = "CartPole-v1"
+AGENT_CLASSES = {"REINFORCE": REINFORCE, "ActorCritic": ActorCritic, "A2C": A2C, "DQNAgent": DQNagent, "PPO": PPO}
+# Map input algorithm names to standard formats
+ALGORITHM_NAMES = {"reinforce": "REINFORCE", "actor_critic": "ActorCritic", "a2c": "A2C", "dqn": "DQNAgent", "ppo": "PPO"}
+
+def make_env(env_id=DEFAULT_ENV):
+    # The networks fit any env with a flat Box observation and Discrete actions
+    env = gym.make(env_id)
+    observation_space, action_space = env.observation_space, env.action_space
+    if not isinstance(action_space, gym.spaces.Discrete) or not isinstance(observation_space, gym.spaces.Box) \
+            or len(observation_space.shape) != 1:
+        env.close()
+        raise ValueError(f"{env_id} needs a 1-D Box observation space and a Discrete action space, "
+                         f"got {observation_space} and {action_space}")
+    return env
+
+def make_vector_env(env_id, vector):
+    # N copies of env_id stepped together, in-process or on a remote simulator server,
+    # both with same-step autoreset
+    if vector.get("remote"):
+        return RemoteVectorEnv(vector["remote"], env_id, vector["num_envs"], vector["connections"])
+    return gym.make_vec(env_id, num_envs=vector["num_envs"], vectorization_mode="sync",
+                        vector_kwargs={"autoreset_mode": gym.vector.AutoresetMode.SAME_STEP})
+
+def results_dir(env_id=DEFAULT_ENV):
+    # CartPole keeps the original results/ layout; other envs get a subdirectory
+    return "results" if env_id == DEFAULT_ENV else os.path.join("results", env_id)
 
 def set_seeds(seed=42):
     random.seed(seed)
@@ -19,76 +68,475 @@ def set_seeds(seed=42):
     if torch.cuda.is_available():
         torch.cuda.manual_seed(seed)
         
-def run_algorithm(algo_name, num_runs=1, max_steps=200000, seed=42):
-    results = []
+def make_agent(algo_name, env, fused_update=False, timer=None, replay=None, dqn=None, normalize=False):
+    if algo_name == "REINFORCE":
+        return REINFORCE(env, learning_rate=0.0005, gamma=0.99, timer=timer, normalize=normalize)
+    elif algo_name == "ActorCritic":
+        return ActorCritic(env, learning_rate=0.0005, gamma=0.99, fused_update=fused_update, timer=timer, normalize=normalize)
+    elif algo_name == "A2C":
+        return A2C(env, learning_rate=0.0005, gamma=0.99, fused_update=fused_update, timer=timer, normalize=normalize)
+    elif algo_name == "DQNAgent":
+        return DQNagent(env, timer=timer, normalize=normalize, **(replay or {}), **(dqn or {}))
+    elif algo_name == "PPO":
+        return PPO(env, fused_update=fused_update, timer=timer, normalize=normalize)
+    else:
+        raise ValueError(f"Unknown Algorithm: {algo_name}")
+
+def replay_for_run(replay, algo_name, seed):
+    # Every run gets its own memmap directory so runs never share a buffer
+    if not replay or not replay.get("replay_dir"):
+        return replay
+    return dict(replay, replay_dir=os.path.join(replay["replay_dir"], f"{algo_name}_seed{seed}"))
+
+def checkpoint_path(checkpoint_dir, algo_name, seed):
+    return os.path.join(checkpoint_dir, f"{algo_name}_seed{seed}.pt")
+
+def record_path(record_dir, env_id, algo_name, seed):
+    return os.path.join(record_dir, env_id, f"{algo_name}_seed{seed}")
+
+def publish_path(publish_dir, env_id, algo_name, seed):
+    return os.path.join(publish_dir, env_id, f"{algo_name}_seed{seed}")
+
+def pretrain_agent(agent, pretrain_options):
+    # Offline warm start from a built dataset before any environment step
+    if pretrain_options:
+        pretrain(agent, OfflineDataset(pretrain_options["dataset"]), pretrain_options["epochs"])
+
+def eval_path(env_id, algo_name, seed):
+    return os.path.join(results_dir(env_id), f"{algo_name}_seed{seed}_eval.jsonl")
+
+def attach_publisher(agent, publish, evaluation, env_id, algo_name, seed):
+    # Publishing step hook, plus an evaluation worker that follows the published versions
+    if not publish:
+        return None
+    publisher = WeightPublisher(publish_path(publish["directory"], env_id, algo_name, seed), agent, publish["every"])
+    agent.step_hooks.append(publisher)
+    if not evaluation:
+        return None
+    return EvalWorker(publisher.directory, env_id, eval_path(env_id, algo_name, seed), evaluation["episodes"],
+                      seed, version=publisher.version)
+
+def publish_final(agent):
+    # Readers always end up with the fully trained weights, labelled with the step the
+    # run actually reached (a budget stop ends it before max_steps)
+    for hook in agent.step_hooks:
+        if isinstance(hook, WeightPublisher) and hook.step != hook.last_step:
+            hook.publish(hook.last_step)
+
+def run_ensemble(algo_name, seeds, max_steps=200000, fused_update=False, timing=False, profile_steps=None, budget=None,
+                 replay=None, dqn=None, normalize=False, checkpoint_dir=None, env_id=DEFAULT_ENV,
+                 record_dir=None, pretrain=None, publish=None, evaluation=None):
+    # All runs share one process: members are built exactly as in separate runs
+    # (same per-run seeding) and then trained in lockstep with vmapped acting
+    print(f"\nRunning {algo_name}, {len(seeds)} runs as one ensemble")
+    agents, evaluators = [], []
+    for seed in seeds:
+        set_seeds(seed)
+        agents.append(make_agent(algo_name, make_env(env_id), fused_update, PhaseTimer(enabled=timing),
+                                 replay_for_run(replay, algo_name, seed), dqn, normalize))
+        if budget:
+            agents[-1].budget = BudgetController(**budget)
+        if record_dir:
+            agents[-1].recorder = TrajectoryRecorder(record_path(record_dir, env_id, algo_name, seed))
+        evaluators.append(attach_publisher(agents[-1], publish, evaluation, env_id, algo_name, seed))
+        pretrain_agent(agents[-1], pretrain)
     
-    # Map input algorithm names to standard formats
-    algo_map = {
-        "reinforce": "REINFORCE",
-        "actor_critic": "ActorCritic",
-        "a2c": "A2C",
-        "dqn": "DQNAgent",
-        "ppo": "PPO"
-    }
+    # Members step in lockstep, so profiling the first member's window covers all of them
+    profiler = None
+    if profile_steps:
+        profiler = ProfileWindow(*parse_step_window(profile_steps), name=f"{algo_name}_ensemble",
+                                 output_dir=results_dir(env_id))
+        agents[0].step_hooks.append(profiler)
     
+    results = EnsembleTrainer(agents, seeds).train(max_steps=max_steps)
+    if profiler is not None:
+        profiler.close()
+    eval_curves = []
+    for seed, agent, evaluator in zip(seeds, agents, evaluators):
+        if agent.recorder is not None:
+            agent.recorder.close()
+        publish_final(agent)
+        eval_curves.append(evaluator.close() if evaluator else None)
+        if checkpoint_dir:
+            save_checkpoint(agent, checkpoint_path(checkpoint_dir, algo_name, seed), seed=seed, max_steps=max_steps)
+        agent.env.close()
+    return results, [agent.timer.summary() for agent in agents], eval_curves
+
+def run_algorithm(algo_name, num_runs=1, max_steps=200000, seed=42, ensemble=False, fused_update=False, timing=False,
+                  profile_steps=None, cache_dir=".run_cache", budget=None, replay=None, dqn=None, normalize=False, checkpoint_dir=None,
+                  env_id=DEFAULT_ENV, record_dir=None, pretrain=None, publish=None, evaluation=None, vector=None,
+                  distributed=None, save_results=True):
     # Convert the algorithm name to a standard format
-    standard_name = algo_map.get(algo_name.lower())
+    standard_name = ALGORITHM_NAMES.get(algo_name.lower())
     if standard_name:
         algo_name = standard_name
     
-    for run in range(num_runs):
+    if algo_name not in AGENT_CLASSES:
+        raise ValueError(f"Unknown Algorithm: {algo_name}")
+    
+    # Each (algorithm, seed) cell is cached under a hash of the code, hyperparameters,
+    # seed, step budget and library versions; only missing cells are trained
+    seeds = [seed + run for run in range(num_runs)]
+    # Data-parallel runs (Utils.distributed) split max_steps over the ranks. Every rank
+    # must train every run in lockstep, so they skip the cache, and only rank 0 publishes,
+    # profiles, checkpoints and writes results
+    rank, world_size = (distributed["rank"], distributed["world_size"]) if distributed else (0, 1)
+    if distributed:
+        cache_dir = None
+        if rank != 0:
+            publish = evaluation = profile_steps = checkpoint_dir = None
+    cache = RunCache(cache_dir) if cache_dir else None
+    hyperparameters = dict(fused_update=fused_update, ensemble=ensemble, budget=budget)
+    if algo_name != "DQNAgent":
+        replay = dqn = None  # DQN-only options
+    if replay:
+        hyperparameters["replay"] = replay
+    if dqn:
+        hyperparameters["dqn"] = dqn
+    if normalize:
+        hyperparameters["normalize"] = normalize
+    if pretrain:
+        hyperparameters["pretrain"] = dict(pretrain, fingerprint=dataset_fingerprint(pretrain["dataset"]))
+    if vector:
+        hyperparameters["vector"] = dict(num_envs=vector["num_envs"], rollout_steps=vector["rollout_steps"])
+    # Code outside the agent's modules that also shapes the run: the ensemble trainer,
+    # the stopping rule and offline pretraining (with its dataset loader)
+    extra_code = [EnsembleTrainer] if ensemble else []
+    if budget:
+        extra_code.append(BudgetController)
+    if pretrain:
+        extra_code.append(offline)
+    keys = [run_key(AGENT_CLASSES[algo_name], hyperparameters, s, max_steps, env_id, make_agent, extra_code) for s in seeds]
+    entries = [cache.get(key) if cache else None for key in keys]
+    if profile_steps:
+        entries[0] = None  # The profiled run has to execute
+    if timing:
+        entries = [None] * num_runs  # Timings measure this execution (untimed cells store none)
+    if record_dir or publish or checkpoint_dir or (vector and vector.get("remote")):
+        # So do recorded, published, checkpointed and remote-simulator runs: their
+        # outputs only come from training
+        entries = [None] * num_runs
+    missing = [run for run, entry in enumerate(entries) if entry is None]
+    if cache and len(missing) < num_runs:
+        print(f"\n{algo_name}: reusing {num_runs - len(missing)}/{num_runs} cached runs")
+    
+    if ensemble and missing:
+        ensemble_results, ensemble_timings, ensemble_evals = run_ensemble(algo_name, [seeds[run] for run in missing], max_steps,
+                                                          fused_update, timing, profile_steps, budget, replay, dqn,
+                                                          normalize, checkpoint_dir, env_id, record_dir, pretrain,
+                                                          publish, evaluation)
+        for run, step_rewards, timing_summary, eval_curve in zip(missing, ensemble_results, ensemble_timings,
+                                                                 ensemble_evals):
+            entries[run] = {"step_rewards": step_rewards, "timing": timing_summary, "eval": eval_curve}
+    
+    for run in ([] if ensemble else missing):
         print(f"\nRunning {algo_name}, Run {run+1}/{num_runs}")
-        set_seeds(seed + run)
-        env = gym.make("CartPole-v1")
+        # Each rank's sampling and env seeds come from seed sequences keyed on (run seed, rank)
+        set_seeds(rank_seed(seeds[run], rank) if distributed else seeds[run])
+        env = make_env(env_id)
+        agent = make_agent(algo_name, env, fused_update, PhaseTimer(enabled=timing),
+                           replay_for_run(replay, algo_name, seeds[run]), dqn, normalize)
+        if budget:
+            agent.budget = BudgetController(**budget)
+        if record_dir:
+            agent.recorder = TrajectoryRecorder(record_path(record_dir, env_id, algo_name, seeds[run]))
+        evaluator = attach_publisher(agent, publish, evaluation, env_id, algo_name, seeds[run])
+        pretrain_agent(agent, pretrain)
+        if distributed:
+            networks = [agent.policy_net, agent.value_net]
+            broadcast_parameters(networks)  # Every replica starts from rank 0's weights
+            agent.grad_sync = GradientAllReduce(networks)
         
-        if algo_name == "REINFORCE":
-            agent = REINFORCE(env, learning_rate=0.0005, gamma=0.99)
-        elif algo_name == "ActorCritic":
-            agent = ActorCritic(env, learning_rate=0.0005, gamma=0.99)
-        elif algo_name == "A2C":
-            agent = A2C(env, learning_rate=0.0005, gamma=0.99)
-        elif algo_name == "DQNAgent":
-            agent = DQNagent(env)
-        elif algo_name == "PPO":
-            agent = PPO(env)
-        else:
-            raise ValueError(f"Unknown Algorithm: {algo_name}")
+        # Only the first run is profiled; the other runs execute the same code
+        profiler = None
+        if profile_steps and run == 0:
+            profiler = ProfileWindow(*parse_step_window(profile_steps), name=f"{algo_name}_run{run+1}",
+                                     output_dir=results_dir(env_id))
+            agent.step_hooks.append(profiler)
         
-        step_rewards = agent.train(max_steps=max_steps)  # Now returns list of (step, avg_reward) pairs
-        results.append(step_rewards)
+        if distributed:
+            envs = make_vector_env(env_id, vector)
+            start = time.perf_counter()
+            step_rewards = agent.train_vector(envs, max_steps // world_size, vector["rollout_steps"],
+                                              seed=env_seeds(seeds[run], vector["num_envs"], rank))
+            elapsed = time.perf_counter() - start
+            envs.close()
+            # Rank 0 reports the curve over all ranks, in global steps
+            step_rewards = merge_curves(step_rewards)
+            if rank == 0:
+                print(f"{world_size} ranks: {max_steps // world_size * world_size / elapsed:.0f} env steps/s")
+        elif vector:
+            envs = make_vector_env(env_id, vector)
+            step_rewards = agent.train_vector(envs, max_steps, vector["rollout_steps"], seed=seeds[run])
+            envs.close()
+        else:
+            step_rewards = agent.train(max_steps=max_steps)  # Now returns list of (step, avg_reward) pairs
+        if profiler is not None:
+            profiler.close()
+        if agent.recorder is not None:
+            agent.recorder.close()
+        publish_final(agent)
+        entries[run] = {"step_rewards": step_rewards, "timing": agent.timer.summary(),
+                        "eval": evaluator.close() if evaluator else None}
+        if checkpoint_dir:
+            save_checkpoint(agent, checkpoint_path(checkpoint_dir, algo_name, seeds[run]), seed=seeds[run], max_steps=max_steps)
         env.close()
     
+    if cache:
+        for run in missing:
+            cache.put(keys[run], entries[run]["step_rewards"], entries[run]["timing"],
+                      meta=dict(algorithm=algo_name, seed=seeds[run], max_steps=max_steps, **hyperparameters))
+    results = [entry["step_rewards"] for entry in entries]
+    timings = [entry["timing"] for entry in entries]
+    if not save_results or rank != 0:
+        return results
+    
     # Save Results
-    os.makedirs('results', exist_ok=True)
+    output_dir = results_dir(env_id)
+    os.makedirs(output_dir, exist_ok=True)
     import pickle
-    with open(f"results/{algo_name}_rewards.pkl", 'wb') as f:
+    with open(os.path.join(output_dir, f"{algo_name}_rewards.pkl"), 'wb') as f:
         pickle.dump(results, f)
     
+    # Greedy evaluation curves, [(step, eval_return)] per run, from the evaluation workers
+    if evaluation:
+        with open(os.path.join(output_dir, f"{algo_name}_eval.json"), 'w') as f:
+            json.dump([entry["eval"] for entry in entries], f, indent=2)
+    
+    # Per-run phase timings are saved next to the rewards
+    if timing:
+        with open(os.path.join(output_dir, f"{algo_name}_timings.json"), 'w') as f:
+            json.dump(timings, f, indent=2)
+    
     return results
 
-def run_all_algorithms(num_runs=1, max_steps=200000, seed=42):
+def run_all_algorithms(num_runs=1, max_steps=200000, seed=42, **run_options):
     algorithms = ["REINFORCE","PPO","ActorCritic","A2C","DQNAgent"]
     all_results = {}
     
     for algo in algorithms:
-        all_results[algo] = run_algorithm(algo, num_runs, max_steps, seed)
+        all_results[algo] = run_algorithm(algo, num_runs, max_steps, seed, **run_options)
         
-    # Plot Comparison
-    plot_learning_curves(all_results, "all_algorithms_comparison.png")
-    plot_comparison_boxplot(all_results, "final_performance_comparison.png")
+    # Plot Comparison (plots for other envs are prefixed with the env id)
+    env_id = run_options.get("env_id", DEFAULT_ENV)
+    prefix = "" if env_id == DEFAULT_ENV else f"{env_id}_"
+    plot_learning_curves(all_results, f"{prefix}all_algorithms_comparison.png")
+    plot_comparison_boxplot(all_results, f"{prefix}final_performance_comparison.png")
     
-if __name__ == "__main__":
+def build_parser():
     parser = argparse.ArgumentParser(description='RL Algorithm Comparison')
     parser.add_argument("--algorithm", type=str, default="all", 
                         choices=["reinforce", "actor_critic", "a2c", "dqn", "ppo", "all"],
                         help="which algorithm to run")
+    parser.add_argument("--env", type=str, default=DEFAULT_ENV,
+                        help="Gymnasium env id with a Box observation and Discrete actions (e.g. Acrobot-v1, MountainCar-v0)")
     parser.add_argument("--runs", type=int, default=5, help="Number of runs per algorithm")
     parser.add_argument("--steps", type=int, default=1000000, help="Number of environment steps per run")
     parser.add_argument("--seed", type=int, default=42, help="Random seeds")
+    parser.add_argument("--ensemble", action="store_true", help="Train all runs of an algorithm together with vmapped networks")
+    parser.add_argument("--fused-update", action="store_true", help="Use one joint optimizer step for actor and critic (A2C, ActorCritic, PPO)")
+    parser.add_argument("--timing", action="store_true", help="Record per-phase hot-path timings and save them to results/")
+    parser.add_argument("--profile-steps", type=str, default=None, metavar="START:END",
+                        help="Capture a torch.profiler trace of this step window of the first run into the results directory")
+    parser.add_argument("--stop-threshold", type=float, default=None,
+                        help="Stop learning once the rolling average reward reaches this (e.g. 475)")
+    parser.add_argument("--stop-window", type=int, default=50, help="Episodes per rolling-average window")
+    parser.add_argument("--stop-patience", type=int, default=3, help="Consecutive windows that must meet the threshold")
+    parser.add_argument("--stop-mode", type=str, default="stop", choices=["stop", "evaluate"],
+                        help="stop: end the run and pad its curve; evaluate: keep acting without updates")
+    parser.add_argument("--replay-capacity", type=int, default=None, help="Train DQN from a replay memory of this many transitions")
+    parser.add_argument("--replay-dir", type=str, default=None,
+                        help="Keep the DQN replay memory in memmapped files under this directory (persists across restarts)")
+    parser.add_argument("--replay-dtype", type=str, default="float32", choices=["float32", "float16"], help="Storage dtype of replayed observations")
+    parser.add_argument("--batch-size", type=int, default=64, help="DQN replay minibatch size")
+    parser.add_argument("--double-dqn", action="store_true", help="Double DQN targets (needs --target-update)")
+    parser.add_argument("--dueling", action="store_true", help="Dueling value/advantage head for DQN")
+    parser.add_argument("--n-step", type=int, default=1, help="DQN n-step returns (needs --replay-capacity)")
+    parser.add_argument("--target-update", type=int, default=None, help="Sync a DQN target network every this many updates")
+    parser.add_argument("--epsilon-schedule", type=str, default=None, choices=["linear", "exponential"],
+                        help="Index DQN epsilon by global step instead of decaying it per episode")
+    parser.add_argument("--epsilon-decay-steps", type=int, default=100000, help="Steps for the epsilon schedule to reach its minimum")
+    parser.add_argument("--normalize", action="store_true",
+                        help="Running observation normalization, and return normalization across episodes")
+    parser.add_argument("--checkpoint-dir", type=str, default=None,
+                        help="Save every trained agent (networks, optimizers, normalizers) to <dir>/<algorithm>_seed<seed>.pt")
+    parser.add_argument("--record-dir", type=str, default=None,
+                        help="Stream every transition to compressed chunks under <dir>/<env>/<algorithm>_seed<seed>/")
+    parser.add_argument("--pretrain", type=str, default=None, metavar="DATASET",
+                        help="Warm start from a dataset built by Utils.dataset (offline DQN, or behaviour cloning for the others)")
+    parser.add_argument("--pretrain-epochs", type=int, default=1, help="Passes over the pretraining dataset")
+    parser.add_argument("--publish-dir", type=str, default=None,
+                        help="Publish versioned policy weights during training to <dir>/<env>/<algorithm>_seed<seed>/")
+    parser.add_argument("--publish-every", type=int, default=1000, help="Environment steps between published versions")
+    parser.add_argument("--eval-every", type=int, default=None,
+                        help="Evaluate greedily in a separate process every this many steps (publishes weights that often)")
+    parser.add_argument("--eval-episodes", type=int, default=10, help="Episodes per evaluation, stepped as one batch")
+    parser.add_argument("--num-envs", type=int, default=1, help="Train A2C/PPO/DQN on this many envs stepped as one vector env")
+    parser.add_argument("--rollout-steps", type=int, default=32, help="Vector steps per A2C/PPO update with --num-envs")
+    parser.add_argument("--remote-env", type=str, default=None, metavar="ADDRESS",
+                        help="Run the --num-envs envs on a simulator server (e.g. python -m Envs.sim_server), host:port or unix:/path")
+    parser.add_argument("--env-connections", type=int, default=4, help="Connections to the simulator server")
+    parser.add_argument("--distributed", action="store_true",
+                        help="Data-parallel A2C/PPO over the ranks started by torchrun (gloo); --steps is split across ranks")
+    parser.add_argument("--cache-dir", type=str, default=".run_cache", help="Directory of cached runs")
+    parser.add_argument("--no-cache", action="store_true", help="Retrain every run and do not touch the cache")
+    return parser
+
+def build_run_options(parser, args):
+    # Command-line flags -> keyword arguments of run_algorithm, rejecting bad combinations
+    if args.profile_steps:
+        try:
+            parse_step_window(args.profile_steps)  # Fail fast on a malformed window
+        except ValueError as e:
+            parser.error(str(e))
+    try:
+        make_env(args.env).close()  # Unknown ids and unsupported spaces fail before any training
+    except (ValueError, gym.error.Error) as e:
+        parser.error(str(e))
+    run_options = dict(ensemble=args.ensemble, fused_update=args.fused_update, timing=args.timing,
+                       profile_steps=args.profile_steps, cache_dir=None if args.no_cache else args.cache_dir,
+                       normalize=args.normalize, checkpoint_dir=args.checkpoint_dir, env_id=args.env,
+                       record_dir=args.record_dir)
+    if args.publish_dir:
+        run_options["publish"] = dict(directory=args.publish_dir, every=args.publish_every)
+    if args.eval_every:
+        run_options["publish"] = dict(directory=args.publish_dir or os.path.join(results_dir(args.env), "published"),
+                                      every=args.eval_every)
+        run_options["evaluation"] = dict(episodes=args.eval_episodes)
+    if args.num_envs > 1 or args.remote_env:
+        if args.algorithm not in ("a2c", "ppo", "dqn"):
+            parser.error("--num-envs and --remote-env are supported by --algorithm a2c, ppo and dqn")
+        if args.n_step > 1:
+            parser.error("--n-step needs the single-env loop (without --num-envs and --remote-env)")
+        if args.ensemble or args.record_dir:
+            parser.error("--num-envs and --remote-env cannot be combined with --ensemble or --record-dir")
+        run_options["vector"] = dict(num_envs=args.num_envs, rollout_steps=args.rollout_steps,
+                                     remote=args.remote_env, connections=args.env_connections)
+    if args.distributed:
+        if not launched_with_torchrun():
+            parser.error("--distributed needs to be started by torchrun (e.g. torchrun --nproc-per-node 4 main.py ...)")
+        if args.algorithm not in ("a2c", "ppo"):
+            parser.error("--distributed is supported by --algorithm a2c and ppo")
+        if args.ensemble or args.record_dir or args.normalize or args.pretrain or args.stop_threshold is not None:
+            parser.error("--distributed cannot be combined with --ensemble, --record-dir, --normalize, --pretrain "
+                         "or --stop-threshold")
+        # Data-parallel ranks always collect fixed-length rollouts, so they update in lockstep
+        run_options["vector"] = dict(num_envs=args.num_envs, rollout_steps=args.rollout_steps,
+                                     remote=args.remote_env, connections=args.env_connections)
+        rank, world_size = init_distributed()
+        run_options["distributed"] = dict(rank=rank, world_size=world_size)
+    if args.record_dir:
+        # Fail before any training rather than when a later run reaches its recorder
+        algorithms = list(AGENT_CLASSES) if args.algorithm == "all" else [ALGORITHM_NAMES[args.algorithm]]
+        recorded = [record_path(args.record_dir, args.env, algo, args.seed + run)
+                    for algo in algorithms for run in range(args.runs)]
+        if any(existing_chunks(path) for path in recorded):
+            parser.error(f"{args.record_dir} already holds recordings of these runs; delete them before re-recording")
+    if args.pretrain:
+        run_options["pretrain"] = dict(dataset=args.pretrain, epochs=args.pretrain_epochs)
+    if args.replay_capacity:
+        run_options["replay"] = dict(replay_capacity=args.replay_capacity, replay_dir=args.replay_dir,
+                                     replay_dtype=args.replay_dtype, batch_size=args.batch_size)
+    if args.double_dqn and not args.target_update:
+        parser.error("--double-dqn needs --target-update")
+    if args.n_step > 1 and not args.replay_capacity:
+        parser.error("--n-step needs --replay-capacity")
+    if args.double_dqn or args.dueling or args.n_step > 1 or args.target_update or args.epsilon_schedule:
+        run_options["dqn"] = dict(double_dqn=args.double_dqn, dueling=args.dueling, n_step=args.n_step,
+                                  target_update=args.target_update)
+        if args.epsilon_schedule:
+            run_options["dqn"].update(epsilon_schedule=args.epsilon_schedule, epsilon_decay_steps=args.epsilon_decay_steps)
+    if args.stop_threshold is not None:
+        run_options["budget"] = dict(threshold=args.stop_threshold, window=args.stop_window,
+                                     patience=args.stop_patience, mode=args.stop_mode)
+    return run_options
+
+def enqueue(argv):
+    # Writes the (algorithm, env, seed) grid with its run options to a job queue
+    # (Utils.job_queue); point the workers' --cache-dir at a shared directory and the
+    # same command without `enqueue` later collects every cell from the cache
+    parser = build_parser()
+    parser.prog = "main.py enqueue"
+    parser.add_argument("--queue", type=str, required=True, help="SQLite file of the job queue (on a shared filesystem)")
+    parser.add_argument("--envs", type=str, nargs="+", default=None, help="Enqueue the grid for each of these env ids")
+    args = parser.parse_args(argv)
+    if args.distributed or args.ensemble:
+        parser.error("--distributed and --ensemble runs cannot be split into jobs")
+    algorithms = ["REINFORCE", "PPO", "ActorCritic", "A2C", "DQNAgent"] if args.algorithm == "all" else [args.algorithm]
+    jobs = []
+    for env_id in args.envs or [args.env]:
+        args.env = env_id
+        options = build_run_options(parser, args)
+        del options["env_id"]
+        if options["cache_dir"]:
+            options["cache_dir"] = os.path.abspath(options["cache_dir"])  # Workers start in other directories
+        jobs += [dict(algorithm=algo, env_id=env_id, seed=args.seed + run, max_steps=args.steps, options=options)
+                 for algo in algorithms for run in range(args.runs)]
+    queue = JobQueue(args.queue)
+    print(f"Enqueued {queue.enqueue(jobs)} new jobs of {len(jobs)} ({queue.counts()})")
+
+def work(argv):
+    # Claims and trains jobs until stopped; any number of workers on any hosts can share a queue
+    parser = argparse.ArgumentParser(prog="main.py worker", description="Train jobs from a queue written by main.py enqueue")
+    parser.add_argument("--queue", type=str, required=True, help="SQLite file of the job queue")
+    parser.add_argument("--heartbeat", type=float, default=30.0, help="Seconds between heartbeats of the running job")
+    parser.add_argument("--stale-after", type=float, default=300.0,
+                        help="Re-queue running jobs whose heartbeat is older than this many seconds")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Claims of a job before a lost heartbeat fails it")
+    parser.add_argument("--poll", type=float, default=10.0, help="Seconds between claims while the queue is empty")
+    parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+    parser.add_argument("--exit-when-empty", action="store_true", help="Exit once no job is pending or running")
+    args = parser.parse_args(argv)
+    if args.stale_after <= args.heartbeat:
+        parser.error("--stale-after must be longer than --heartbeat")
+
+    queue = JobQueue(args.queue)
+    worker = worker_name()
+    finished = 0
+    while args.max_jobs is None or finished < args.max_jobs:
+        job = queue.claim(worker, args.stale_after, args.max_attempts)
+        if job is None:
+            counts = queue.counts()
+            if args.exit_when_empty and not counts["pending"] and not counts["running"]:
+                break
+            time.sleep(args.poll)
+            continue
+        print(f"\n[{worker}] Job {job['id']}: {job['algorithm']} on {job['env_id']}, seed {job['seed']} "
+              f"(attempt {job['attempts']})")
+        try:
+            with Heartbeat(queue, job["id"], worker, args.heartbeat) as beat:
+                # Results go to the run cache given by the job's options, and to the queue
+                results = run_algorithm(job["algorithm"], 1, job["max_steps"], job["seed"], env_id=job["env_id"],
+                                        save_results=False, **job["options"])
+        except KeyboardInterrupt:
+            queue.release(job["id"], worker)
+            raise
+        except Exception:
+            print(f"[{worker}] Job {job['id']} failed")
+            traceback.print_exc()
+            queue.fail(job["id"], worker, traceback.format_exc())
+            continue
+        if beat.lost or not queue.complete(job["id"], worker, {"step_rewards": results[0]}):
+            print(f"[{worker}] Job {job['id']} was re-queued while running (heartbeat too late); dropping this result")
+            continue
+        finished += 1
+    print(f"[{worker}] Finished {finished} jobs")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "enqueue":
+        enqueue(sys.argv[2:])
+        sys.exit()
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        work(sys.argv[2:])
+        sys.exit()
+    parser = build_parser()
     args = parser.parse_args()
+    run_options = build_run_options(parser, args)
     
     if args.algorithm == "all":
-        run_all_algorithms(args.runs, args.steps, args.seed)
+        run_all_algorithms(args.runs, args.steps, args.seed, **run_options)
     else:
-        results = run_algorithm(args.algorithm, args.runs, args.steps, args.seed)
-        plot_learning_curves({args.algorithm: results}, f"{args.algorithm}_learning_curve.png")
+        results = run_algorithm(args.algorithm, args.runs, args.steps, args.seed, **run_options)
+        prefix = "" if args.env == DEFAULT_ENV else f"{args.env}_"
+        if run_options.get("distributed", {}).get("rank", 0) == 0:
+            plot_learning_curves({args.algorithm: results}, f"{prefix}{args.algorithm}_learning_curve.png")
@@ -0,0 +1,62 @@
+# test_job_queue.py
+from Utils.job_queue import JobQueue, DONE, FAILED, PENDING, RUNNING
+
+def make_queue(tmp_path, num_jobs=1):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue([dict(algorithm="PPO", env_id="CartPole-v1", seed=seed, max_steps=1000, options={"lr": 0.001})
+                   for seed in range(num_jobs)])
+    return queue
+
+def test_claim_hands_each_job_to_one_worker(tmp_path):
+    queue = make_queue(tmp_path, 2)
+    first, second = queue.claim("a"), queue.claim("b")
+    assert (first["seed"], second["seed"]) == (0, 1)
+    assert first["status"] == RUNNING and first["attempts"] == 1
+    assert first["options"] == {"lr": 0.001}
+    assert queue.claim("c") is None
+    assert queue.counts()[RUNNING] == 2
+
+def test_enqueue_skips_known_jobs(tmp_path):
+    queue = make_queue(tmp_path)
+    assert queue.enqueue([dict(algorithm="PPO", env_id="CartPole-v1", seed=0, max_steps=1000,
+                               options={"lr": 0.001})]) == 0
+
+def test_only_the_holder_completes(tmp_path):
+    queue = make_queue(tmp_path)
+    job = queue.claim("a")
+    assert not queue.complete(job["id"], "b", {"score": 1.0})
+    assert queue.counts()[RUNNING] == 1
+    assert queue.complete(job["id"], "a", {"score": 1.0})
+    assert queue.jobs(DONE)[0]["result"] == '{"score": 1.0}'
+
+def test_stale_job_is_reclaimed(tmp_path):
+    # A negative stale_after makes every running job's heartbeat stale
+    queue = make_queue(tmp_path)
+    job = queue.claim("a")
+    reclaimed = queue.claim("b", stale_after=-1.0)
+    assert reclaimed["id"] == job["id"] and reclaimed["attempts"] == 2
+    # The first holder lost its lease: its heartbeat and result are refused
+    assert not queue.heartbeat(job["id"], "a")
+    assert not queue.complete(job["id"], "a", {})
+    assert queue.complete(job["id"], "b", {})
+
+def test_fresh_job_is_not_reclaimed(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.claim("a")
+    assert queue.claim("b", stale_after=300.0) is None
+
+def test_max_attempts_fails_the_job(tmp_path):
+    queue = make_queue(tmp_path)
+    for worker in ["a", "b"]:
+        assert queue.claim(worker, stale_after=-1.0, max_attempts=2) is not None
+    assert queue.claim("c", stale_after=-1.0, max_attempts=2) is None
+    failed = queue.jobs(FAILED)
+    assert len(failed) == 1 and failed[0]["error"] == "heartbeat lost on b"
+    assert queue.retry_failed() == 1
+    assert queue.counts()[PENDING] == 1
+
+def test_release_does_not_count_an_attempt(tmp_path):
+    queue = make_queue(tmp_path)
+    job = queue.claim("a")
+    queue.release(job["id"], "a")
+    assert queue.claim("b")["attempts"] == 1
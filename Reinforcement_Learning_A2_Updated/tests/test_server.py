@@ -0,0 +1,34 @@
+# test_server.py
+import asyncio
+import numpy as np
+import pytest
+from Serving.client import AsyncPolicyClient
+from Serving.protocol import PolicyError
+from Serving.server import PolicyServer
+
+class FlakyPolicy:
+    # Acts with action 1 everywhere, and raises on batches containing a NaN
+    obs_dim, action_dim, output = 2, 2, "probs"
+
+    def act(self, obs, greedy):
+        if np.isnan(obs).any():
+            raise ValueError("NaN observation")
+        return np.ones(len(obs), dtype=np.int64), np.full((len(obs), 2), 0.5, dtype=np.float32)
+
+def test_failed_batch_answers_with_errors(tmp_path):
+    async def run():
+        server = PolicyServer(FlakyPolicy(), max_wait_us=0)
+        address = f"unix:{tmp_path / 'policy.sock'}"
+        serving = asyncio.create_task(server.serve(address))
+        while not (tmp_path / "policy.sock").exists():
+            await asyncio.sleep(0.01)
+        client = await AsyncPolicyClient.connect(address)
+        with pytest.raises(PolicyError, match="NaN observation"):
+            await client.act([[np.nan, 0.0]])
+        # The connection and the batch loop survive the failure
+        actions, outputs = await client.act([[0.0, 0.0], [1.0, 1.0]], outputs=True)
+        np.testing.assert_array_equal(actions, [1, 1])
+        np.testing.assert_allclose(outputs, 0.5)
+        await client.close()
+        serving.cancel()
+    asyncio.run(run())
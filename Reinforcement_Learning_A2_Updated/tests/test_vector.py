@@ -0,0 +1,33 @@
+# test_vector.py
+import types
+import numpy as np
+import torch
+from Algorithms.vector import bootstrapped_returns
+from Utils.normalization import ReturnNormalizer
+
+class ConstantValue(torch.nn.Module):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def forward(self, states):
+        return torch.full((len(states), 1), self.value)
+
+def make_agent(value, return_normalizer=None):
+    return types.SimpleNamespace(value_net=ConstantValue(value), device="cpu", gamma=0.9,
+                                 return_normalizer=return_normalizer)
+
+def test_one_step_bootstrap():
+    # R = r + gamma * V(s'), and the tail is cut where an episode ended
+    agent = make_agent(2.0)
+    returns = bootstrapped_returns(agent, np.array([[1.0, 1.0]]), np.array([[1.0, 0.0]]), np.zeros((2, 4)))
+    np.testing.assert_allclose(returns, [[1.0 + 0.9 * 2.0, 1.0]])
+
+def test_bootstrap_undoes_return_normalization():
+    # The critic predicts returns divided by the running std, so V(s') is scaled back up
+    normalizer = ReturnNormalizer(center=False)
+    normalizer(np.array([0.0, 30.0, 60.0]))
+    std = float(normalizer.return_rms.std)
+    agent = make_agent(2.0, normalizer)
+    returns = bootstrapped_returns(agent, np.array([[1.0]]), np.array([[1.0]]), np.zeros((1, 4)))
+    np.testing.assert_allclose(returns, [[1.0 + 0.9 * 2.0 * std]], rtol=1e-6)